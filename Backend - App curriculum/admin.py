@@ -1,6 +1,14 @@
 
 
+import codecs
+
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.http import StreamingHttpResponse
+from django.shortcuts import render
+from django.urls import path
+from django.utils import timezone
+from django.db.models import Count
 from django.utils.html import format_html
 from .models import (
     DatosPersonales,
@@ -9,8 +17,15 @@ from .models import (
     CursoRealizado,
     ProductoAcademico,
     ProductoLaboral,
-    VentaGarage
+    VentaGarage,
+    TrabajoRenderPDF,
+    Etiqueta
 )
+from .forms import ImportarPerfilesForm
+from .pdf_bulk_export import generar_zip_cvs
+from .cv_estadisticas import anotar_completitud
+from .cv_experiencia import TRAMOS_EXPERIENCIA, filtrar_por_experiencia
+from .cv_importacion import ResultadoImportacion, importar_perfiles, importar_seccion, leer_filas
 
 
 # ======================================
@@ -36,6 +51,58 @@ class CursoRealizadoInline(admin.TabularInline):
     fields = ['nombrecurso', 'fechainicio', 'fechafin', 'entidadpatrocinadora', 'activarparaqueseveaenfront']
 
 
+# ======================================
+# FILTROS
+# ======================================
+
+class CompletitudFilter(admin.SimpleListFilter):
+    """
+    Filtra perfiles por rango de completitud (anotada por DatosPersonalesAdmin)
+    """
+    title = 'completitud'
+    parameter_name = 'completitud'
+    
+    RANGOS = {
+        '0-24': (0, 24),
+        '25-49': (25, 49),
+        '50-74': (50, 74),
+        '75-99': (75, 99),
+        '100': (100, 100),
+    }
+    
+    def lookups(self, request, model_admin):
+        return [
+            ('0-24', 'Menos de 25%'),
+            ('25-49', '25% - 49%'),
+            ('50-74', '50% - 74%'),
+            ('75-99', '75% - 99%'),
+            ('100', 'Completo'),
+        ]
+    
+    def queryset(self, request, queryset):
+        rango = self.RANGOS.get(self.value())
+        if rango is None:
+            return queryset
+        return queryset.filter(completitud_cv__range=rango)
+
+
+class ExperienciaFilter(admin.SimpleListFilter):
+    """
+    Filtra perfiles por años de experiencia guardados (periodos fusionados)
+    """
+    title = 'experiencia'
+    parameter_name = 'experiencia'
+    
+    def lookups(self, request, model_admin):
+        return [(clave, etiqueta) for clave, etiqueta, _, _ in TRAMOS_EXPERIENCIA]
+    
+    def queryset(self, request, queryset):
+        for clave, _, minimo, maximo in TRAMOS_EXPERIENCIA:
+            if clave == self.value():
+                return filtrar_por_experiencia(queryset, minimo, maximo)
+        return queryset
+
+
 # ======================================
 # ADMIN: DATOS PERSONALES
 # ======================================
@@ -48,10 +115,11 @@ class DatosPersonalesAdmin(admin.ModelAdmin):
         'numerocedula',
         'edad',
         'perfilactivo_badge',
+        'completitud_badge',
         'fecha_actualizacion'
     ]
     
-    list_filter = ['perfilactivo', 'sexo', 'estadocivil', 'fecha_creacion']
+    list_filter = ['perfilactivo', CompletitudFilter, ExperienciaFilter, 'sexo', 'estadocivil', 'fecha_creacion']
     search_fields = ['nombres', 'apellidos', 'numerocedula']
     
     readonly_fields = ['slug', 'fecha_creacion', 'fecha_actualizacion', 'foto_preview_large', 'edad']
@@ -92,7 +160,8 @@ class DatosPersonalesAdmin(admin.ModelAdmin):
                 'mostrar_cursos_pdf',
                 'mostrar_productos_academicos_pdf',
                 'mostrar_productos_laborales_pdf',
-                'mostrar_venta_garage_pdf'
+                'mostrar_venta_garage_pdf',
+                'tema_pdf'
             ),
             'classes': ('wide',),
             'description': 'Selecciona qué secciones se mostrarán en el PDF generado'
@@ -107,6 +176,67 @@ class DatosPersonalesAdmin(admin.ModelAdmin):
     )
     
     inlines = [ExperienciaLaboralInline, ReconocimientoInline, CursoRealizadoInline]
+    actions = ['exportar_cvs_zip']
+    change_list_template = 'curriculum/admin/datospersonales_change_list.html'
+    
+    # Errores que se muestran en la página de resultado de una importación
+    MAX_ERRORES_IMPORTACION = 500
+    
+    def get_queryset(self, request):
+        return anotar_completitud(super().get_queryset(request))
+    
+    def get_urls(self):
+        urls = [
+            path(
+                'importar/',
+                self.admin_site.admin_view(self.importar_view),
+                name='curriculum_datospersonales_importar'
+            ),
+        ]
+        return urls + super().get_urls()
+    
+    def importar_view(self, request):
+        """
+        Importación masiva desde un archivo subido (ver cv_importacion.py)
+        """
+        if not self.has_add_permission(request):
+            raise PermissionDenied
+        
+        resultado = None
+        form = ImportarPerfilesForm(request.POST or None, request.FILES or None)
+        if request.method == 'POST' and form.is_valid():
+            filas = leer_filas(codecs.iterdecode(form.cleaned_data['archivo'], 'utf-8-sig'), form.formato)
+            seccion = form.cleaned_data['seccion']
+            resultado = ResultadoImportacion()
+            try:
+                if seccion:
+                    importar_seccion(seccion, filas, resultado=resultado)
+                else:
+                    importar_perfiles(filas, resultado=resultado)
+            except UnicodeDecodeError as error:
+                # clean_archivo ya valida la codificación; los lotes anteriores quedan guardados
+                form.add_error('archivo', f"El archivo no está codificado en UTF-8: {error.reason}")
+        
+        return render(request, 'curriculum/admin/importar_perfiles.html', {
+            **self.admin_site.each_context(request),
+            'opts': self.model._meta,
+            'title': 'Importar perfiles',
+            'form': form,
+            'resultado': resultado,
+            'filas': sorted(resultado.filas.items()) if resultado else [],
+            'errores': resultado.errores[:self.MAX_ERRORES_IMPORTACION] if resultado else [],
+        })
+    
+    def exportar_cvs_zip(self, request, queryset):
+        """
+        Descarga un ZIP con el PDF de cada perfil seleccionado (ver reporte.csv dentro)
+        """
+        perfil_ids = list(queryset.order_by('pk').values_list('pk', flat=True))
+        respuesta = StreamingHttpResponse(generar_zip_cvs(perfil_ids), content_type='application/zip')
+        respuesta['Content-Disposition'] = f'attachment; filename="CVs_{timezone.now():%Y%m%d_%H%M}.zip"'
+        return respuesta
+    
+    exportar_cvs_zip.short_description = 'Exportar CVs seleccionados en PDF (ZIP)'
     
     def foto_preview(self, obj):
         if obj.foto:
@@ -138,6 +268,23 @@ class DatosPersonalesAdmin(admin.ModelAdmin):
         )
     
     perfilactivo_badge.short_description = 'Estado'
+    
+    def completitud_badge(self, obj):
+        completitud = obj.completitud_cv
+        if completitud >= 80:
+            color = '#28a745'
+        elif completitud >= 50:
+            color = '#ffc107'
+        else:
+            color = '#dc3545'
+        return format_html(
+            '<span style="background: {}; color: white; padding: 3px 8px; border-radius: 3px;">{}%</span>',
+            color,
+            completitud
+        )
+    
+    completitud_badge.short_description = 'Completitud'
+    completitud_badge.admin_order_field = 'completitud_cv'
 
 
 # ======================================
@@ -266,12 +413,16 @@ class ProductoAcademicoAdmin(admin.ModelAdmin):
         'idperfilconqueestaactivo'
     ]
     
-    list_filter = ['activarparaqueseveaenfront']
+    list_filter = ['activarparaqueseveaenfront', 'etiquetas']
     search_fields = ['nombrerecurso', 'clasificador']
     
+    def get_queryset(self, request):
+        # get_etiquetas() lee las etiquetas precargadas
+        return super().get_queryset(request).prefetch_related('etiquetas')
+    
     def clasificador_preview(self, obj):
-        tags = obj.get_etiquetas()[:3]
-        return ', '.join(tags) + ('...' if len(obj.get_etiquetas()) > 3 else '')
+        tags = obj.get_etiquetas()
+        return ', '.join(tags[:3]) + ('...' if len(tags) > 3 else '')
     
     clasificador_preview.short_description = 'Etiquetas'
     
@@ -283,6 +434,30 @@ class ProductoAcademicoAdmin(admin.ModelAdmin):
     activar_badge.short_description = 'Visibilidad'
 
 
+# ======================================
+# ADMIN: ETIQUETAS
+# ======================================
+
+@admin.register(Etiqueta)
+class EtiquetaAdmin(admin.ModelAdmin):
+    list_display = ['nombre', 'clave', 'total_productos']
+    search_fields = ['nombre', 'clave']
+    readonly_fields = ['clave']
+    
+    def has_add_permission(self, request):
+        # Las etiquetas nacen del clasificador de los productos
+        return False
+    
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(num_productos=Count('asignaciones'))
+    
+    def total_productos(self, obj):
+        return obj.num_productos
+    
+    total_productos.short_description = 'Productos'
+    total_productos.admin_order_field = 'num_productos'
+
+
 # ======================================
 # ADMIN: PRODUCTOS LABORALES
 # ======================================
@@ -388,3 +563,23 @@ class VentaGarageAdmin(admin.ModelAdmin):
         return format_html('<span style="color: red;">✗ Oculto</span>')
     
     activar_badge.short_description = 'Visibilidad'
+
+
+# ======================================
+# ADMIN: TRABAJOS DE RENDER PDF
+# ======================================
+
+@admin.register(TrabajoRenderPDF)
+class TrabajoRenderPDFAdmin(admin.ModelAdmin):
+    list_display = [
+        'id',
+        'perfil',
+        'estado',
+        'fecha_creacion',
+        'fecha_inicio',
+        'fecha_fin'
+    ]
+    
+    list_filter = ['estado', 'fecha_creacion']
+    search_fields = ['perfil__nombres', 'perfil__apellidos', 'huella']
+    readonly_fields = ['id', 'perfil', 'secciones', 'huella', 'error', 'fecha_creacion', 'fecha_inicio', 'fecha_fin']
@@ -18,3 +18,9 @@ class CurriculumConfig(AppConfig):
             import curriculum.signals
         except ImportError:
             pass
+        
+        # Índice de facetas listo antes de la primera consulta de reclutadores
+        from django.conf import settings
+        if getattr(settings, 'CV_FACETAS_PRECARGAR', False):
+            from .cv_facetas import precargar_facetas
+            precargar_facetas()
@@ -0,0 +1,291 @@
+"""
+Búsqueda de texto completo sobre los CVs públicos
+
+IndiceBusquedaCV guarda, por perfil, el texto buscable en tres grupos con
+distinto peso:
+
+    texto_perfil       (A) nombres, apellidos, descripción y nacionalidad
+    texto_experiencia  (B) cargos, empresas y funciones visibles
+    texto_formacion    (C) cursos y productos académicos visibles
+
+Solo se indexan campos que el CV público ya muestra (las listas blancas de
+cv_documento): la búsqueda no encuentra perfiles por datos privados.
+signals.py lo actualiza al guardar el perfil o esas secciones. El índice
+invertido depende del motor:
+
+    SQLite      tabla virtual FTS5 con contenido externo, sincronizada por
+                triggers y ordenada con bm25()
+    PostgreSQL  columna tsvector con índice GIN, ordenada con ts_rank
+
+preparar_indice_busqueda() crea esas estructuras después de migrate y es
+idempotente. En otros motores la búsqueda cae a icontains, sin ranking.
+"""
+
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection, transaction
+from django.db.models import F, Q
+
+from .models import (
+    DatosPersonales,
+    ExperienciaLaboral,
+    CursoRealizado,
+    ProductoAcademico,
+    IndiceBusquedaCV
+)
+from .cv_documento import CAMPOS_PERFIL_PUBLICO, CAMPOS_PUBLICOS_SECCION
+
+
+def _publicos(campos, lista_blanca):
+    return tuple(campo for campo in campos if campo in lista_blanca)
+
+
+# Texto indexado de cada tabla, limitado a los campos públicos del documento
+CAMPOS_TEXTO_PERFIL = _publicos(
+    ('nombres', 'apellidos', 'descripcionperfil', 'nacionalidad'), CAMPOS_PERFIL_PUBLICO
+)
+CAMPOS_TEXTO_EXPERIENCIA = _publicos(
+    ('cargodesempenado', 'nombrempresa', 'descripcionfunciones'), CAMPOS_PUBLICOS_SECCION['experiencia']
+)
+CAMPOS_TEXTO_CURSOS = _publicos(
+    ('nombrecurso', 'descripcioncurso'), CAMPOS_PUBLICOS_SECCION['cursos']
+)
+CAMPOS_TEXTO_PRODUCTOS = _publicos(
+    ('nombrerecurso', 'clasificador', 'descripcion'), CAMPOS_PUBLICOS_SECCION['productos_academicos']
+)
+
+TABLA_FTS = 'indicebusquedacv_fts'
+
+# Pesos bm25 de texto_perfil, texto_experiencia y texto_formacion
+PESOS_FTS = (10.0, 4.0, 2.0)
+
+SQL_FTS5 = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_FTS} USING fts5(
+        texto_perfil, texto_experiencia, texto_formacion,
+        content='indicebusquedacv', content_rowid='idperfil',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS indicebusquedacv_ai AFTER INSERT ON indicebusquedacv BEGIN
+        INSERT INTO {TABLA_FTS}(rowid, texto_perfil, texto_experiencia, texto_formacion)
+        VALUES (new.idperfil, new.texto_perfil, new.texto_experiencia, new.texto_formacion);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS indicebusquedacv_ad AFTER DELETE ON indicebusquedacv BEGIN
+        INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, texto_perfil, texto_experiencia, texto_formacion)
+        VALUES ('delete', old.idperfil, old.texto_perfil, old.texto_experiencia, old.texto_formacion);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS indicebusquedacv_au AFTER UPDATE ON indicebusquedacv BEGIN
+        INSERT INTO {TABLA_FTS}({TABLA_FTS}, rowid, texto_perfil, texto_experiencia, texto_formacion)
+        VALUES ('delete', old.idperfil, old.texto_perfil, old.texto_experiencia, old.texto_formacion);
+        INSERT INTO {TABLA_FTS}(rowid, texto_perfil, texto_experiencia, texto_formacion)
+        VALUES (new.idperfil, new.texto_perfil, new.texto_experiencia, new.texto_formacion);
+    END
+    """,
+)
+
+SQL_GIN = 'CREATE INDEX IF NOT EXISTS indicebusquedacv_vector_gin ON indicebusquedacv USING GIN (vector)'
+
+
+def _configuracion():
+    # Configuración de text search de PostgreSQL (stemming en español)
+    return getattr(settings, 'CV_BUSQUEDA_CONFIG', 'spanish')
+
+
+# ======================================
+# ÍNDICE
+# ======================================
+
+def preparar_indice_busqueda(conexion=connection):
+    """
+    Crea la tabla FTS5 y sus triggers (SQLite) o el índice GIN (PostgreSQL)
+    """
+    if IndiceBusquedaCV._meta.db_table not in conexion.introspection.table_names():
+        return
+
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE name = %s", [TABLA_FTS])
+            existia = cursor.fetchone() is not None
+            for sql in SQL_FTS5:
+                cursor.execute(sql)
+            if not existia:
+                # Indexa las filas que ya estaban en indicebusquedacv
+                cursor.execute(f"INSERT INTO {TABLA_FTS}({TABLA_FTS}) VALUES ('rebuild')")
+        elif conexion.vendor == 'postgresql':
+            cursor.execute(SQL_GIN)
+
+
+def _unir(*partes):
+    return ' '.join(str(parte) for parte in partes if parte)
+
+
+def textos_perfil(perfil_id):
+    """
+    (texto_perfil, texto_experiencia, texto_formacion) de un perfil, o None si no existe
+    """
+    datos = (
+        DatosPersonales.objects.filter(pk=perfil_id)
+        .values_list(*CAMPOS_TEXTO_PERFIL)
+        .first()
+    )
+    if datos is None:
+        return None
+
+    experiencias = (
+        ExperienciaLaboral.objects
+        .filter(idperfilconqueestaactivo=perfil_id, activarparaqueseveaenfront=True)
+        .values_list(*CAMPOS_TEXTO_EXPERIENCIA)
+    )
+    cursos = (
+        CursoRealizado.objects
+        .filter(idperfilconqueestaactivo=perfil_id, activarparaqueseveaenfront=True)
+        .values_list(*CAMPOS_TEXTO_CURSOS)
+    )
+    productos = (
+        ProductoAcademico.objects
+        .filter(idperfilconqueestaactivo=perfil_id, activarparaqueseveaenfront=True)
+        .values_list(*CAMPOS_TEXTO_PRODUCTOS)
+    )
+
+    return (
+        _unir(*datos),
+        '\n'.join(_unir(*fila) for fila in experiencias),
+        '\n'.join(_unir(*fila) for fila in [*cursos, *productos]),
+    )
+
+
+def actualizar_indice_busqueda(perfil_id, crear=True):
+    """
+    Reescribe el texto indexado de un perfil (y su tsvector en PostgreSQL)
+
+    Con crear=False solo actualiza filas existentes (borrados en cascada).
+    """
+    textos = textos_perfil(perfil_id)
+    if textos is None:
+        return
+
+    campos = dict(zip(('texto_perfil', 'texto_experiencia', 'texto_formacion'), textos))
+    with transaction.atomic():
+        if crear:
+            IndiceBusquedaCV.objects.update_or_create(perfil_id=perfil_id, defaults=campos)
+        elif not IndiceBusquedaCV.objects.filter(perfil_id=perfil_id).update(**campos):
+            return
+
+        if connection.vendor == 'postgresql':
+            configuracion = _configuracion()
+            IndiceBusquedaCV.objects.filter(perfil_id=perfil_id).update(vector=(
+                SearchVector('texto_perfil', weight='A', config=configuracion)
+                + SearchVector('texto_experiencia', weight='B', config=configuracion)
+                + SearchVector('texto_formacion', weight='C', config=configuracion)
+            ))
+
+
+# ======================================
+# CONSULTA
+# ======================================
+
+def _consulta_fts5(texto):
+    """
+    Convierte el texto del usuario en una consulta FTS5 segura: cada palabra
+    entre comillas y como prefijo, todas obligatorias
+    """
+    palabras = re.findall(r'\w+', texto)
+    return ' '.join(f'"{palabra}"*' for palabra in palabras)
+
+
+class ResultadosFTS5:
+    """
+    Resultados de FTS5 con la interfaz que usa Paginator (count y slicing)
+    """
+
+    def __init__(self, consulta):
+        self.consulta = consulta
+        self._total = None
+
+    def count(self):
+        if self._total is None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    SELECT COUNT(*) FROM {TABLA_FTS}
+                    JOIN datospersonales ON datospersonales.idperfil = {TABLA_FTS}.rowid
+                    WHERE {TABLA_FTS} MATCH %s AND datospersonales.perfilactivo = 1
+                    """,
+                    [self.consulta]
+                )
+                self._total = cursor.fetchone()[0]
+        return self._total
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, rebanada):
+        if not isinstance(rebanada, slice):
+            return self[rebanada:rebanada + 1][0]
+
+        inicio = rebanada.start or 0
+        limite = (rebanada.stop - inicio) if rebanada.stop is not None else -1
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                SELECT {TABLA_FTS}.rowid, bm25({TABLA_FTS}, %s, %s, %s) AS rango FROM {TABLA_FTS}
+                JOIN datospersonales ON datospersonales.idperfil = {TABLA_FTS}.rowid
+                WHERE {TABLA_FTS} MATCH %s AND datospersonales.perfilactivo = 1
+                ORDER BY rango, {TABLA_FTS}.rowid
+                LIMIT %s OFFSET %s
+                """,
+                [*PESOS_FTS, self.consulta, limite, inicio]
+            )
+            filas = cursor.fetchall()
+
+        perfiles = DatosPersonales.objects.in_bulk([perfil_id for perfil_id, _ in filas])
+        resultados = []
+        for perfil_id, rango in filas:
+            perfil = perfiles[perfil_id]
+            # bm25 es negativo: más negativo, más relevante
+            perfil.rango = -rango
+            resultados.append(perfil)
+        return resultados
+
+
+def buscar_cvs(texto):
+    """
+    CVs públicos que coinciden con `texto`, de más a menos relevante
+
+    Devuelve un objeto paginable (queryset o ResultadosFTS5); cada perfil
+    trae su relevancia en `rango`.
+    """
+    texto = (texto or '').strip()
+    if not texto:
+        return DatosPersonales.objects.none()
+
+    if connection.vendor == 'sqlite':
+        consulta = _consulta_fts5(texto)
+        return ResultadosFTS5(consulta) if consulta else DatosPersonales.objects.none()
+
+    publicos = DatosPersonales.objects.filter(perfilactivo=1)
+
+    if connection.vendor == 'postgresql':
+        consulta = SearchQuery(texto, config=_configuracion(), search_type='websearch')
+        return (
+            publicos.filter(indice_busqueda__vector=consulta)
+            .annotate(rango=SearchRank(F('indice_busqueda__vector'), consulta))
+            .order_by('-rango', 'pk')
+        )
+
+    filtro = Q()
+    for palabra in texto.split():
+        filtro &= (
+            Q(indice_busqueda__texto_perfil__icontains=palabra)
+            | Q(indice_busqueda__texto_experiencia__icontains=palabra)
+            | Q(indice_busqueda__texto_formacion__icontains=palabra)
+        )
+    return publicos.filter(filtro).order_by('pk')
@@ -0,0 +1,282 @@
+"""
+Búsquedas guardadas de reclutadores con resultados incrementales
+
+Una BusquedaGuardada combina palabras clave (todas obligatorias), facetas
+de cv_facetas (OR dentro de cada faceta, AND entre facetas) y años mínimos
+de experiencia. Sus resultados viven en ResultadoBusqueda y se calculan
+completos una sola vez, al guardarla.
+
+Después, cuando cambia un perfil (signals.py), solo se evalúa ese perfil y
+solo contra las búsquedas que podrían cumplirse. TerminoBusqueda es un
+índice invertido con los términos de UNA condición que todo perfil
+coincidente tiene que cumplir:
+
+    palabra:<palabra>      la palabra clave más larga de la búsqueda
+    <faceta>:<valor>       los valores de la faceta con menos opciones elegidas
+    *                      búsquedas sin palabras ni facetas
+
+El perfil cambiado aporta todos sus términos (palabras de su texto
+indexado, valores de sus facetas y '*'); las búsquedas candidatas son las
+que comparten alguno y solo ellas se evalúan completas. El costo crece con
+los cambios, no con búsquedas x perfiles.
+"""
+
+import re
+import unicodedata
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from .models import (
+    BusquedaGuardada,
+    DatosPersonales,
+    EstadisticasCV,
+    IndiceBusquedaCV,
+    ResultadoBusqueda,
+    TerminoBusqueda
+)
+from .cv_etiquetas import normalizar_etiqueta
+from .cv_experiencia import dias_de_anos
+from .cv_facetas import CAMPOS_PERFIL, FACETAS, valores_facetas
+
+
+TERMINO_TODOS = '*'
+
+FACETAS_VALIDAS = {faceta for faceta, _ in FACETAS}
+
+# Límite de parámetros por query (SQLite admite 999 en versiones viejas)
+TAMANO_LOTE = 500
+
+
+def palabras_de_texto(texto):
+    """
+    Palabras sin tildes ni mayúsculas, como se comparan con el texto de los perfiles
+    """
+    # Primero las palabras distintas: quitar tildes carácter a carácter a
+    # todo el texto de un CV largo es lo caro
+    palabras = set(re.findall(r'\w+', unicodedata.normalize('NFC', texto or '').casefold()))
+    return {limpia for palabra in palabras for limpia in re.findall(r'\w+', normalizar_etiqueta(palabra))}
+
+
+def normalizar_filtros(filtros):
+    """
+    {faceta: [valores]} solo con facetas conocidas y valores no vacíos, como texto
+    """
+    return {
+        faceta: sorted({str(valor) for valor in valores if str(valor)})
+        for faceta, valores in (filtros or {}).items()
+        if faceta in FACETAS_VALIDAS and any(str(valor) for valor in valores)
+    }
+
+
+def _termino_palabra(palabra):
+    return f"palabra:{palabra}"
+
+
+def _termino_faceta(faceta, valor):
+    return f"{faceta}:{valor}"
+
+
+def terminos_indice(busqueda):
+    """
+    Términos con los que se indexa la búsqueda (los de una condición obligatoria)
+    """
+    palabras = palabras_de_texto(busqueda.palabras)
+    if palabras:
+        # La palabra más larga suele ser la más selectiva
+        return [_termino_palabra(max(palabras, key=lambda palabra: (len(palabra), palabra)))]
+
+    filtros = busqueda.filtros or {}
+    if filtros:
+        faceta = min(filtros, key=lambda nombre: (len(filtros[nombre]), nombre))
+        return [_termino_faceta(faceta, valor) for valor in filtros[faceta]]
+
+    return [TERMINO_TODOS]
+
+
+def _lotes(valores, tamano=TAMANO_LOTE):
+    valores = list(valores)
+    for inicio in range(0, len(valores), tamano):
+        yield valores[inicio:inicio + tamano]
+
+
+# ======================================
+# EVALUACIÓN
+# ======================================
+
+@dataclass
+class ContextoPerfil:
+    """
+    Lo que se compara de un perfil contra las búsquedas
+    """
+    perfil_id: int
+    palabras: set = field(default_factory=set)
+    facetas: dict = field(default_factory=dict)
+    dias_experiencia: int = 0
+
+    def terminos(self):
+        terminos = {TERMINO_TODOS}
+        terminos.update(_termino_palabra(palabra) for palabra in self.palabras)
+        for faceta, valores in self.facetas.items():
+            terminos.update(_termino_faceta(faceta, valor) for valor in valores)
+        return terminos
+
+
+def cargar_contextos(perfil_ids):
+    """
+    {perfil_id: ContextoPerfil} de los perfiles que existen (cuatro queries)
+    """
+    contextos = {}
+    for perfil_id, pares in valores_facetas(perfil_ids).items():
+        contexto = ContextoPerfil(perfil_id)
+        for faceta, valor in pares:
+            contexto.facetas.setdefault(faceta, set()).add(valor)
+        contextos[perfil_id] = contexto
+
+    textos = (
+        IndiceBusquedaCV.objects.filter(perfil_id__in=perfil_ids)
+        .values_list('perfil_id', 'texto_perfil', 'texto_experiencia', 'texto_formacion')
+    )
+    for perfil_id, *partes in textos:
+        if perfil_id in contextos:
+            contextos[perfil_id].palabras = palabras_de_texto(' '.join(partes))
+
+    dias = EstadisticasCV.objects.filter(perfil_id__in=perfil_ids).values_list('perfil_id', 'dias_experiencia')
+    for perfil_id, dias_experiencia in dias:
+        if perfil_id in contextos:
+            contextos[perfil_id].dias_experiencia = dias_experiencia
+
+    return contextos
+
+
+def cumple(busqueda, contexto):
+    """
+    True si el perfil cumple todas las condiciones de la búsqueda
+    """
+    if not palabras_de_texto(busqueda.palabras) <= contexto.palabras:
+        return False
+    for faceta, valores in (busqueda.filtros or {}).items():
+        if not contexto.facetas.get(faceta, set()).intersection(valores):
+            return False
+    if busqueda.anos_minimos and contexto.dias_experiencia < dias_de_anos(busqueda.anos_minimos):
+        return False
+    return True
+
+
+def reevaluar_perfiles(perfil_ids):
+    """
+    Agrega o quita los perfiles indicados de los resultados de las búsquedas
+    candidatas según el índice invertido
+
+    Devuelve (resultados agregados, resultados quitados).
+    """
+    perfil_ids = list(perfil_ids)
+    contextos = cargar_contextos(perfil_ids)
+    terminos_perfil = {perfil_id: contexto.terminos() for perfil_id, contexto in contextos.items()}
+
+    # Búsquedas candidatas por término (solo los términos que tienen estos perfiles)
+    busquedas_por_termino = {}
+    for lote in _lotes(set().union(*terminos_perfil.values())):
+        for busqueda_id, termino in TerminoBusqueda.objects.filter(termino__in=lote).values_list('busqueda_id', 'termino'):
+            busquedas_por_termino.setdefault(termino, set()).add(busqueda_id)
+
+    candidatas = {
+        perfil_id: set().union(*(busquedas_por_termino.get(termino, ()) for termino in terminos))
+        for perfil_id, terminos in terminos_perfil.items()
+    }
+    busquedas = BusquedaGuardada.objects.in_bulk(set().union(*candidatas.values()))
+
+    coincidencias = {
+        (busqueda_id, perfil_id)
+        for perfil_id, ids in candidatas.items()
+        for busqueda_id in ids
+        if cumple(busquedas[busqueda_id], contextos[perfil_id])
+    }
+    actuales = {
+        (busqueda_id, perfil_id): pk
+        for pk, busqueda_id, perfil_id in ResultadoBusqueda.objects
+        .filter(perfil_id__in=perfil_ids)
+        .values_list('pk', 'busqueda_id', 'perfil_id')
+    }
+
+    quitar = [pk for clave, pk in actuales.items() if clave not in coincidencias]
+    agregar = [
+        ResultadoBusqueda(busqueda_id=busqueda_id, perfil_id=perfil_id)
+        for busqueda_id, perfil_id in coincidencias - actuales.keys()
+    ]
+    with transaction.atomic():
+        if quitar:
+            ResultadoBusqueda.objects.filter(pk__in=quitar).delete()
+        if agregar:
+            ResultadoBusqueda.objects.bulk_create(agregar, ignore_conflicts=True)
+
+    return len(agregar), len(quitar)
+
+
+# ======================================
+# ALTA Y CONSULTA
+# ======================================
+
+def _prefiltrar(busqueda):
+    """
+    Perfiles que pueden cumplir la búsqueda según las condiciones que el ORM
+    resuelve directo; el resto lo comprueba cumple()
+    """
+    perfiles = DatosPersonales.objects.order_by('pk')
+    for faceta, valores in (busqueda.filtros or {}).items():
+        if faceta in CAMPOS_PERFIL:
+            perfiles = perfiles.filter(**{f"{faceta}__in": valores})
+    if busqueda.anos_minimos:
+        perfiles = perfiles.filter(estadisticas__dias_experiencia__gte=dias_de_anos(busqueda.anos_minimos))
+    return perfiles
+
+
+def guardar_busqueda(busqueda):
+    """
+    Guarda la búsqueda, la indexa y calcula sus resultados actuales
+
+    Es la única vez que una búsqueda se evalúa contra todos los perfiles.
+    """
+    busqueda.filtros = normalizar_filtros(busqueda.filtros)
+    busqueda.fecha_revision = timezone.now()
+
+    with transaction.atomic():
+        busqueda.save()
+        busqueda.terminos.all().delete()
+        TerminoBusqueda.objects.bulk_create([
+            TerminoBusqueda(busqueda=busqueda, termino=termino) for termino in terminos_indice(busqueda)
+        ])
+        busqueda.resultados.all().delete()
+
+        ids = list(_prefiltrar(busqueda).values_list('pk', flat=True))
+        for lote in _lotes(ids):
+            ResultadoBusqueda.objects.bulk_create([
+                ResultadoBusqueda(busqueda=busqueda, perfil_id=perfil_id)
+                for perfil_id, contexto in cargar_contextos(lote).items()
+                if cumple(busqueda, contexto)
+            ])
+
+    return busqueda
+
+
+def busquedas_de_usuario(usuario):
+    """
+    Búsquedas del usuario con `total_resultados` y `nuevos` (desde la última revisión)
+    """
+    return (
+        BusquedaGuardada.objects.filter(usuario=usuario)
+        .annotate(
+            total_resultados=Count('resultados'),
+            nuevos=Count('resultados', filter=Q(resultados__fecha_coincidencia__gt=F('fecha_revision')))
+        )
+        .order_by('-fecha_creacion')
+    )
+
+
+def busquedas_con_experiencia():
+    """
+    True si alguna búsqueda depende de los años de experiencia
+    """
+    return BusquedaGuardada.objects.filter(Q(anos_minimos__gt=0) | Q(filtros__has_key='experiencia')).exists()
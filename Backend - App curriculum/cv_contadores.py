@@ -0,0 +1,66 @@
+"""
+Contadores globales de la página principal (perfiles y CVs públicos)
+
+Se guardan en la caché y signals.py los incrementa o decrementa al crear,
+eliminar o cambiar la visibilidad de un perfil, después del commit. Las
+claves expiran cada CV_CONTADORES_RECONCILIAR segundos: la siguiente
+lectura vuelve a contar en la base de datos y corrige cualquier desvío
+(cambios con queryset.update(), procesos caídos, etc.).
+"""
+
+from django.conf import settings
+from django.core.cache import caches
+
+from .models import DatosPersonales
+from .cv_snapshot import perfiles_publicos
+
+
+CLAVE_TOTAL_PERFILES = 'cv_global:total_perfiles'
+CLAVE_CVS_PUBLICOS = 'cv_global:cvs_publicos'
+
+
+def _cache():
+    return caches[getattr(settings, 'CV_PUBLICO_CACHE_ALIAS', 'default')]
+
+
+def reconciliar_contadores():
+    """
+    Cuenta en la base de datos y reinicia los contadores (dos queries)
+    """
+    contadores = {
+        CLAVE_TOTAL_PERFILES: DatosPersonales.objects.count(),
+        CLAVE_CVS_PUBLICOS: perfiles_publicos().count(),
+    }
+    _cache().set_many(contadores, getattr(settings, 'CV_CONTADORES_RECONCILIAR', 3600))
+    return contadores
+
+
+def obtener_contadores_globales():
+    """
+    {'total_perfiles': int, 'cvs_publicos': int}; sin queries mientras estén en caché
+    """
+    contadores = _cache().get_many([CLAVE_TOTAL_PERFILES, CLAVE_CVS_PUBLICOS])
+    if len(contadores) < 2:
+        contadores = reconciliar_contadores()
+    return {
+        'total_perfiles': contadores[CLAVE_TOTAL_PERFILES],
+        'cvs_publicos': contadores[CLAVE_CVS_PUBLICOS],
+    }
+
+
+def _sumar(clave, delta):
+    try:
+        _cache().incr(clave, delta)
+    except ValueError:
+        # Sin valor en caché: la próxima lectura reconcilia
+        pass
+
+
+def registrar_cambio_perfil(total=0, publicos=0):
+    """
+    Aplica la variación de los contadores causada por un perfil
+    """
+    if total:
+        _sumar(CLAVE_TOTAL_PERFILES, total)
+    if publicos:
+        _sumar(CLAVE_CVS_PUBLICOS, publicos)
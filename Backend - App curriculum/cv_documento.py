@@ -0,0 +1,297 @@
+"""
+Documento CV materializado: el contenido visible de un perfil en una sola fila
+
+DocumentoCV.contenido guarda los datos del perfil y las filas visibles de
+cada sección ya ordenadas, en JSON:
+
+    {
+        "esquema": 3,
+        "perfil": {"nombres": ..., "apellidos": ..., "nombre_completo": ..., ...},
+        "secciones": {"experiencia": [{...}, ...], "cursos": [...], ...}
+    }
+
+Las fechas van en ISO 8601, los decimales como texto, los archivos como URL
+y los campos con choices llevan también su `<campo>_display`. El documento
+se sirve sin autenticación (cv_publico_json), así que solo se copian los
+campos de CAMPOS_PERFIL_PUBLICO y CAMPOS_PUBLICOS_SECCION: nada de cédula,
+fecha de nacimiento, teléfonos, direcciones, contactos de terceros ni
+certificados.
+
+signals.py reconstruye solo la sección que cambió, con la fila del perfil
+bloqueada. El documento nuevo se escribe de una vez en un UPDATE y
+`version` sube en cada escritura, así que un lector siempre ve un documento
+completo. snapshot_desde_documento() lo devuelve como un SnapshotCV para que
+templates y PDF lo usen igual que las filas de los modelos.
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache
+
+from django.db import models, transaction
+
+from .models import DatosPersonales, DocumentoCV
+from .cv_snapshot import SECCIONES_CV, CAMPOS_SNAPSHOT, SnapshotCV, cargar_snapshot_cv
+
+
+VERSION_ESQUEMA = 3
+
+# No se copian al documento: credenciales y claves foráneas internas
+CAMPOS_EXCLUIDOS = {'usuario', 'idperfilconqueestaactivo'}
+
+# Únicos datos del perfil que van al documento (lista blanca)
+CAMPOS_PERFIL_PUBLICO = (
+    'nombres',
+    'apellidos',
+    'nombre_completo',
+    'descripcionperfil',
+    'nacionalidad',
+    'sitioweb',
+    'foto',
+    'slug',
+    'fecha_actualizacion',
+)
+
+# Campos públicos de las filas de cada sección (clave de SECCIONES_CV)
+CAMPOS_PUBLICOS_SECCION = {
+    'experiencia': (
+        'idexperiencilaboral',
+        'cargodesempenado',
+        'nombrempresa',
+        'lugarempresa',
+        'sitiowebempresa',
+        'fechainiciogestion',
+        'fechafingestion',
+        'descripcionfunciones',
+    ),
+    'reconocimientos': (
+        'idreconocimiento',
+        'tiporeconocimiento',
+        'fechareconocimiento',
+        'descripcionreconocimiento',
+        'entidadpatrocinadora',
+    ),
+    'cursos': (
+        'idcursorealizado',
+        'nombrecurso',
+        'fechainicio',
+        'fechafin',
+        'totalhoras',
+        'descripcioncurso',
+        'entidadpatrocinadora',
+    ),
+    'productos_academicos': (
+        'idproductoacademico',
+        'nombrerecurso',
+        'clasificador',
+        'descripcion',
+    ),
+    'productos_laborales': (
+        'idproductoslaborales',
+        'nombreproducto',
+        'fechaproducto',
+        'descripcion',
+    ),
+    'venta_garage': (
+        'idventagarage',
+        'nombreproducto',
+        'estadoproducto',
+        'descripcion',
+        'valordelbien',
+        'fecha_publicacion',
+        'imagen_producto',
+    ),
+}
+
+
+# ======================================
+# SERIALIZACIÓN
+# ======================================
+
+def _campos(modelo):
+    return [campo for campo in modelo._meta.concrete_fields if campo.name not in CAMPOS_EXCLUIDOS]
+
+
+def serializar_fila(instancia, campos=None):
+    """
+    Diccionario JSON de una fila, con el nombre de atributo de cada campo;
+    con `campos`, solo esos
+    """
+    datos = {}
+    for campo in _campos(type(instancia)):
+        if campos is not None and campo.name not in campos:
+            continue
+        valor = campo.value_from_object(instancia)
+        if isinstance(campo, models.FileField):
+            valor = valor.url if valor else ''
+        elif isinstance(valor, (date, datetime)):
+            valor = valor.isoformat()
+        elif isinstance(valor, Decimal):
+            valor = str(valor)
+        datos[campo.attname] = valor
+
+        if campo.choices:
+            datos[f"{campo.attname}_display"] = str(getattr(instancia, f"get_{campo.name}_display")())
+    return datos
+
+
+def serializar_perfil(perfil, completo=False):
+    """
+    Datos del perfil para el documento: solo CAMPOS_PERFIL_PUBLICO, salvo
+    con completo=True (la exportación de datos del propio usuario)
+    """
+    datos = serializar_fila(perfil, None if completo else CAMPOS_PERFIL_PUBLICO)
+    datos['nombre_completo'] = perfil.nombre_completo
+    return datos
+
+
+# ======================================
+# LECTURA
+# ======================================
+
+class ArchivoDocumento(str):
+    """
+    URL de un archivo del documento; responde a `.url` como un FieldFile
+    """
+
+    @property
+    def url(self):
+        return str(self)
+
+
+@lru_cache(maxsize=None)
+def _conversores(modelo):
+    conversores = {}
+    for campo in _campos(modelo):
+        if isinstance(campo, models.FileField):
+            conversores[campo.attname] = ArchivoDocumento
+        elif isinstance(campo, models.DateTimeField):
+            conversores[campo.attname] = datetime.fromisoformat
+        elif isinstance(campo, models.DateField):
+            conversores[campo.attname] = date.fromisoformat
+        elif isinstance(campo, models.DecimalField):
+            conversores[campo.attname] = Decimal
+    return conversores
+
+
+class FilaDocumento:
+    """
+    Fila del documento con la misma interfaz de lectura que la instancia del
+    modelo: atributos con sus tipos de Python y get_<campo>_display()
+    """
+
+    def __init__(self, modelo, datos):
+        self._modelo = modelo
+        conversores = _conversores(modelo)
+        for nombre, valor in datos.items():
+            if valor is not None and nombre in conversores:
+                valor = conversores[nombre](valor)
+            setattr(self, nombre, valor)
+
+    def __getattr__(self, nombre):
+        if nombre.startswith('get_') and nombre.endswith('_display'):
+            display = self.__dict__.get(f"{nombre[4:-8]}_display", '')
+            return lambda: display
+        raise AttributeError(nombre)
+
+    @property
+    def pk(self):
+        return getattr(self, self._modelo._meta.pk.attname)
+
+
+class PerfilDocumento(FilaDocumento):
+    """
+    Datos públicos del perfil leídos del documento (sin fecha de nacimiento,
+    así que sin edad)
+    """
+
+    def __init__(self, datos):
+        super().__init__(DatosPersonales, datos)
+
+    def __str__(self):
+        return self.nombre_completo
+
+
+def snapshot_desde_documento(documento, perfil=None):
+    """
+    SnapshotCV con las filas del documento; `perfil` reemplaza al del documento
+    (por ejemplo, la instancia real ya cargada por la vista)
+    """
+    contenido = documento.contenido
+    datos = {}
+    for clave, _, modelo, _ in SECCIONES_CV:
+        filas = contenido['secciones'].get(clave, ())
+        datos[CAMPOS_SNAPSHOT[clave]] = tuple(FilaDocumento(modelo, fila) for fila in filas)
+    return SnapshotCV(perfil=perfil or PerfilDocumento(contenido['perfil']), **datos)
+
+
+def contar_filas_documento(documento, secciones=None):
+    """
+    Filas visibles del documento en las secciones indicadas, sin queries
+    """
+    return sum(
+        len(filas) for clave, filas in documento.contenido['secciones'].items()
+        if secciones is None or secciones.get(clave, False)
+    )
+
+
+# ======================================
+# ESCRITURA
+# ======================================
+
+def actualizar_documento(perfil_id, claves=None, crear=True):
+    """
+    Reconstruye las secciones indicadas (todas si claves es None) y los datos
+    del perfil, y guarda el documento con una versión nueva
+
+    Con crear=False no se crea el documento si falta (borrados en cascada).
+    Devuelve el DocumentoCV, o None si no hay perfil o documento.
+    """
+    with transaction.atomic():
+        perfil = DatosPersonales.objects.select_for_update().filter(pk=perfil_id).first()
+        if perfil is None:
+            return None
+
+        documento = DocumentoCV.objects.filter(perfil_id=perfil_id).first()
+        if documento is None:
+            if not crear:
+                return None
+            documento = DocumentoCV(perfil=perfil)
+            claves = None
+        elif documento.contenido.get('esquema') != VERSION_ESQUEMA:
+            claves = None
+
+        if claves is None:
+            claves = [clave for clave, _, _, _ in SECCIONES_CV]
+
+        secciones = dict(documento.contenido.get('secciones', {}))
+        if claves:
+            snapshot = cargar_snapshot_cv(perfil, {clave: True for clave in claves})
+            for clave in claves:
+                campos = CAMPOS_PUBLICOS_SECCION[clave]
+                secciones[clave] = [serializar_fila(fila, campos) for fila in snapshot.seccion(clave)]
+
+        documento.contenido = {
+            'esquema': VERSION_ESQUEMA,
+            'perfil': serializar_perfil(perfil),
+            'secciones': secciones,
+        }
+        documento.version += 1
+        documento.save()
+
+    return documento
+
+
+def obtener_documento(perfil):
+    """
+    Documento del perfil; lo construye si todavía no existe o si quedó con
+    un esquema anterior
+    """
+    try:
+        documento = perfil.documento
+    except DocumentoCV.DoesNotExist:
+        documento = None
+    if documento is None or documento.contenido.get('esquema') != VERSION_ESQUEMA:
+        documento = actualizar_documento(perfil.pk)
+        perfil.documento = documento
+    return documento
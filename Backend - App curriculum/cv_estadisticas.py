@@ -0,0 +1,140 @@
+"""
+Contadores por sección y completitud del CV, guardados en EstadisticasCV
+
+signals.py recalcula la sección afectada cada vez que se crea, elimina o
+cambia la visibilidad de una fila hija, dentro de una transacción y con la
+fila de estadísticas bloqueada, así que los contadores no se desvían aunque
+haya ediciones concurrentes. El dashboard, los template tags y el admin
+leen estos valores en lugar de contar.
+"""
+
+from django.db import transaction
+from django.db.models import Case, ExpressionWrapper, IntegerField, Q, Value, When
+
+from .models import DatosPersonales, EstadisticasCV
+from .cv_snapshot import SECCIONES_CV, anotar_conteos_visibles
+from .cv_experiencia import aplicar_experiencia, experiencia_de_perfiles
+
+
+# Secciones que suman a la completitud, además de la foto
+SECCIONES_COMPLETITUD = (
+    'experiencia',
+    'reconocimientos',
+    'cursos',
+    'productos_academicos',
+    'productos_laborales',
+)
+
+
+def campo_contador(clave):
+    return f"total_{clave}"
+
+
+def clave_de_modelo(modelo):
+    """
+    Clave de sección ('experiencia', 'cursos', ...) de un modelo hijo
+    """
+    for clave, _, modelo_seccion, _ in SECCIONES_CV:
+        if modelo_seccion is modelo:
+            return clave
+    return None
+
+
+def calcular_completitud(conteos, tiene_foto):
+    """
+    Porcentaje de secciones con contenido (más la foto)
+
+    Args:
+        conteos: dict {clave de sección: filas visibles}
+        tiene_foto: si el perfil tiene foto
+    """
+    completas = sum(1 for clave in SECCIONES_COMPLETITUD if conteos.get(clave, 0) > 0)
+    completas += 1 if tiene_foto else 0
+    return int((completas / (len(SECCIONES_COMPLETITUD) + 1)) * 100)
+
+
+def anotar_completitud(queryset):
+    """
+    Anota `completitud_cv` (y los `n_<clave>` que usa) calculada en SQL con
+    subqueries de conteo, para ordenar o filtrar muchos perfiles en una query
+
+    Da el mismo valor que calcular_completitud(); no depende de EstadisticasCV.
+    """
+    queryset = anotar_conteos_visibles(queryset, {clave: True for clave in SECCIONES_COMPLETITUD})
+
+    foto = Case(
+        When(Q(foto__isnull=False) & ~Q(foto=''), then=Value(1)),
+        default=Value(0)
+    )
+    completas = sum(
+        (Case(When(**{f"n_{clave}__gt": 0}, then=Value(1)), default=Value(0)) for clave in SECCIONES_COMPLETITUD),
+        foto
+    )
+    return queryset.annotate(completitud_cv=ExpressionWrapper(
+        completas * Value(100) / Value(len(SECCIONES_COMPLETITUD) + 1),
+        output_field=IntegerField()
+    ))
+
+
+def actualizar_estadisticas(perfil_id, claves=None, crear=True):
+    """
+    Recalcula los contadores indicados (todos si claves es None) y la completitud;
+    con la sección 'experiencia' también los días de experiencia fusionados
+
+    Con crear=False no se crea la fila si falta (borrados en cascada del perfil).
+    Devuelve la fila de EstadisticasCV actualizada, o None si no hay perfil o fila.
+    """
+    if claves is None:
+        claves = [clave for clave, _, _, _ in SECCIONES_CV]
+    secciones = {clave: True for clave in claves}
+    campos = [f"n_{clave}" for clave in claves]
+
+    with transaction.atomic():
+        # El bloqueo del perfil serializa los recálculos concurrentes
+        perfil = DatosPersonales.objects.select_for_update().filter(pk=perfil_id).values('foto').first()
+        if perfil is None:
+            return None
+
+        if crear:
+            estadisticas, _ = EstadisticasCV.objects.get_or_create(perfil_id=perfil_id)
+        else:
+            estadisticas = EstadisticasCV.objects.filter(perfil_id=perfil_id).first()
+            if estadisticas is None:
+                return None
+
+        if campos:
+            datos = (
+                anotar_conteos_visibles(DatosPersonales.objects.filter(pk=perfil_id), secciones)
+                .values(*campos)
+                .first()
+            )
+            for clave in claves:
+                setattr(estadisticas, campo_contador(clave), datos[f"n_{clave}"])
+
+        if 'experiencia' in claves:
+            aplicar_experiencia(estadisticas, experiencia_de_perfiles([perfil_id])[perfil_id])
+
+        conteos = {clave: getattr(estadisticas, campo_contador(clave)) for clave in SECCIONES_COMPLETITUD}
+        estadisticas.completitud = calcular_completitud(conteos, bool(perfil['foto']))
+        estadisticas.save()
+
+    return estadisticas
+
+
+def obtener_estadisticas(perfil):
+    """
+    Estadísticas del perfil; las calcula si todavía no existen
+    """
+    try:
+        return perfil.estadisticas
+    except EstadisticasCV.DoesNotExist:
+        estadisticas = actualizar_estadisticas(perfil.pk)
+        perfil.estadisticas = estadisticas
+        return estadisticas
+
+
+def conteos_por_seccion(estadisticas):
+    """
+    {clave de sección: filas visibles} a partir de una fila de EstadisticasCV
+    """
+    return {clave: getattr(estadisticas, campo_contador(clave)) for clave, _, _, _ in SECCIONES_CV}
@@ -0,0 +1,162 @@
+"""
+Etiquetas normalizadas de ProductoAcademico.clasificador
+
+El clasificador sigue siendo el texto que edita el usuario ("Ingeniería,
+Bases de Datos"); signals.py lo refleja en Etiqueta / EtiquetaProducto
+cada vez que se guarda el producto. Las etiquetas se identifican por su
+clave sin tildes ni mayúsculas, así "Ingeniería" e "ingenieria" son la
+misma etiqueta. Las búsquedas por etiqueta y los conteos usan el índice
+único (etiqueta, producto) en lugar de recorrer y partir el texto.
+"""
+
+import unicodedata
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Etiqueta, EtiquetaProducto, ProductoAcademico
+
+
+def normalizar_etiqueta(texto):
+    """
+    Clave de una etiqueta: sin tildes, en minúsculas y con espacios simples
+    """
+    sin_tildes = ''.join(
+        caracter for caracter in unicodedata.normalize('NFKD', texto)
+        if not unicodedata.combining(caracter)
+    )
+    return ' '.join(sin_tildes.casefold().split())
+
+
+def etiquetas_de_texto(clasificador):
+    """
+    {clave: nombre} de un clasificador separado por comas (la primera forma gana)
+    """
+    etiquetas = {}
+    for nombre in (clasificador or '').split(','):
+        nombre = ' '.join(nombre.split())
+        clave = normalizar_etiqueta(nombre)[:100]
+        if clave and clave not in etiquetas:
+            etiquetas[clave] = nombre[:100]
+    return etiquetas
+
+
+def obtener_etiquetas(etiquetas):
+    """
+    {clave: id} de las etiquetas indicadas ({clave: nombre}), creando las que falten
+    """
+    if not etiquetas:
+        return {}
+
+    ids = dict(Etiqueta.objects.filter(clave__in=etiquetas).values_list('clave', 'pk'))
+    faltantes = [Etiqueta(clave=clave, nombre=nombre) for clave, nombre in etiquetas.items() if clave not in ids]
+    if faltantes:
+        # ignore_conflicts: otra transacción pudo crear la misma etiqueta
+        Etiqueta.objects.bulk_create(faltantes, ignore_conflicts=True)
+        ids = dict(Etiqueta.objects.filter(clave__in=etiquetas).values_list('clave', 'pk'))
+    return ids
+
+
+def sincronizar_etiquetas(producto):
+    """
+    Ajusta las etiquetas asignadas al producto según su clasificador
+    """
+    with transaction.atomic():
+        deseadas = set(obtener_etiquetas(etiquetas_de_texto(producto.clasificador)).values())
+        actuales = set(
+            EtiquetaProducto.objects.filter(producto=producto).values_list('etiqueta_id', flat=True)
+        )
+
+        if actuales - deseadas:
+            EtiquetaProducto.objects.filter(producto=producto, etiqueta_id__in=actuales - deseadas).delete()
+        if deseadas - actuales:
+            EtiquetaProducto.objects.bulk_create(
+                [EtiquetaProducto(producto=producto, etiqueta_id=etiqueta_id) for etiqueta_id in deseadas - actuales],
+                ignore_conflicts=True
+            )
+
+
+def sincronizar_todas(tamano_lote=1000):
+    """
+    Reconstruye las asignaciones de todos los productos (backfill)
+
+    Devuelve el número de productos procesados.
+    """
+    total = 0
+    productos = ProductoAcademico.objects.order_by('pk').only('pk', 'clasificador')
+    lote = []
+    for producto in productos.iterator(chunk_size=tamano_lote):
+        lote.append(producto)
+        if len(lote) >= tamano_lote:
+            _sincronizar_lote(lote)
+            total += len(lote)
+            lote = []
+    if lote:
+        _sincronizar_lote(lote)
+        total += len(lote)
+    return total
+
+
+def _sincronizar_lote(productos):
+    etiquetas_por_producto = {producto.pk: etiquetas_de_texto(producto.clasificador) for producto in productos}
+
+    todas = {}
+    for etiquetas in etiquetas_por_producto.values():
+        for clave, nombre in etiquetas.items():
+            todas.setdefault(clave, nombre)
+
+    with transaction.atomic():
+        ids = obtener_etiquetas(todas)
+        EtiquetaProducto.objects.filter(producto_id__in=etiquetas_por_producto).delete()
+        EtiquetaProducto.objects.bulk_create([
+            EtiquetaProducto(producto_id=producto_id, etiqueta_id=ids[clave])
+            for producto_id, etiquetas in etiquetas_por_producto.items()
+            for clave in etiquetas
+        ])
+
+
+# ======================================
+# CONSULTAS
+# ======================================
+
+def productos_con_etiqueta(texto, solo_visibles=True):
+    """
+    Productos académicos con la etiqueta indicada (se normaliza el texto)
+    """
+    productos = ProductoAcademico.objects.filter(asignaciones_etiqueta__etiqueta__clave=normalizar_etiqueta(texto))
+    if solo_visibles:
+        productos = productos.filter(
+            activarparaqueseveaenfront=True,
+            idperfilconqueestaactivo__perfilactivo=1
+        )
+    return productos
+
+
+def facetas_etiquetas(productos=None, limite=None):
+    """
+    [{'clave', 'nombre', 'total'}, ...] de las etiquetas con más productos
+
+    Args:
+        productos: queryset de ProductoAcademico a contar (por defecto, los visibles de CVs públicos)
+        limite: máximo de etiquetas a devolver
+    """
+    if productos is None:
+        productos = ProductoAcademico.objects.filter(
+            activarparaqueseveaenfront=True,
+            idperfilconqueestaactivo__perfilactivo=1
+        )
+
+    facetas = (
+        EtiquetaProducto.objects
+        .filter(producto__in=productos.values('pk'))
+        .values('etiqueta__clave', 'etiqueta__nombre')
+        .annotate(total=Count('pk'))
+        .order_by('-total', 'etiqueta__clave')
+    )
+    if limite:
+        facetas = facetas[:limite]
+
+    return [
+        {'clave': faceta['etiqueta__clave'], 'nombre': faceta['etiqueta__nombre'], 'total': faceta['total']}
+        for faceta in facetas
+    ]
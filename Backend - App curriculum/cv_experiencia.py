@@ -0,0 +1,269 @@
+"""
+Años de experiencia reales: periodos laborales solapados fusionados
+
+Dos trabajos simultáneos no suman el doble de experiencia. Este módulo
+carga las fechas de ExperienciaLaboral (visibles) de muchos perfiles a la
+vez como arrays de NumPy, en días ordinales, y fusiona los intervalos de
+cada perfil sin bucles de Python:
+
+    1. Ordena por (perfil, inicio). A cada perfil se le suma un desplazamiento
+       propio, así los intervalos de perfiles distintos nunca se tocan.
+    2. El máximo acumulado de los fines indica hasta dónde llega el bloque
+       abierto; un intervalo que empieza después de ese máximo abre un bloque
+       nuevo.
+    3. Los días de cada bloque se suman por perfil y se reparten por año
+       calendario.
+
+Las fechas de fin son inclusivas y un trabajo sin fecha de fin llega hasta
+`hoy`. El resultado se guarda en EstadisticasCV (dias_experiencia,
+experiencia_por_ano) para filtrar con el ORM ("más de 5 años"). Como los
+trabajos en curso crecen cada día, calcular_experiencia_cv debe correr a
+diario; signals.py recalcula el perfil cuando cambia su experiencia.
+"""
+
+from datetime import date
+
+import numpy as np
+from django.db import transaction
+
+from .models import DIAS_POR_ANO, DatosPersonales, EstadisticasCV, ExperienciaLaboral
+
+
+# Mayor que cualquier día ordinal (date.max.toordinal() == 3652059)
+DESPLAZAMIENTO_PERFIL = 1 << 22
+
+CAMPOS_EXPERIENCIA = ['dias_experiencia', 'experiencia_por_ano', 'fecha_calculo_experiencia']
+
+# (clave, etiqueta, años mínimos, años máximos) de los tramos de filtrado
+TRAMOS_EXPERIENCIA = (
+    ('0-1', 'Menos de 1 año', None, 1),
+    ('1-3', '1 - 3 años', 1, 3),
+    ('3-5', '3 - 5 años', 3, 5),
+    ('5-10', '5 - 10 años', 5, 10),
+    ('10+', 'Más de 10 años', 10, None),
+)
+
+
+# ======================================
+# MOTOR DE INTERVALOS
+# ======================================
+
+def _ordinales(fechas, por_defecto):
+    """
+    Array int64 de días ordinales; None se reemplaza por `por_defecto`
+    """
+    return np.fromiter(
+        (fecha.toordinal() if fecha is not None else por_defecto for fecha in fechas),
+        dtype=np.int64,
+        count=len(fechas)
+    )
+
+
+def fusionar_intervalos(perfiles, inicios, fines):
+    """
+    Fusiona los intervalos solapados o contiguos de cada perfil
+
+    Args:
+        perfiles, inicios, fines: arrays int64 del mismo largo; los intervalos
+            son [inicio, fin) en días ordinales
+
+    Devuelve (perfiles, inicios, fines) de los bloques fusionados, ordenados
+    por perfil e inicio.
+    """
+    if len(perfiles) == 0:
+        vacio = np.empty(0, dtype=np.int64)
+        return vacio, vacio, vacio
+
+    orden = np.lexsort((inicios, perfiles))
+    perfiles, inicios, fines = perfiles[orden], inicios[orden], fines[orden]
+
+    # Índice denso de perfil para que el desplazamiento no desborde int64
+    _, grupos = np.unique(perfiles, return_inverse=True)
+    desplazamiento = grupos.astype(np.int64) * DESPLAZAMIENTO_PERFIL
+    alcance = np.maximum.accumulate(fines + desplazamiento)
+
+    nuevo_bloque = np.empty(len(perfiles), dtype=bool)
+    nuevo_bloque[0] = True
+    nuevo_bloque[1:] = (inicios[1:] + desplazamiento[1:]) > alcance[:-1]
+
+    primeros = np.flatnonzero(nuevo_bloque)
+    ultimos = np.append(primeros[1:] - 1, len(perfiles) - 1)
+
+    return perfiles[primeros], inicios[primeros], alcance[ultimos] - desplazamiento[ultimos]
+
+
+def dias_por_perfil(perfiles, inicios, fines):
+    """
+    (ids de perfil, días) sumando bloques ya fusionados
+    """
+    ids, grupos = np.unique(perfiles, return_inverse=True)
+    return ids, np.bincount(grupos, weights=fines - inicios, minlength=len(ids)).astype(np.int64)
+
+
+def dias_por_ano(perfiles, inicios, fines):
+    """
+    (ids de perfil, años, días) de los bloques fusionados repartidos por año calendario
+
+    Cada bloque se replica una vez por año que abarca y se recorta a ese año.
+    """
+    if len(perfiles) == 0:
+        vacio = np.empty(0, dtype=np.int64)
+        return vacio, vacio, vacio
+
+    ano_min = date.fromordinal(int(inicios.min())).year
+    ano_max = date.fromordinal(int(fines.max() - 1)).year
+    # Día ordinal del 1 de enero de cada año, más el del año siguiente al último
+    limites = np.array([date(ano, 1, 1).toordinal() for ano in range(ano_min, ano_max + 2)], dtype=np.int64)
+
+    primer_ano = np.searchsorted(limites, inicios, side='right') - 1
+    ultimo_ano = np.searchsorted(limites, fines - 1, side='right') - 1
+    repeticiones = ultimo_ano - primer_ano + 1
+
+    bloque = np.repeat(np.arange(len(perfiles)), repeticiones)
+    # Posición del año dentro de su bloque: 0, 1, 2, ...
+    posicion = np.arange(len(bloque)) - np.repeat(np.cumsum(repeticiones) - repeticiones, repeticiones)
+    ano = primer_ano[bloque] + posicion
+
+    dias = np.minimum(fines[bloque], limites[ano + 1]) - np.maximum(inicios[bloque], limites[ano])
+
+    claves = perfiles[bloque] * (len(limites) - 1) + ano
+    unicas, indices = np.unique(claves, return_inverse=True)
+    totales = np.bincount(indices, weights=dias).astype(np.int64)
+    return unicas // (len(limites) - 1), unicas % (len(limites) - 1) + ano_min, totales
+
+
+def calcular_experiencia(perfiles, inicios, fines, hoy=None):
+    """
+    {perfil_id: (días, {año: días})} a partir de las fechas de experiencia
+
+    Args:
+        perfiles: ids de perfil, una por fila de experiencia
+        inicios, fines: fechas (date) de inicio y de fin; fin None = trabajo en curso
+        hoy: fecha de corte (por defecto, hoy)
+    """
+    hoy = (hoy or date.today()).toordinal()
+    perfiles = np.asarray(perfiles, dtype=np.int64)
+    inicios = _ordinales(inicios, hoy)
+    # Fin inclusivo; nada cuenta más allá de hoy ni antes del inicio
+    fines = np.minimum(_ordinales(fines, hoy), hoy) + 1
+    fines = np.maximum(fines, np.minimum(inicios, hoy + 1))
+    inicios = np.minimum(inicios, fines)
+
+    perfiles, inicios, fines = fusionar_intervalos(perfiles, inicios, fines)
+    ids, totales = dias_por_perfil(perfiles, inicios, fines)
+    # tolist() convierte a int de Python de una vez (iterar escalares de NumPy es lento)
+    resultado = {perfil_id: (dias, {}) for perfil_id, dias in zip(ids.tolist(), totales.tolist())}
+
+    perfiles_ano, anos, dias_ano = dias_por_ano(perfiles, inicios, fines)
+    con_dias = dias_ano > 0
+    for perfil_id, ano, dias in zip(
+        perfiles_ano[con_dias].tolist(), anos[con_dias].astype(str).tolist(), dias_ano[con_dias].tolist()
+    ):
+        resultado[perfil_id][1][ano] = dias
+    return resultado
+
+
+# ======================================
+# CARGA Y ALMACENAMIENTO
+# ======================================
+
+def cargar_intervalos(perfil_ids):
+    """
+    (perfiles, inicios, fines) de la experiencia visible de los perfiles indicados
+    """
+    filas = list(
+        ExperienciaLaboral.objects
+        .filter(idperfilconqueestaactivo__in=perfil_ids, activarparaqueseveaenfront=True)
+        .values_list('idperfilconqueestaactivo', 'fechainiciogestion', 'fechafingestion')
+    )
+    if not filas:
+        return (), (), ()
+    return tuple(zip(*filas))
+
+
+def experiencia_de_perfiles(perfil_ids, hoy=None):
+    """
+    {perfil_id: (días, {año: días})} de los perfiles indicados (0 si no tienen experiencia)
+    """
+    experiencia = calcular_experiencia(*cargar_intervalos(perfil_ids), hoy=hoy)
+    return {perfil_id: experiencia.get(perfil_id, (0, {})) for perfil_id in perfil_ids}
+
+
+def aplicar_experiencia(estadisticas, experiencia, hoy=None):
+    """
+    Copia (días, {año: días}) a una fila de EstadisticasCV, sin guardarla
+    """
+    estadisticas.dias_experiencia, estadisticas.experiencia_por_ano = experiencia
+    estadisticas.fecha_calculo_experiencia = hoy or date.today()
+
+
+def actualizar_experiencia(perfil_ids=None, hoy=None, tamano_lote=5000, progreso=None):
+    """
+    Recalcula y guarda la experiencia de los perfiles indicados (todos si es None)
+
+    Procesa los perfiles en lotes de `tamano_lote`: una query de fechas y
+    unos pocos UPDATE por lote. Solo actualiza perfiles que ya tienen
+    EstadisticasCV (las crea actualizar_estadisticas). Devuelve el número de
+    perfiles actualizados.
+    """
+    hoy = hoy or date.today()
+    estadisticas = EstadisticasCV.objects.order_by('perfil_id')
+    if perfil_ids is not None:
+        estadisticas = estadisticas.filter(perfil_id__in=perfil_ids)
+    ids = list(estadisticas.values_list('perfil_id', flat=True))
+
+    for inicio in range(0, len(ids), tamano_lote):
+        lote = ids[inicio:inicio + tamano_lote]
+        experiencia = experiencia_de_perfiles(lote, hoy=hoy)
+
+        filas = []
+        for perfil_id in lote:
+            fila = EstadisticasCV(perfil_id=perfil_id)
+            aplicar_experiencia(fila, experiencia[perfil_id], hoy)
+            filas.append(fila)
+
+        with transaction.atomic():
+            EstadisticasCV.objects.bulk_update(filas, CAMPOS_EXPERIENCIA, batch_size=1000)
+
+        if progreso:
+            progreso(inicio + len(lote), len(ids))
+
+    return len(ids)
+
+
+# ======================================
+# CONSULTAS
+# ======================================
+
+def dias_de_anos(anos):
+    return int(round(anos * DIAS_POR_ANO))
+
+
+def tramo_experiencia(dias):
+    """
+    Clave del tramo de TRAMOS_EXPERIENCIA al que pertenecen `dias` de experiencia
+    """
+    for clave, _, _, maximo in TRAMOS_EXPERIENCIA:
+        if maximo is None or dias < dias_de_anos(maximo):
+            return clave
+
+
+def filtrar_por_experiencia(perfiles, anos_minimos=None, anos_maximos=None):
+    """
+    Filtra un queryset de DatosPersonales por años de experiencia guardados
+    """
+    if anos_minimos is not None:
+        perfiles = perfiles.filter(estadisticas__dias_experiencia__gte=dias_de_anos(anos_minimos))
+    if anos_maximos is not None:
+        perfiles = perfiles.filter(estadisticas__dias_experiencia__lt=dias_de_anos(anos_maximos))
+    return perfiles
+
+
+def perfiles_con_experiencia(anos_minimos):
+    """
+    CVs públicos con al menos `anos_minimos` años de experiencia, de más a menos
+    """
+    return (
+        filtrar_por_experiencia(DatosPersonales.objects.filter(perfilactivo=1), anos_minimos)
+        .order_by('-estadisticas__dias_experiencia', 'pk')
+    )
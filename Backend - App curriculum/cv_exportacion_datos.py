@@ -0,0 +1,163 @@
+"""
+Exportación de todos los datos de un usuario en un ZIP ("descargar mis datos")
+
+El ZIP contiene:
+
+    datos.json    cuenta, perfil, todas las filas de cada sección (también
+                  las ocultas) y búsquedas guardadas; cada archivo subido
+                  aparece con su ruta dentro del ZIP
+    archivos/     foto, certificados e imágenes de productos, con la misma
+                  ruta que tienen en el storage
+    reporte.csv   estado de cada archivo (los que faltan en el storage no
+                  detienen la exportación)
+
+Todo se consulta antes de empezar a responder; después solo se copian
+archivos. Cada archivo pasa del storage al ZIP parte por parte y cada parte
+se entrega a la respuesta apenas zipfile la escribe (como en
+pdf_bulk_export), así que la memoria no crece con el tamaño de los
+certificados y no se usan archivos temporales.
+"""
+
+import csv
+import io
+import itertools
+import json
+import logging
+import zipfile
+from functools import partial
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.utils import timezone
+
+from .models import BusquedaGuardada, DatosPersonales
+from .cv_documento import serializar_fila, serializar_perfil
+from .cv_snapshot import SECCIONES_CV
+from .pdf_bulk_export import SalidaStreaming
+
+
+logger = logging.getLogger(__name__)
+
+DIRECTORIO_ARCHIVOS = 'archivos'
+
+CAMPOS_USUARIO = ('username', 'email', 'first_name', 'last_name', 'date_joined', 'last_login')
+
+
+def _tamano_parte():
+    return getattr(settings, 'CV_EXPORTACION_TAMANO_PARTE', 64 * 1024)
+
+
+def leer_en_partes(archivo):
+    """
+    Contenido de un FieldFile por partes, sin leerlo entero
+
+    AzureMediaStorage lo descarga por partes del blob; con el storage local
+    se lee el archivo abierto.
+    """
+    storage = archivo.storage
+    if hasattr(storage, 'leer_en_partes'):
+        yield from storage.leer_en_partes(archivo.name)
+        return
+    with storage.open(archivo.name, 'rb') as abierto:
+        yield from abierto.chunks(_tamano_parte())
+
+
+# ======================================
+# DATOS
+# ======================================
+
+def _serializar(instancia, archivos, serializar=serializar_fila):
+    """
+    Fila serializada con cada archivo como su ruta dentro del ZIP; los
+    archivos se agregan a `archivos` ({ruta en el ZIP: FieldFile})
+    """
+    datos = serializar(instancia)
+    for campo in type(instancia)._meta.concrete_fields:
+        if isinstance(campo, models.FileField):
+            archivo = getattr(instancia, campo.name)
+            ruta = f"{DIRECTORIO_ARCHIVOS}/{archivo.name}" if archivo else ''
+            if ruta:
+                archivos[ruta] = archivo
+            datos[campo.attname] = ruta
+    return datos
+
+
+def datos_de_usuario(usuario):
+    """
+    (datos para datos.json, {ruta en el ZIP: FieldFile}) de un usuario
+
+    Una query por sección; el perfil puede no existir todavía.
+    """
+    archivos = {}
+    datos = {
+        'exportado': timezone.now().isoformat(),
+        'usuario': {campo: getattr(usuario, campo) for campo in CAMPOS_USUARIO},
+        'perfil': None,
+        'secciones': {},
+        'busquedas_guardadas': [
+            serializar_fila(busqueda) for busqueda in BusquedaGuardada.objects.filter(usuario=usuario)
+        ],
+    }
+
+    perfil = DatosPersonales.objects.filter(usuario=usuario).first()
+    if perfil is not None:
+        datos['perfil'] = _serializar(perfil, archivos, partial(serializar_perfil, completo=True))
+        for clave, relacion, _, orden in SECCIONES_CV:
+            datos['secciones'][clave] = [
+                _serializar(fila, archivos) for fila in getattr(perfil, relacion).order_by(orden)
+            ]
+    return datos, archivos
+
+
+# ======================================
+# ZIP
+# ======================================
+
+def _zip_en_partes(datos, archivos):
+    salida = SalidaStreaming()
+    reporte = io.StringIO()
+    escritor = csv.writer(reporte)
+    escritor.writerow(['archivo', 'estado', 'error'])
+
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as archivo_zip:
+        archivo_zip.writestr('datos.json', json.dumps(datos, cls=DjangoJSONEncoder, ensure_ascii=False, indent=2))
+        yield salida.vaciar()
+
+        for ruta, archivo in archivos.items():
+            # Fotos y PDFs ya vienen comprimidos: se guardan tal cual
+            info = zipfile.ZipInfo(ruta, date_time=timezone.localtime().timetuple()[:6])
+            info.compress_type = zipfile.ZIP_STORED
+            try:
+                # La primera parte antes de crear la entrada: un archivo que
+                # falta en el storage no deja una entrada vacía
+                partes = leer_en_partes(archivo)
+                primera = next(partes, b'')
+                with archivo_zip.open(info, 'w') as destino:
+                    for parte in itertools.chain([primera], partes):
+                        destino.write(parte)
+                        datos_zip = salida.vaciar()
+                        if datos_zip:
+                            yield datos_zip
+            except Exception as e:
+                # Lo que alcanzó a copiarse queda en el ZIP; el reporte lo marca
+                logger.warning('Exportación de datos: no se pudo leer %s: %s', archivo.name, e)
+                escritor.writerow([ruta, 'error', f"{e.__class__.__name__}: {e}"])
+            else:
+                escritor.writerow([ruta, 'ok', ''])
+            yield salida.vaciar()
+
+        archivo_zip.writestr('reporte.csv', reporte.getvalue())
+
+    yield salida.vaciar()
+
+
+def exportar_datos_usuario(usuario):
+    """
+    Partes del ZIP con todos los datos y archivos del usuario
+
+    Las queries se hacen al llamarla; el iterable devuelto solo lee archivos
+    del storage, así puede consumirse desde una StreamingHttpResponse.
+    """
+    datos, archivos = datos_de_usuario(usuario)
+    return _zip_en_partes(datos, archivos)
@@ -0,0 +1,320 @@
+"""
+Índice de facetas en memoria para filtrar perfiles (reclutadores)
+
+Cada proceso guarda, por faceta y valor, un bitmap comprimido (roaring) con
+los ids de los perfiles que lo tienen:
+
+    nacionalidad, licenciaconducir, estadocivil, sexo, perfilactivo
+    experiencia   tramo de TRAMOS_EXPERIENCIA según EstadisticasCV.dias_experiencia
+    etiqueta      claves de las etiquetas de sus productos académicos visibles
+
+Un filtro es OR entre los valores elegidos de una faceta y AND entre
+facetas. El conteo de cada opción se calcula con los filtros de las demás
+facetas (el de la propia no), así el reclutador ve cuántos perfiles
+obtendría al cambiarla. Todo sale de intersecciones de bitmaps, sin queries.
+
+Como el índice de slugs, vive en memoria del proceso. signals.py actualiza
+el perfil que cambió en el proceso que hizo el cambio y deja su id en la
+caché junto a una generación compartida; los demás procesos recargan solo
+esos perfiles en su siguiente consulta, o reconstruyen todo si se
+perdieron cambios. Se construye en el arranque si CV_FACETAS_PRECARGAR
+está activo y, si no, en la primera consulta.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+
+from django.conf import settings
+from django.core.cache import caches
+from pyroaring import BitMap
+
+from .cv_experiencia import TRAMOS_EXPERIENCIA, tramo_experiencia
+
+
+logger = logging.getLogger(__name__)
+
+CLAVE_GENERACION = 'cv_facetas:generacion'
+
+# (faceta, título) en el orden en que se muestran
+FACETAS = (
+    ('perfilactivo', 'Visibilidad'),
+    ('experiencia', 'Experiencia'),
+    ('nacionalidad', 'Nacionalidad'),
+    ('sexo', 'Sexo'),
+    ('estadocivil', 'Estado civil'),
+    ('licenciaconducir', 'Licencia de conducir'),
+    ('etiqueta', 'Etiquetas'),
+)
+
+CAMPOS_PERFIL = ('perfilactivo', 'nacionalidad', 'sexo', 'estadocivil', 'licenciaconducir')
+
+# Cambios pendientes que un proceso recarga uno a uno antes de reconstruir todo
+MAX_CAMBIOS_INCREMENTALES = 500
+
+
+def _cache():
+    return caches[getattr(settings, 'CV_PUBLICO_CACHE_ALIAS', 'default')]
+
+
+def _clave_cambio(generacion):
+    return f"cv_facetas:cambio:{generacion}"
+
+
+def _etiquetas_fijas():
+    """
+    {faceta: {valor: etiqueta}} de las facetas con choices
+    """
+    from .models import DatosPersonales
+
+    etiquetas = {
+        campo: {str(valor): str(texto) for valor, texto in DatosPersonales._meta.get_field(campo).choices}
+        for campo in ('sexo', 'estadocivil', 'licenciaconducir')
+    }
+    etiquetas['perfilactivo'] = {'1': 'Público', '0': 'Privado'}
+    etiquetas['experiencia'] = {clave: texto for clave, texto, _, _ in TRAMOS_EXPERIENCIA}
+    return etiquetas
+
+
+def valores_facetas(perfil_ids=None, nombres_etiqueta=None):
+    """
+    {perfil_id: [(faceta, valor), ...]} desde la base de datos (dos queries)
+
+    Args:
+        perfil_ids: perfiles a cargar (por defecto, todos)
+        nombres_etiqueta: dict opcional que se completa con {clave: nombre} de las etiquetas vistas
+    """
+    from .models import DatosPersonales, EtiquetaProducto
+
+    perfiles = DatosPersonales.objects.order_by()
+    etiquetas = EtiquetaProducto.objects.filter(producto__activarparaqueseveaenfront=True).order_by()
+    if perfil_ids is not None:
+        perfiles = perfiles.filter(pk__in=perfil_ids)
+        etiquetas = etiquetas.filter(producto__idperfilconqueestaactivo__in=perfil_ids)
+
+    valores = {}
+    filas = perfiles.values_list('pk', *CAMPOS_PERFIL, 'estadisticas__dias_experiencia')
+    for perfil_id, *campos, dias in filas.iterator(chunk_size=5000):
+        valores[perfil_id] = [
+            *((faceta, str(valor)) for faceta, valor in zip(CAMPOS_PERFIL, campos) if valor not in (None, '')),
+            ('experiencia', tramo_experiencia(dias or 0)),
+        ]
+
+    filas = etiquetas.values_list('producto__idperfilconqueestaactivo', 'etiqueta__clave', 'etiqueta__nombre')
+    for perfil_id, clave, nombre in filas.distinct().iterator(chunk_size=5000):
+        if perfil_id in valores:
+            valores[perfil_id].append(('etiqueta', clave))
+            if nombres_etiqueta is not None:
+                nombres_etiqueta.setdefault(clave, nombre)
+    return valores
+
+
+@dataclass
+class OpcionFaceta:
+    valor: str
+    etiqueta: str
+    total: int
+    seleccionada: bool = False
+
+
+@dataclass
+class ResultadoFacetas:
+    """
+    Perfiles que cumplen los filtros y conteos de cada opción
+    """
+    ids: BitMap
+    facetas: dict = field(default_factory=dict)
+
+    @property
+    def total(self):
+        return len(self.ids)
+
+
+class IndiceFacetas:
+    """
+    Bitmaps de facetas de los perfiles de este proceso
+    """
+
+    def __init__(self):
+        self._bitmaps = None
+        self._todos = BitMap()
+        self._nombres_etiqueta = {}
+        self._generacion = None
+        self._construido = 0.0
+        self._lock = threading.RLock()
+
+    # ======================================
+    # CARGA
+    # ======================================
+
+    def _generacion_compartida(self):
+        return _cache().get_or_set(CLAVE_GENERACION, 1, None)
+
+    def _cargar(self, perfil_ids=None):
+        return valores_facetas(perfil_ids, self._nombres_etiqueta)
+
+    def reconstruir(self):
+        """
+        Construye todos los bitmaps desde la base de datos
+        """
+        generacion = self._generacion_compartida()
+        inicio = time.monotonic()
+
+        posiciones = {}
+        for perfil_id, pares in self._cargar().items():
+            for par in pares:
+                posiciones.setdefault(par, []).append(perfil_id)
+
+        bitmaps = {faceta: {} for faceta, _ in FACETAS}
+        todos = BitMap()
+        for (faceta, valor), ids in posiciones.items():
+            bitmap = BitMap(ids)
+            bitmaps[faceta][valor] = bitmap
+            todos |= bitmap
+
+        for bitmap in todos, *(bm for valores in bitmaps.values() for bm in valores.values()):
+            bitmap.run_optimize()
+
+        with self._lock:
+            self._bitmaps = bitmaps
+            self._todos = todos
+            self._generacion = generacion
+            self._construido = time.monotonic()
+
+        logger.info('Índice de facetas construido: %s perfiles en %.2fs', len(todos), time.monotonic() - inicio)
+
+    def _aplicar(self, perfil_ids):
+        """
+        Recarga en los bitmaps los valores actuales de los perfiles indicados
+        """
+        valores = self._cargar(perfil_ids)
+        quitar = BitMap(perfil_ids)
+        with self._lock:
+            for faceta_valores in self._bitmaps.values():
+                for bitmap in faceta_valores.values():
+                    bitmap.difference_update(quitar)
+            self._todos.difference_update(quitar)
+
+            for perfil_id, pares in valores.items():
+                self._todos.add(perfil_id)
+                for faceta, valor in pares:
+                    self._bitmaps[faceta].setdefault(valor, BitMap()).add(perfil_id)
+
+    def _sincronizar(self):
+        """
+        Pone al día este proceso: nada, los perfiles cambiados o todo
+        """
+        generacion = self._generacion_compartida()
+        refresco = getattr(settings, 'CV_FACETAS_REFRESCO', 3600)
+        if self._bitmaps is None or (refresco and time.monotonic() - self._construido > refresco):
+            self.reconstruir()
+            return
+        if self._generacion == generacion:
+            return
+
+        pendientes = range(self._generacion + 1, generacion + 1)
+        cambios = {}
+        if 0 < len(pendientes) <= MAX_CAMBIOS_INCREMENTALES:
+            cambios = _cache().get_many([_clave_cambio(g) for g in pendientes])
+        if not pendientes or len(cambios) < len(pendientes):
+            # Se perdieron cambios (caché expirada, invalidación total): desde cero
+            self.reconstruir()
+            return
+
+        self._aplicar(set(cambios.values()))
+        with self._lock:
+            self._generacion = max(self._generacion, generacion)
+
+    # ======================================
+    # CAMBIOS
+    # ======================================
+
+    def actualizar_perfil(self, perfil_id):
+        """
+        Refleja el cambio de un perfil en este proceso y lo anuncia a los demás
+        """
+        cache = _cache()
+        try:
+            generacion = cache.incr(CLAVE_GENERACION)
+        except ValueError:
+            cache.set(CLAVE_GENERACION, 1, None)
+            return
+        cache.set(_clave_cambio(generacion), perfil_id, getattr(settings, 'CV_FACETAS_CAMBIOS_TTL', 3600))
+
+        if self._bitmaps is None:
+            return
+        self._aplicar({perfil_id})
+        with self._lock:
+            # Este proceso ya está al día: no hace falta volver a cargar el perfil
+            if self._generacion == generacion - 1:
+                self._generacion = generacion
+
+    def invalidar(self):
+        """
+        Obliga a todos los procesos a reconstruir (cambios masivos sin signals)
+        """
+        cache = _cache()
+        try:
+            cache.incr(CLAVE_GENERACION)
+        except ValueError:
+            cache.set(CLAVE_GENERACION, 1, None)
+
+    # ======================================
+    # CONSULTA
+    # ======================================
+
+    def filtrar(self, filtros=None):
+        """
+        Perfiles que cumplen `filtros` y conteo de cada opción de cada faceta
+
+        Args:
+            filtros: {faceta: valores elegidos}; OR dentro de una faceta, AND entre facetas
+        """
+        self._sincronizar()
+        filtros = {faceta: set(valores) for faceta, valores in (filtros or {}).items() if valores}
+
+        with self._lock:
+            bitmaps = self._bitmaps
+            todos = self._todos
+            mascaras = {
+                faceta: BitMap.union(*(bitmaps[faceta].get(valor, BitMap()) for valor in valores))
+                for faceta, valores in filtros.items() if faceta in bitmaps
+            }
+
+            ids = BitMap.intersection(todos, *mascaras.values()) if mascaras else BitMap(todos)
+
+            etiquetas = _etiquetas_fijas()
+            facetas = {}
+            for faceta, _ in FACETAS:
+                otras = [mascara for nombre, mascara in mascaras.items() if nombre != faceta]
+                base = BitMap.intersection(todos, *otras) if otras else todos
+                elegidos = filtros.get(faceta, set())
+
+                opciones = []
+                for valor, bitmap in bitmaps[faceta].items():
+                    total = bitmap.intersection_cardinality(base)
+                    if total or valor in elegidos:
+                        nombre = etiquetas.get(faceta, {}).get(valor) or self._nombres_etiqueta.get(valor, valor)
+                        opciones.append(OpcionFaceta(valor, nombre, total, valor in elegidos))
+
+                opciones.sort(key=lambda opcion: (-opcion.total, opcion.etiqueta))
+                facetas[faceta] = opciones
+
+        return ResultadoFacetas(ids=ids, facetas=facetas)
+
+
+indice_facetas = IndiceFacetas()
+
+
+def precargar_facetas():
+    """
+    Construye el índice en segundo plano al arrancar el proceso
+    """
+    def construir():
+        try:
+            indice_facetas.reconstruir()
+        except Exception:
+            logger.exception('No se pudo precargar el índice de facetas')
+
+    threading.Thread(target=construir, name='precargar-facetas', daemon=True).start()
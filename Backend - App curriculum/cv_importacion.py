@@ -0,0 +1,513 @@
+"""
+Importación masiva de perfiles (cohortes) desde CSV o JSON Lines
+
+Las filas se leen de a una y se procesan en lotes de `tamano_lote`:
+
+    1. Validación fila a fila con DatosPersonalesForm, ExperienciaLaboralForm
+       y CursoRealizadoForm: las mismas reglas que la web y los validadores
+       de los modelos, salvo la unicidad.
+    2. Unicidad en bloque: una query IN por lote para cédulas, usuarios y
+       slugs, más los repetidos dentro del propio archivo.
+    3. Inserción con bulk_create dentro de un savepoint por lote. Si el lote
+       falla (otro proceso guardó la misma cédula entre la validación y el
+       INSERT), se reintenta fila por fila para aislar la culpable.
+
+Un perfil con errores (en sus datos o en cualquiera de sus experiencias o
+cursos) no se importa y va al reporte de errores; el resto sigue.
+bulk_create no dispara signals: tras cada lote se recalculan estadísticas,
+documento, índice de búsqueda y búsquedas guardadas de los perfiles
+tocados, y al final se invalidan los índices en memoria.
+
+Formatos:
+    CSV          una fila por perfil con las columnas de DatosPersonalesForm,
+                 más usuario (por defecto, la cédula), email y perfilactivo.
+                 Las experiencias y los cursos van en CSV aparte, con la
+                 columna numerocedula del perfil.
+    JSON Lines   un objeto por línea con los mismos campos y las listas
+                 opcionales "experiencias" y "cursos".
+"""
+
+import codecs
+import csv
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, models, transaction
+from django.utils import timezone
+
+from .forms import CursoRealizadoForm, ExperienciaLaboralForm, PerfilImportacionForm
+from .models import CursoRealizado, DatosPersonales, ExperienciaLaboral
+from .cv_busqueda import actualizar_indice_busqueda
+from .cv_busquedas_guardadas import reevaluar_perfiles
+from .cv_contadores import reconciliar_contadores
+from .cv_documento import actualizar_documento
+from .cv_estadisticas import actualizar_estadisticas
+from .cv_facetas import indice_facetas
+from .cv_page_cache import invalidar_cv_publico
+from .cv_slug_index import indice_slugs
+
+
+TAMANO_LOTE = 500
+
+VALORES_VERDADEROS = {'1', 'true', 'si', 'sí', 'x'}
+
+FORMATOS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.json': 'jsonl',
+}
+
+
+# (formulario, modelo) de las filas hijas que se pueden importar
+SECCIONES_IMPORTACION = {
+    'experiencias': (ExperienciaLaboralForm, ExperienciaLaboral),
+    'cursos': (CursoRealizadoForm, CursoRealizado),
+}
+
+
+# ======================================
+# LECTURA
+# ======================================
+
+def formato_de_archivo(nombre):
+    """
+    'csv' o 'jsonl' según la extensión; ValueError si no es ninguno
+    """
+    extension = '.' + nombre.rsplit('.', 1)[-1].lower() if '.' in nombre else ''
+    if extension not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {nombre} (se espera {', '.join(FORMATOS)})")
+    return FORMATOS[extension]
+
+
+def validar_codificacion(archivo, codificacion='utf-8-sig'):
+    """
+    ValueError si un archivo subido no está en UTF-8; lo recorre por partes
+    sin guardarlo en memoria y lo deja al principio para leerlo de nuevo
+    """
+    decodificador = codecs.getincrementaldecoder(codificacion)()
+    try:
+        for parte in archivo.chunks():
+            decodificador.decode(parte)
+        decodificador.decode(b'', final=True)
+    except UnicodeDecodeError as error:
+        raise ValueError(f"El archivo no está codificado en UTF-8: {error.reason}")
+    finally:
+        archivo.seek(0)
+
+
+def leer_csv(archivo):
+    """
+    (línea, fila) de un CSV con encabezados, sin cargarlo entero
+    """
+    lector = csv.DictReader(archivo)
+    for fila in lector:
+        yield lector.line_num, {
+            clave.strip(): (valor or '').strip()
+            for clave, valor in fila.items()
+            if clave
+        }
+
+
+def leer_json_lines(archivo):
+    """
+    (línea, objeto) de un JSON Lines; las líneas ilegibles llegan como None
+    """
+    for linea, texto in enumerate(archivo, start=1):
+        if not texto.strip():
+            continue
+        try:
+            fila = json.loads(texto)
+        except json.JSONDecodeError:
+            fila = None
+        yield linea, fila if isinstance(fila, dict) else None
+
+
+def leer_filas(archivo, formato):
+    return leer_csv(archivo) if formato == 'csv' else leer_json_lines(archivo)
+
+
+def _lotes(filas, tamano):
+    filas = iter(filas)
+    while lote := list(islice(filas, tamano)):
+        yield lote
+
+
+# ======================================
+# VALIDACIÓN
+# ======================================
+
+@dataclass
+class ErrorImportacion:
+    linea: int
+    referencia: str
+    campo: str
+    mensaje: str
+
+
+@dataclass
+class ResultadoImportacion:
+    perfiles: int = 0
+    filas: Counter = field(default_factory=Counter)
+    duplicadas: int = 0
+    errores: list = field(default_factory=list)
+    perfil_ids: set = field(default_factory=set)
+
+    @property
+    def filas_rechazadas(self):
+        return len({error.linea for error in self.errores})
+
+
+@dataclass
+class _Registro:
+    """
+    Un perfil (o solo filas hijas de un perfil existente) con lo que se va a insertar
+    """
+    linea: int
+    referencia: str = ''
+    usuario: User = None
+    perfil: DatosPersonales = None
+    perfil_id: int = None
+    hijas: dict = field(default_factory=dict)
+    errores: list = field(default_factory=list)
+
+    def error(self, campo, mensaje):
+        self.errores.append(ErrorImportacion(self.linea, self.referencia, campo, mensaje))
+
+    def instancias(self):
+        return [self.usuario, self.perfil, *(fila for filas in self.hijas.values() for fila in filas)]
+
+
+def datos_formulario(clase_formulario, fila):
+    """
+    Datos para el formulario: lo que falta en la fila toma el valor por
+    defecto del modelo (un checkbox ausente en un form HTML sería False)
+    """
+    modelo = clase_formulario._meta.model
+    datos = {}
+    for nombre in clase_formulario._meta.fields:
+        campo = modelo._meta.get_field(nombre)
+        valor = fila.get(nombre)
+        if valor is None or valor == '':
+            valor = campo.get_default() if campo.has_default() else ''
+        elif isinstance(campo, models.BooleanField) and isinstance(valor, str):
+            valor = valor.strip().lower() in VALORES_VERDADEROS
+        datos[nombre] = valor
+    return datos
+
+
+def _validar(registro, clase_formulario, fila, prefijo=''):
+    """
+    Instancia sin guardar si la fila es válida; si no, anota los errores
+    """
+    formulario = clase_formulario(data=datos_formulario(clase_formulario, fila))
+    if formulario.is_valid():
+        return formulario.save(commit=False)
+    for campo, mensajes in formulario.errors.items():
+        nombre = '' if campo == '__all__' else campo
+        for mensaje in mensajes:
+            registro.error(f"{prefijo}{nombre}", mensaje)
+    return None
+
+
+def _validar_hijas(registro, fila):
+    for seccion, (clase_formulario, _) in SECCIONES_IMPORTACION.items():
+        filas = fila.get(seccion) or []
+        if not isinstance(filas, list):
+            registro.error(seccion, 'Debe ser una lista')
+            continue
+        for posicion, hija in enumerate(filas):
+            if not isinstance(hija, dict):
+                registro.error(f"{seccion}[{posicion}]", 'Debe ser un objeto')
+                continue
+            instancia = _validar(registro, clase_formulario, hija, f"{seccion}[{posicion}].")
+            if instancia is not None:
+                registro.hijas.setdefault(seccion, []).append(instancia)
+
+
+def _validar_perfil(linea, fila):
+    registro = _Registro(linea)
+    if fila is None:
+        registro.error('', 'La línea no es un objeto JSON válido')
+        return registro
+
+    registro.referencia = str(fila.get('numerocedula') or '')
+    registro.perfil = _validar(registro, PerfilImportacionForm, fila)
+
+    usuario = User(
+        username=str(fila.get('usuario') or registro.referencia),
+        email=str(fila.get('email') or ''),
+        first_name=str(fila.get('nombres') or '')[:150],
+        last_name=str(fila.get('apellidos') or '')[:150],
+    )
+    # Entrarán con "olvidé mi contraseña"; hashear miles de contraseñas es lo más lento
+    usuario.set_unusable_password()
+    try:
+        usuario.full_clean(validate_unique=False)
+    except ValidationError as error:
+        for campo, mensajes in error.message_dict.items():
+            for mensaje in mensajes:
+                registro.error(f"usuario.{campo}", mensaje)
+    registro.usuario = usuario
+
+    _validar_hijas(registro, fila)
+    return registro
+
+
+def _comprobar_unicidad(registros, vistos):
+    """
+    Cédulas, usuarios y slugs contra la base (una query IN cada uno) y
+    contra las filas anteriores del archivo (`vistos`)
+    """
+    validos = [registro for registro in registros if not registro.errores]
+
+    cedulas = set(
+        DatosPersonales.objects
+        .filter(numerocedula__in={registro.perfil.numerocedula for registro in validos})
+        .values_list('numerocedula', flat=True)
+    )
+    usuarios = set(
+        User.objects
+        .filter(username__in={registro.usuario.username for registro in validos})
+        .values_list('username', flat=True)
+    )
+
+    for registro in validos:
+        cedula, username = registro.perfil.numerocedula, registro.usuario.username
+        if cedula in cedulas:
+            registro.error('numerocedula', 'Ya existe un perfil con esta cédula')
+        elif cedula in vistos['cedulas']:
+            registro.error('numerocedula', 'Cédula repetida en el archivo')
+        if username in usuarios:
+            registro.error('usuario', 'Ya existe un usuario con este nombre')
+        elif username in vistos['usuarios']:
+            registro.error('usuario', 'Usuario repetido en el archivo')
+        vistos['cedulas'].add(cedula)
+        vistos['usuarios'].add(username)
+
+    # Los slugs llevan un sufijo aleatorio: se regeneran los pocos que choquen
+    pendientes = [registro for registro in validos if not registro.errores]
+    for registro in pendientes:
+        registro.perfil.slug = registro.perfil.generar_slug()
+    while pendientes:
+        repetidos = Counter(registro.perfil.slug for registro in pendientes)
+        ocupados = set(
+            DatosPersonales.objects.filter(slug__in=list(repetidos)).values_list('slug', flat=True)
+        )
+        ocupados.update(slug for slug, veces in repetidos.items() if veces > 1)
+        pendientes = [registro for registro in pendientes if registro.perfil.slug in ocupados]
+        for registro in pendientes:
+            registro.perfil.slug = registro.perfil.generar_slug()
+
+
+# ======================================
+# INSERCIÓN
+# ======================================
+
+def _recuperar_ids(modelo, instancias, campo):
+    """
+    Completa los pk si la base no los devuelve en bulk_create (una query)
+    """
+    faltan = [instancia for instancia in instancias if instancia.pk is None]
+    if faltan:
+        ids = dict(
+            modelo.objects
+            .filter(**{f"{campo}__in": [getattr(instancia, campo) for instancia in faltan]})
+            .values_list(campo, 'pk')
+        )
+        for instancia in faltan:
+            instancia.pk = ids[getattr(instancia, campo)]
+
+
+def _insertar(registros, tamano_lote):
+    """
+    Usuarios, perfiles y filas hijas de los registros con bulk_create en un savepoint
+    """
+    nuevos = [registro for registro in registros if registro.perfil is not None]
+    with transaction.atomic():
+        if nuevos:
+            usuarios = [registro.usuario for registro in nuevos]
+            User.objects.bulk_create(usuarios, batch_size=tamano_lote)
+            _recuperar_ids(User, usuarios, 'username')
+
+            perfiles = []
+            for registro in nuevos:
+                registro.perfil.usuario = registro.usuario
+                perfiles.append(registro.perfil)
+            DatosPersonales.objects.bulk_create(perfiles, batch_size=tamano_lote)
+            _recuperar_ids(DatosPersonales, perfiles, 'numerocedula')
+            for registro in nuevos:
+                registro.perfil_id = registro.perfil.pk
+
+        for seccion, (_, modelo) in SECCIONES_IMPORTACION.items():
+            filas = []
+            for registro in registros:
+                for fila in registro.hijas.get(seccion, ()):
+                    fila.idperfilconqueestaactivo_id = registro.perfil_id
+                    filas.append(fila)
+            modelo.objects.bulk_create(filas, batch_size=tamano_lote)
+
+
+def _reiniciar(registro):
+    """
+    Deja las instancias como antes del INSERT revertido por el savepoint
+    """
+    for instancia in registro.instancias():
+        if instancia is not None:
+            instancia.pk = None
+            instancia._state.adding = True
+    if registro.perfil is not None:
+        registro.perfil_id = None
+
+
+def _guardar_lote(registros, resultado, tamano_lote):
+    validos = [registro for registro in registros if not registro.errores]
+    try:
+        _insertar(validos, tamano_lote)
+        guardados = validos
+    except IntegrityError:
+        # Algo cambió entre la validación y el INSERT: fila por fila para aislar la culpable
+        guardados = []
+        for registro in validos:
+            _reiniciar(registro)
+            try:
+                _insertar([registro], tamano_lote)
+            except IntegrityError as error:
+                _reiniciar(registro)
+                registro.error('', f"No se pudo guardar: {error}")
+            else:
+                guardados.append(registro)
+
+    for registro in registros:
+        resultado.errores.extend(registro.errores)
+    for registro in guardados:
+        resultado.perfiles += registro.perfil is not None
+        resultado.perfil_ids.add(registro.perfil_id)
+        for seccion, filas in registro.hijas.items():
+            resultado.filas[seccion] += len(filas)
+    return {registro.perfil_id for registro in guardados}
+
+
+# ======================================
+# DATOS DERIVADOS
+# ======================================
+
+def refrescar_derivados(perfil_ids):
+    """
+    Lo que signals.py hace fila a fila: versión y caché del CV público,
+    estadísticas (con experiencia), documento, índice de búsqueda y
+    búsquedas guardadas de los perfiles
+    """
+    perfil_ids = sorted(perfil_ids)
+    perfiles = DatosPersonales.objects.filter(pk__in=perfil_ids)
+    perfiles.update(fecha_actualizacion=timezone.now())
+    invalidar_cv_publico(*perfiles.values_list('slug', flat=True))
+
+    for perfil_id in perfil_ids:
+        actualizar_estadisticas(perfil_id)
+        # Un perfil nuevo arma su documento en la primera lectura
+        actualizar_documento(perfil_id, crear=False)
+        actualizar_indice_busqueda(perfil_id)
+    if perfil_ids:
+        reevaluar_perfiles(perfil_ids)
+
+
+def invalidar_indices(perfil_ids=()):
+    """
+    Índices en memoria y contadores globales, una vez al terminar; los
+    slugs de los perfiles importados salen de la caché negativa
+    """
+    indice_facetas.invalidar()
+    slugs = [
+        slug for lote in _lotes(sorted(perfil_ids), TAMANO_LOTE)
+        for slug in DatosPersonales.objects.filter(pk__in=lote).values_list('slug', flat=True)
+    ]
+    indice_slugs.invalidar(*slugs)
+    reconciliar_contadores()
+
+
+# ======================================
+# IMPORTACIÓN
+# ======================================
+
+def importar_perfiles(filas, tamano_lote=TAMANO_LOTE, derivados=True, progreso=None, resultado=None):
+    """
+    Importa perfiles (con sus experiencias y cursos anidados) desde (línea, fila)
+
+    Args:
+        filas: iterable de (línea, dict); ver leer_filas
+        derivados: recalcular estadísticas e índice de búsqueda tras cada lote
+        progreso: callable(resultado) tras cada lote
+    """
+    resultado = resultado or ResultadoImportacion()
+    vistos = {'cedulas': set(), 'usuarios': set()}
+
+    try:
+        for lote in _lotes(filas, tamano_lote):
+            registros = [_validar_perfil(linea, fila) for linea, fila in lote]
+            _comprobar_unicidad(registros, vistos)
+            guardados = _guardar_lote(registros, resultado, tamano_lote)
+            if derivados:
+                refrescar_derivados(guardados)
+            if progreso:
+                progreso(resultado)
+    finally:
+        # También si la lectura falla a mitad: los lotes anteriores ya se guardaron
+        if resultado.perfiles:
+            invalidar_indices(resultado.perfil_ids)
+    return resultado
+
+
+def importar_seccion(seccion, filas, tamano_lote=TAMANO_LOTE, derivados=True, progreso=None, resultado=None):
+    """
+    Importa filas hijas ('experiencias' o 'cursos') de perfiles existentes,
+    identificados por la columna numerocedula
+    """
+    clase_formulario, _ = SECCIONES_IMPORTACION[seccion]
+    resultado = resultado or ResultadoImportacion()
+
+    try:
+        for lote in _lotes(filas, tamano_lote):
+            cedulas = {str(fila.get('numerocedula') or '') for _, fila in lote if fila is not None}
+            perfiles = dict(
+                DatosPersonales.objects.filter(numerocedula__in=cedulas).values_list('numerocedula', 'pk')
+            )
+
+            registros = []
+            for linea, fila in lote:
+                registro = _Registro(linea)
+                registros.append(registro)
+                if fila is None:
+                    registro.error('', 'La línea no es un objeto JSON válido')
+                    continue
+                registro.referencia = str(fila.get('numerocedula') or '')
+                registro.perfil_id = perfiles.get(registro.referencia)
+                if registro.perfil_id is None:
+                    registro.error('numerocedula', 'No existe un perfil con esta cédula')
+                instancia = _validar(registro, clase_formulario, fila, f"{seccion}.")
+                if instancia is not None:
+                    registro.hijas[seccion] = [instancia]
+
+            guardados = _guardar_lote(registros, resultado, tamano_lote)
+            if derivados:
+                refrescar_derivados(guardados)
+            if progreso:
+                progreso(resultado)
+    finally:
+        if resultado.filas[seccion]:
+            indice_facetas.invalidar()
+    return resultado
+
+
+def escribir_reporte(errores, archivo):
+    """
+    Reporte de errores en CSV: línea, referencia (cédula), campo y mensaje
+    """
+    escritor = csv.writer(archivo)
+    escritor.writerow(['linea', 'referencia', 'campo', 'mensaje'])
+    for error in errores:
+        escritor.writerow([error.linea, error.referencia, error.campo, error.mensaje])
@@ -0,0 +1,385 @@
+"""
+Importación del CV de un usuario desde LinkedIn o JSON Resume
+
+Reemplaza decenas de formularios (uno por experiencia, curso, ...) por una
+sola subida:
+
+    LinkedIn      ZIP de "Obtener una copia de tus datos". Se lee en
+                  streaming con zipfile, sin extraer a disco: solo se
+                  abren los CSV conocidos (Positions, Certifications,
+                  Honors, Projects, Publications).
+    JSON Resume   archivo .json con el esquema de jsonresume.org (work,
+                  certificates, awards, projects, publications).
+
+Cada entrada se convierte en los campos de ExperienciaLaboral,
+CursoRealizado, Reconocimiento o ProductoLaboral y se valida con el mismo
+formulario que usa la web. Lo que el origen no trae y el modelo exige
+(lugar, horas, tipo de reconocimiento) se completa con un valor genérico
+y la fila queda oculta (activarparaqueseveaenfront=False) hasta que el
+usuario la revise. Las entradas que ya están en el perfil se omiten, así
+que volver a subir el mismo archivo no duplica nada.
+
+Todo se inserta con bulk_create en una transacción y después se
+recalculan una sola vez los datos derivados del perfil (ver
+cv_importacion.refrescar_derivados).
+"""
+
+import calendar
+import csv
+import io
+import json
+import re
+import zipfile
+import zlib
+from datetime import date
+
+from django.conf import settings
+from django.db import models, transaction
+
+from .forms import CursoRealizadoForm, ExperienciaLaboralForm, ProductoLaboralForm, ReconocimientoForm
+from .models import CursoRealizado, ExperienciaLaboral, ProductoLaboral, Reconocimiento
+from .cv_facetas import indice_facetas
+from .cv_importacion import ErrorImportacion, ResultadoImportacion, datos_formulario, refrescar_derivados
+
+
+# clave de sección (como en cv_snapshot.SECCIONES_CV) -> (formulario, modelo, campos que identifican una entrada)
+SECCIONES_EXTERNAS = {
+    'experiencia': (ExperienciaLaboralForm, ExperienciaLaboral, ('cargodesempenado', 'nombrempresa', 'fechainiciogestion')),
+    'cursos': (CursoRealizadoForm, CursoRealizado, ('nombrecurso', 'fechainicio')),
+    'reconocimientos': (ReconocimientoForm, Reconocimiento, ('descripcionreconocimiento', 'fechareconocimiento')),
+    'productos_laborales': (ProductoLaboralForm, ProductoLaboral, ('nombreproducto', 'fechaproducto')),
+}
+
+SIN_ESPECIFICAR = 'No especificado'
+
+MESES = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+    'ene': 1, 'abr': 4, 'ago': 8, 'dic': 12,
+}
+
+
+def _max_bytes():
+    return getattr(settings, 'CV_IMPORTACION_MAX_BYTES', 10 * 1024 * 1024)
+
+
+# ======================================
+# CONVERSIÓN DE CAMPOS
+# ======================================
+
+def fecha_externa(texto, fin=False):
+    """
+    date desde '2020-03-15', '2020-03', '2020', 'Mar 2020' o 'mar. 2020'
+
+    Con fin=True una fecha sin día (o sin mes) es el último día del periodo,
+    sin pasar de hoy (el periodo en curso termina hoy). Devuelve None si el
+    texto está vacío o no se entiende.
+    """
+    texto = (texto or '').strip().lower()
+    if not texto:
+        return None
+
+    ano = mes = dia = None
+    if coincidencia := re.fullmatch(r'(\d{4})(?:-(\d{1,2}))?(?:-(\d{1,2}))?', texto):
+        ano, mes, dia = (int(valor) if valor else None for valor in coincidencia.groups())
+    elif coincidencia := re.fullmatch(r'([a-zé]{3})[a-zé]*\.?\s+(\d{4})', texto):
+        mes, ano = MESES.get(coincidencia.group(1)), int(coincidencia.group(2))
+        if mes is None:
+            return None
+    else:
+        return None
+
+    try:
+        if fin and dia is None:
+            mes = mes or 12
+            return min(date(ano, mes, calendar.monthrange(ano, mes)[1]), date.today())
+        return date(ano, mes or 1, dia or 1)
+    except ValueError:
+        return None
+
+
+def _texto(*partes):
+    return '\n\n'.join(parte.strip() for parte in partes if parte and parte.strip())
+
+
+def _entrada(campos, rellenos):
+    """
+    Campos de la entrada; lo que falta y el modelo exige se completa con
+    `rellenos` y deja la entrada oculta hasta que el usuario la revise
+    """
+    entrada = {campo: valor for campo, valor in campos.items() if valor not in (None, '')}
+    completada = False
+    for campo, valor in rellenos.items():
+        if campo not in entrada:
+            entrada[campo] = valor
+            completada = True
+    entrada['activarparaqueseveaenfront'] = not completada
+    return entrada
+
+
+# ======================================
+# LINKEDIN (ZIP)
+# ======================================
+
+def _linkedin_posicion(fila):
+    titulo = fila.get('Title', '')
+    return 'experiencia', _entrada({
+        'cargodesempenado': titulo,
+        'nombrempresa': fila.get('Company Name'),
+        'lugarempresa': fila.get('Location'),
+        'fechainiciogestion': fecha_externa(fila.get('Started On')),
+        'fechafingestion': fecha_externa(fila.get('Finished On'), fin=True),
+        'descripcionfunciones': fila.get('Description'),
+    }, {'lugarempresa': SIN_ESPECIFICAR, 'descripcionfunciones': titulo})
+
+
+def _linkedin_certificacion(fila):
+    # "Finished On" es el vencimiento de la certificación, no el fin del curso
+    fecha = fecha_externa(fila.get('Started On'))
+    return 'cursos', _entrada({
+        'nombrecurso': fila.get('Name'),
+        'fechainicio': fecha,
+        'fechafin': fecha,
+        'entidadpatrocinadora': fila.get('Authority'),
+        'descripcioncurso': _texto(fila.get('License Number', ''), fila.get('Url', '')),
+    }, {'totalhoras': 1, 'descripcioncurso': fila.get('Name', ''), 'entidadpatrocinadora': SIN_ESPECIFICAR})
+
+
+def _linkedin_reconocimiento(fila):
+    return 'reconocimientos', _entrada({
+        'fechareconocimiento': fecha_externa(fila.get('Issued On')),
+        'descripcionreconocimiento': _texto(fila.get('Title', ''), fila.get('Description', '')),
+        'entidadpatrocinadora': fila.get('Issuer'),
+    }, {'tiporeconocimiento': 'Académico', 'entidadpatrocinadora': SIN_ESPECIFICAR})
+
+
+def _linkedin_proyecto(fila):
+    return 'productos_laborales', _entrada({
+        'nombreproducto': fila.get('Title'),
+        'fechaproducto': fecha_externa(fila.get('Finished On'), fin=True) or fecha_externa(fila.get('Started On')),
+        'descripcion': _texto(fila.get('Description', ''), fila.get('Url', '')),
+    }, {'descripcion': fila.get('Title', '')})
+
+
+def _linkedin_publicacion(fila):
+    return 'productos_laborales', _entrada({
+        'nombreproducto': fila.get('Name'),
+        'fechaproducto': fecha_externa(fila.get('Published On'), fin=True),
+        'descripcion': _texto(fila.get('Description', ''), fila.get('Publisher', ''), fila.get('Url', '')),
+    }, {'descripcion': fila.get('Name', '')})
+
+
+# Nombre del CSV dentro del ZIP (en minúsculas) -> conversor de filas
+ARCHIVOS_LINKEDIN = {
+    'positions.csv': _linkedin_posicion,
+    'certifications.csv': _linkedin_certificacion,
+    'honors.csv': _linkedin_reconocimiento,
+    'projects.csv': _linkedin_proyecto,
+    'publications.csv': _linkedin_publicacion,
+}
+
+
+def leer_linkedin(archivo):
+    """
+    (origen, posición, sección, entrada) de un ZIP de LinkedIn, en streaming
+
+    Cada CSV se descomprime mientras se lee; el tamaño declarado de cada
+    miembro se limita con CV_IMPORTACION_MAX_BYTES (zipfile no entrega más
+    bytes que los declarados). ValueError si el archivo no es un ZIP válido o
+    si un CSV no se puede leer (dañado, cifrado o mal formado).
+    """
+    try:
+        comprimido = zipfile.ZipFile(archivo)
+    except zipfile.BadZipFile:
+        raise ValueError('El archivo no es un ZIP válido')
+
+    with comprimido:
+        for info in comprimido.infolist():
+            nombre = info.filename.rsplit('/', 1)[-1]
+            conversor = ARCHIVOS_LINKEDIN.get(nombre.lower())
+            if conversor is None or info.is_dir():
+                continue
+            if info.file_size > _max_bytes():
+                raise ValueError(f"{nombre} es demasiado grande")
+
+            try:
+                with comprimido.open(info) as miembro:
+                    lector = csv.DictReader(io.TextIOWrapper(miembro, encoding='utf-8-sig', newline=''))
+                    for fila in lector:
+                        fila = {clave.strip(): (valor or '').strip() for clave, valor in fila.items() if clave}
+                        yield (nombre, lector.line_num, *conversor(fila))
+            except (zipfile.BadZipFile, zlib.error, EOFError) as error:
+                # CRC incorrecto, datos comprimidos dañados o ZIP truncado
+                raise ValueError(f"{nombre} está dañado: {error}")
+            except csv.Error as error:
+                raise ValueError(f"{nombre} no es un CSV válido: {error}")
+            except (RuntimeError, NotImplementedError):
+                # Cifrado con contraseña o método de compresión no soportado
+                raise ValueError(f"No se puede leer {nombre}: el ZIP está cifrado o usa una compresión no soportada")
+
+
+# ======================================
+# JSON RESUME
+# ======================================
+
+def _resume_trabajo(entrada):
+    titulo = entrada.get('position', '')
+    ubicacion = entrada.get('location')
+    return 'experiencia', _entrada({
+        'cargodesempenado': titulo,
+        'nombrempresa': entrada.get('name') or entrada.get('company'),
+        'lugarempresa': ubicacion if isinstance(ubicacion, str) else None,
+        'sitiowebempresa': entrada.get('url') or entrada.get('website'),
+        'fechainiciogestion': fecha_externa(entrada.get('startDate')),
+        'fechafingestion': fecha_externa(entrada.get('endDate'), fin=True),
+        'descripcionfunciones': _texto(entrada.get('summary', ''), *map(str, entrada.get('highlights') or [])),
+    }, {'lugarempresa': SIN_ESPECIFICAR, 'descripcionfunciones': titulo})
+
+
+def _resume_certificado(entrada):
+    fecha = fecha_externa(entrada.get('date'))
+    return 'cursos', _entrada({
+        'nombrecurso': entrada.get('name'),
+        'fechainicio': fecha,
+        'fechafin': fecha,
+        'entidadpatrocinadora': entrada.get('issuer'),
+        'descripcioncurso': entrada.get('url'),
+    }, {'totalhoras': 1, 'descripcioncurso': entrada.get('name', ''), 'entidadpatrocinadora': SIN_ESPECIFICAR})
+
+
+def _resume_premio(entrada):
+    return 'reconocimientos', _entrada({
+        'fechareconocimiento': fecha_externa(entrada.get('date')),
+        'descripcionreconocimiento': _texto(entrada.get('title', ''), entrada.get('summary', '')),
+        'entidadpatrocinadora': entrada.get('awarder'),
+    }, {'tiporeconocimiento': 'Académico', 'entidadpatrocinadora': SIN_ESPECIFICAR})
+
+
+def _resume_proyecto(entrada):
+    return 'productos_laborales', _entrada({
+        'nombreproducto': entrada.get('name'),
+        'fechaproducto': fecha_externa(entrada.get('endDate'), fin=True) or fecha_externa(entrada.get('startDate')),
+        'descripcion': _texto(entrada.get('description', ''), *map(str, entrada.get('highlights') or [])),
+    }, {'descripcion': entrada.get('name', '')})
+
+
+def _resume_publicacion(entrada):
+    return 'productos_laborales', _entrada({
+        'nombreproducto': entrada.get('name'),
+        'fechaproducto': fecha_externa(entrada.get('releaseDate'), fin=True),
+        'descripcion': _texto(entrada.get('summary', ''), entrada.get('publisher', ''), entrada.get('url', '')),
+    }, {'descripcion': entrada.get('name', '')})
+
+
+# Lista del JSON Resume -> conversor de entradas
+LISTAS_JSON_RESUME = {
+    'work': _resume_trabajo,
+    'certificates': _resume_certificado,
+    'awards': _resume_premio,
+    'projects': _resume_proyecto,
+    'publications': _resume_publicacion,
+}
+
+
+def leer_json_resume(archivo):
+    """
+    (origen, posición, sección, entrada) de un JSON Resume
+
+    ValueError si el archivo no es JSON o supera CV_IMPORTACION_MAX_BYTES.
+    """
+    contenido = archivo.read(_max_bytes() + 1)
+    if len(contenido) > _max_bytes():
+        raise ValueError('El archivo es demasiado grande')
+    try:
+        documento = json.loads(contenido)
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        raise ValueError('El archivo no es un JSON válido')
+    if not isinstance(documento, dict):
+        raise ValueError('El archivo no tiene el formato de JSON Resume')
+
+    for lista, conversor in LISTAS_JSON_RESUME.items():
+        for posicion, entrada in enumerate(documento.get(lista) or [], start=1):
+            if isinstance(entrada, dict):
+                yield (lista, posicion, *conversor(entrada))
+
+
+def leer_cv_externo(archivo, nombre):
+    """
+    Entradas del archivo según su extensión (.zip de LinkedIn o .json)
+    """
+    if nombre.lower().endswith('.zip'):
+        return leer_linkedin(archivo)
+    if nombre.lower().endswith('.json'):
+        return leer_json_resume(archivo)
+    raise ValueError('Sube el ZIP de datos de LinkedIn o un archivo JSON Resume (.json)')
+
+
+# ======================================
+# IMPORTACIÓN
+# ======================================
+
+def _recortar(modelo, entrada):
+    """
+    Recorta los textos al max_length del modelo (LinkedIn no tiene esos límites)
+    """
+    for nombre, valor in entrada.items():
+        campo = modelo._meta.get_field(nombre)
+        if isinstance(valor, str) and isinstance(campo, models.CharField) and campo.max_length:
+            entrada[nombre] = valor[:campo.max_length].strip()
+    return entrada
+
+
+def _clave(instancia, campos):
+    return tuple(str(getattr(instancia, campo)).casefold() for campo in campos)
+
+
+def importar_cv_externo(perfil, entradas):
+    """
+    Valida las entradas (ver leer_cv_externo) y crea las filas del perfil
+    con bulk_create en una transacción
+
+    Las entradas inválidas van a resultado.errores (línea y origen) y las
+    que ya existen en el perfil se cuentan en resultado.duplicadas.
+    """
+    resultado = ResultadoImportacion()
+    nuevas = {seccion: [] for seccion in SECCIONES_EXTERNAS}
+    # Lo que el perfil ya tiene se carga una vez por sección, al necesitarlo
+    existentes = {}
+
+    for origen, posicion, seccion, entrada in entradas:
+        clase_formulario, modelo, campos_clave = SECCIONES_EXTERNAS[seccion]
+        formulario = clase_formulario(data=datos_formulario(clase_formulario, _recortar(modelo, entrada)))
+        if not formulario.is_valid():
+            for campo, mensajes in formulario.errors.items():
+                for mensaje in mensajes:
+                    resultado.errores.append(
+                        ErrorImportacion(posicion, origen, '' if campo == '__all__' else campo, mensaje)
+                    )
+            continue
+
+        instancia = formulario.save(commit=False)
+        instancia.idperfilconqueestaactivo = perfil
+        if seccion not in existentes:
+            existentes[seccion] = {
+                _clave(fila, campos_clave)
+                for fila in modelo.objects.filter(idperfilconqueestaactivo=perfil).only(*campos_clave)
+            }
+        clave = _clave(instancia, campos_clave)
+        if clave in existentes[seccion]:
+            resultado.duplicadas += 1
+            continue
+        existentes[seccion].add(clave)
+        nuevas[seccion].append(instancia)
+
+    with transaction.atomic():
+        for seccion, instancias in nuevas.items():
+            if instancias:
+                SECCIONES_EXTERNAS[seccion][1].objects.bulk_create(instancias)
+                resultado.filas[seccion] = len(instancias)
+
+    if resultado.filas:
+        # bulk_create no dispara signals: derivados una sola vez para el perfil
+        refrescar_derivados([perfil.pk])
+        indice_facetas.actualizar_perfil(perfil.pk)
+        resultado.perfil_ids.add(perfil.pk)
+    return resultado
@@ -0,0 +1,117 @@
+"""
+Caché de página completa para los CVs públicos (/cv/<slug>/)
+
+El HTML renderizado se guarda en el backend de caché de Django configurado
+en CV_PUBLICO_CACHE_ALIAS (locmem, archivo, Redis...), con dos claves:
+
+    cv_publico:version:<slug>            -> versión vigente (el ETag del CV)
+    cv_publico:html:<slug>:<versión>     -> contenido y headers
+
+Un acierto se sirve con dos lecturas de caché y sin tocar la base de datos.
+signals.py borra la clave de versión cuando cambia el perfil o cualquiera de
+sus filas hijas, así la siguiente visita vuelve a renderizar.
+"""
+
+from datetime import datetime, time, timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+
+
+def _cache():
+    return caches[getattr(settings, 'CV_PUBLICO_CACHE_ALIAS', 'default')]
+
+
+def _clave_version(slug):
+    return f"cv_publico:version:{slug}"
+
+
+def _clave_html(slug, version):
+    # Sin comillas del ETag, para backends como memcached
+    version = version.strip('"')
+    return f"cv_publico:html:{slug}:{version}"
+
+
+def _segundos_de_vida():
+    """
+    TTL configurado, sin pasar de la medianoche (la página muestra la edad)
+    """
+    ahora = timezone.localtime()
+    manana = timezone.make_aware(datetime.combine(ahora.date() + timedelta(days=1), time.min))
+    hasta_medianoche = int((manana - ahora).total_seconds()) or 1
+    return min(getattr(settings, 'CV_PUBLICO_CACHE_TIMEOUT', 3600), hasta_medianoche)
+
+
+def obtener_pagina(slug):
+    cache = _cache()
+    version = cache.get(_clave_version(slug))
+    if version is None:
+        return None
+    return cache.get(_clave_html(slug, version))
+
+
+def guardar_pagina(slug, respuesta):
+    version = respuesta.get('ETag')
+    if not version:
+        return
+
+    pagina = {
+        'contenido': respuesta.content,
+        'content_type': respuesta.get('Content-Type'),
+        'etag': version,
+        'last_modified': respuesta.get('Last-Modified'),
+    }
+    timeout = _segundos_de_vida()
+    cache = _cache()
+    cache.set(_clave_html(slug, version), pagina, timeout)
+    cache.set(_clave_version(slug), version, timeout)
+
+
+def invalidar_cv_publico(*slugs):
+    """
+    Descarta la página cacheada de los slugs indicados
+    """
+    _cache().delete_many([_clave_version(slug) for slug in slugs if slug])
+
+
+def _respuesta_desde_cache(request, pagina):
+    respuesta = get_conditional_response(request, etag=pagina['etag'])
+    if respuesta is None:
+        respuesta = HttpResponse(pagina['contenido'], content_type=pagina['content_type'])
+    respuesta['ETag'] = pagina['etag']
+    if pagina['last_modified']:
+        respuesta['Last-Modified'] = pagina['last_modified']
+    patch_cache_control(respuesta, public=True, no_cache=True)
+    return respuesta
+
+
+def cache_cv_publico(vista):
+    """
+    Decorador para la vista del CV público: sirve y guarda el HTML en caché
+
+    Solo aplica a visitantes anónimos, porque la barra de navegación cambia
+    con el usuario autenticado, y sin mensajes pendientes, que se mostrarían
+    a todos los que reciban la página cacheada.
+    """
+    @wraps(vista)
+    def envoltura(request, *args, slug=None, **kwargs):
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated or len(get_messages(request)):
+            return vista(request, *args, slug=slug, **kwargs)
+
+        pagina = obtener_pagina(slug)
+        if pagina is not None:
+            return _respuesta_desde_cache(request, pagina)
+
+        respuesta = vista(request, *args, slug=slug, **kwargs)
+        if respuesta.status_code == 200 and not getattr(respuesta, 'streaming', False):
+            if hasattr(respuesta, 'render') and callable(respuesta.render):
+                respuesta = respuesta.render()
+            guardar_pagina(slug, respuesta)
+        return respuesta
+
+    return envoltura
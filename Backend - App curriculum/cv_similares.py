@@ -0,0 +1,410 @@
+"""
+Perfiles similares: vectores TF-IDF y vecinos precalculados
+
+Cada CV público se representa con los términos de su experiencia visible
+(cargodesempenado, descripcionfunciones), los nombres de sus cursos y las
+etiquetas de sus productos académicos (como "#clave"). Los vectores TF-IDF
+normalizados forman una matriz dispersa de SciPy (perfiles x términos), así
+la similitud coseno entre perfiles es un producto de matrices.
+
+calcular_similares() (comando calcular_similares_cv, desde cron) multiplica
+la matriz por bloques de filas, de modo que la matriz densa de similitudes
+nunca pasa de CV_SIMILARES_MEMORIA bytes, y guarda los k vecinos de cada
+perfil en PerfilSimilar. La vista solo lee esas filas.
+
+El estado queda en CV_SIMILARES_DIR:
+
+    vectores.npz   matriz TF-IDF (CSR)
+    vecinos.npz    ids y puntajes de los k vecinos de cada fila
+    estado.json    ids por fila, versión de cada perfil, vocabulario e IDF
+
+En la siguiente ejecución solo se vectorizan los perfiles cuya versión
+(fecha_actualizacion) cambió, con el vocabulario guardado, y se recalculan
+los vecinos de esos perfiles y de los que los tenían como vecinos o ahora
+los tendrían. Si cambió más de CV_SIMILARES_UMBRAL_COMPLETO de los perfiles
+se reconstruye todo, vocabulario incluido (--completo lo fuerza).
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from scipy import sparse
+
+from .models import CursoRealizado, EtiquetaProducto, ExperienciaLaboral, PerfilSimilar
+from .cv_etiquetas import normalizar_etiqueta
+from .cv_snapshot import perfiles_publicos
+
+
+ARCHIVO_VECTORES = 'vectores.npz'
+ARCHIVO_VECINOS = 'vecinos.npz'
+ARCHIVO_ESTADO = 'estado.json'
+
+PALABRAS_VACIAS = frozenset("""
+    al ante con contra como del desde donde durante el ella ellos en entre era es esta este esto
+    hacia hasta la las le les lo los mas mediante para pero por que se sin sobre su sus tambien
+    the and for with una uno unos unas y de a o u e
+""".split())
+
+
+def _configuracion(nombre, por_defecto):
+    return getattr(settings, f'CV_SIMILARES_{nombre}', por_defecto)
+
+
+def version_perfil(fecha_actualizacion):
+    return int(fecha_actualizacion.timestamp() * 1_000_000)
+
+
+# ======================================
+# TÉRMINOS
+# ======================================
+
+def tokenizar(texto):
+    """
+    Palabras sin tildes ni mayúsculas, sin palabras vacías ni de menos de 3 letras
+    """
+    return [
+        palabra for palabra in re.findall(r'[a-z0-9]+', normalizar_etiqueta(texto or ''))
+        if len(palabra) > 2 and palabra not in PALABRAS_VACIAS
+    ]
+
+
+def cargar_terminos(perfil_ids):
+    """
+    {perfil_id: Counter de términos} de los perfiles indicados (tres queries)
+    """
+    terminos = {perfil_id: Counter() for perfil_id in perfil_ids}
+
+    experiencias = (
+        ExperienciaLaboral.objects
+        .filter(idperfilconqueestaactivo__in=perfil_ids, activarparaqueseveaenfront=True)
+        .values_list('idperfilconqueestaactivo', 'cargodesempenado', 'descripcionfunciones')
+    )
+    for perfil_id, cargo, funciones in experiencias.iterator():
+        terminos[perfil_id].update(tokenizar(cargo))
+        terminos[perfil_id].update(tokenizar(funciones))
+
+    cursos = (
+        CursoRealizado.objects
+        .filter(idperfilconqueestaactivo__in=perfil_ids, activarparaqueseveaenfront=True)
+        .values_list('idperfilconqueestaactivo', 'nombrecurso')
+    )
+    for perfil_id, nombre in cursos.iterator():
+        terminos[perfil_id].update(tokenizar(nombre))
+
+    etiquetas = (
+        EtiquetaProducto.objects
+        .filter(producto__idperfilconqueestaactivo__in=perfil_ids, producto__activarparaqueseveaenfront=True)
+        .values_list('producto__idperfilconqueestaactivo', 'etiqueta__clave')
+    )
+    for perfil_id, clave in etiquetas.iterator():
+        terminos[perfil_id][f"#{clave}"] += 1
+
+    return terminos
+
+
+def _lotes(ids, tamano):
+    for inicio in range(0, len(ids), tamano):
+        yield ids[inicio:inicio + tamano]
+
+
+# ======================================
+# VECTORIZADOR
+# ======================================
+
+class VectorizadorTFIDF:
+    """
+    TF sublineal (1 + log tf) por IDF suavizado, filas con norma L2
+    """
+
+    def __init__(self, vocabulario, idf):
+        self.vocabulario = list(vocabulario)
+        self.indices = {termino: indice for indice, termino in enumerate(self.vocabulario)}
+        self.idf = np.asarray(idf, dtype=np.float32)
+
+    @classmethod
+    def ajustar(cls, frecuencia_documentos, total_documentos, min_df=2, max_terminos=50000):
+        """
+        Vocabulario e IDF a partir de {término: documentos que lo contienen}
+        """
+        terminos = sorted(
+            (termino for termino, df in frecuencia_documentos.items() if df >= min_df),
+            key=lambda termino: (-frecuencia_documentos[termino], termino)
+        )[:max_terminos]
+        idf = [math.log((1 + total_documentos) / (1 + frecuencia_documentos[termino])) + 1 for termino in terminos]
+        return cls(terminos, idf)
+
+    def transformar(self, documentos):
+        """
+        Matriz CSR (documentos x vocabulario) de una lista de Counters
+        """
+        filas, columnas, valores = [], [], []
+        for fila, terminos in enumerate(documentos):
+            for termino, frecuencia in terminos.items():
+                columna = self.indices.get(termino)
+                if columna is not None:
+                    filas.append(fila)
+                    columnas.append(columna)
+                    valores.append(1 + math.log(frecuencia))
+
+        matriz = sparse.csr_matrix(
+            (np.asarray(valores, dtype=np.float32), (filas, columnas)),
+            shape=(len(documentos), len(self.vocabulario)),
+            dtype=np.float32
+        )
+        matriz = matriz.multiply(self.idf).tocsr()
+        normas = np.sqrt(np.asarray(matriz.multiply(matriz).sum(axis=1)).ravel())
+        normas[normas == 0] = 1
+        return sparse.diags(1 / normas).dot(matriz).astype(np.float32).tocsr()
+
+
+def vectorizar(vectorizador, perfil_ids, tamano_lote):
+    """
+    Matriz TF-IDF de los perfiles, en el orden dado, cargando por lotes
+    """
+    bloques = [sparse.csr_matrix((0, len(vectorizador.vocabulario)), dtype=np.float32)]
+    for lote in _lotes(perfil_ids, tamano_lote):
+        terminos = cargar_terminos(lote)
+        bloques.append(vectorizador.transformar([terminos[perfil_id] for perfil_id in lote]))
+    return sparse.vstack(bloques, format='csr')
+
+
+# ======================================
+# VECINOS
+# ======================================
+
+def _tamano_bloque(total):
+    # Filas por bloque para que la matriz densa de similitudes (float32) quepa en memoria
+    memoria = _configuracion('MEMORIA', 256 * 1024 * 1024)
+    return max(1, min(_configuracion('BLOQUE', 2000), memoria // (max(total, 1) * 4)))
+
+
+def vecinos_en_bloques(matriz, filas, k):
+    """
+    Genera (filas del bloque, columnas de los k vecinos, similitudes) por bloques
+
+    Los vecinos vienen ordenados de más a menos similar; un perfil nunca es
+    vecino de sí mismo.
+    """
+    total = matriz.shape[0]
+    k = min(k, total - 1)
+    if k <= 0:
+        return
+
+    traspuesta = matriz.T.tocsr()
+    bloque = _tamano_bloque(total)
+    for inicio in range(0, len(filas), bloque):
+        indices = np.asarray(filas[inicio:inicio + bloque])
+        similitudes = (matriz[indices] @ traspuesta).toarray()
+        similitudes[np.arange(len(indices)), indices] = -1
+
+        columnas = np.argpartition(-similitudes, k - 1, axis=1)[:, :k]
+        puntajes = np.take_along_axis(similitudes, columnas, axis=1)
+        orden = np.argsort(-puntajes, axis=1, kind='stable')
+        yield indices, np.take_along_axis(columnas, orden, axis=1), np.take_along_axis(puntajes, orden, axis=1)
+
+
+def _guardar_vecinos(matriz, ids, filas, k, vecinos, puntajes, progreso=None):
+    """
+    Recalcula los vecinos de las filas indicadas: en PerfilSimilar y en los arrays de estado
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    vecinos[filas] = -1
+    puntajes[filas] = 0
+    hechos = 0
+
+    for indices, columnas, similitudes in vecinos_en_bloques(matriz, filas, k):
+        positivos = similitudes > 0
+        vecinos[indices, :columnas.shape[1]] = np.where(positivos, ids[columnas], -1)
+        puntajes[indices, :columnas.shape[1]] = np.where(positivos, similitudes, 0)
+
+        nuevos = [
+            PerfilSimilar(perfil_id=perfil_id, similar_id=similar_id, posicion=posicion, puntaje=puntaje)
+            for perfil_id, fila_ids, fila_puntajes in zip(
+                ids[indices].tolist(), vecinos[indices].tolist(), puntajes[indices].tolist()
+            )
+            for posicion, (similar_id, puntaje) in enumerate(zip(fila_ids, fila_puntajes))
+            if similar_id >= 0
+        ]
+        with transaction.atomic():
+            PerfilSimilar.objects.filter(perfil_id__in=ids[indices].tolist()).delete()
+            PerfilSimilar.objects.bulk_create(nuevos, batch_size=1000)
+
+        hechos += len(indices)
+        if progreso:
+            progreso(hechos, len(filas))
+
+
+# ======================================
+# ESTADO
+# ======================================
+
+def leer_estado(directorio):
+    """
+    (estado, matriz, vecinos, puntajes) guardados, o None si no hay o están incompletos
+    """
+    try:
+        with open(os.path.join(directorio, ARCHIVO_ESTADO), encoding='utf-8') as archivo:
+            estado = json.load(archivo)
+        matriz = sparse.load_npz(os.path.join(directorio, ARCHIVO_VECTORES)).tocsr()
+        with np.load(os.path.join(directorio, ARCHIVO_VECINOS)) as datos:
+            vecinos, puntajes = datos['vecinos'], datos['puntajes']
+    except (FileNotFoundError, ValueError, KeyError):
+        return None
+    if matriz.shape[0] != len(estado['ids']):
+        return None
+    return estado, matriz, vecinos, puntajes
+
+
+def _guardar_estado(directorio, estado, matriz, vecinos, puntajes):
+    # Cada archivo se escribe aparte y se mueve a su lugar; estado.json va último
+    os.makedirs(directorio, exist_ok=True)
+    temporal = os.path.join(directorio, 'tmp-' + ARCHIVO_VECTORES)
+    sparse.save_npz(temporal, matriz)
+    os.replace(temporal, os.path.join(directorio, ARCHIVO_VECTORES))
+
+    temporal = os.path.join(directorio, 'tmp-' + ARCHIVO_VECINOS)
+    np.savez(temporal, vecinos=vecinos, puntajes=puntajes)
+    os.replace(temporal, os.path.join(directorio, ARCHIVO_VECINOS))
+
+    temporal = os.path.join(directorio, 'tmp-' + ARCHIVO_ESTADO)
+    with open(temporal, 'w', encoding='utf-8') as archivo:
+        json.dump(estado, archivo, ensure_ascii=False)
+    os.replace(temporal, os.path.join(directorio, ARCHIVO_ESTADO))
+
+
+# ======================================
+# CÁLCULO
+# ======================================
+
+def _calcular_completo(directorio, versiones, k, tamano_lote, progreso):
+    ids = sorted(versiones)
+
+    # Primera pasada: en cuántos perfiles aparece cada término
+    frecuencia_documentos = Counter()
+    for lote in _lotes(ids, tamano_lote):
+        for terminos in cargar_terminos(lote).values():
+            frecuencia_documentos.update(terminos.keys())
+
+    vectorizador = VectorizadorTFIDF.ajustar(
+        frecuencia_documentos,
+        len(ids),
+        min_df=_configuracion('MIN_DF', 2),
+        max_terminos=_configuracion('MAX_TERMINOS', 50000)
+    )
+    matriz = vectorizar(vectorizador, ids, tamano_lote)
+
+    vecinos = np.full((len(ids), k), -1, dtype=np.int64)
+    puntajes = np.zeros((len(ids), k), dtype=np.float32)
+    _guardar_vecinos(matriz, ids, np.arange(len(ids)), k, vecinos, puntajes, progreso)
+    PerfilSimilar.objects.exclude(perfil__perfilactivo=1).delete()
+
+    _guardar_estado(directorio, {
+        'generado': timezone.now().isoformat(),
+        'k': k,
+        'ids': ids,
+        'versiones': {str(perfil_id): versiones[perfil_id] for perfil_id in ids},
+        'vocabulario': vectorizador.vocabulario,
+        'idf': vectorizador.idf.tolist(),
+    }, matriz, vecinos, puntajes)
+    return {'completo': True, 'perfiles': len(ids), 'recalculados': len(ids), 'terminos': len(vectorizador.vocabulario)}
+
+
+def calcular_similares(directorio, completo=False, k=None, progreso=None):
+    """
+    Actualiza los vecinos precalculados de los CVs públicos
+
+    Args:
+        directorio: dónde se guarda el estado entre ejecuciones (CV_SIMILARES_DIR)
+        completo: reconstruir vocabulario, vectores y vecinos de todos los perfiles
+        k: vecinos por perfil (por defecto CV_SIMILARES_K)
+        progreso: callable opcional (hechos, total)
+
+    Devuelve un dict con 'completo', 'perfiles', 'recalculados' y 'terminos'.
+    """
+    k = k or _configuracion('K', 10)
+    tamano_lote = _configuracion('LOTE', 2000)
+    versiones = {
+        perfil_id: version_perfil(fecha)
+        for perfil_id, fecha in perfiles_publicos().values_list('pk', 'fecha_actualizacion').iterator()
+    }
+
+    guardado = None if completo else leer_estado(directorio)
+    if guardado is None or guardado[0]['k'] != k:
+        return _calcular_completo(directorio, versiones, k, tamano_lote, progreso)
+
+    estado, matriz_anterior, vecinos_anteriores, puntajes_anteriores = guardado
+    anteriores = {int(perfil_id): version for perfil_id, version in estado['versiones'].items()}
+    cambiados = sorted(perfil_id for perfil_id, version in versiones.items() if anteriores.get(perfil_id) != version)
+    eliminados = anteriores.keys() - versiones.keys()
+    tocados = set(cambiados) | eliminados
+
+    vocabulario = len(estado['vocabulario'])
+    if not tocados:
+        return {'completo': False, 'perfiles': len(versiones), 'recalculados': 0, 'terminos': vocabulario}
+    if len(tocados) > _configuracion('UMBRAL_COMPLETO', 0.2) * max(len(versiones), 1):
+        return _calcular_completo(directorio, versiones, k, tamano_lote, progreso)
+
+    # Filas que se conservan tal cual, y al final los perfiles cambiados o nuevos
+    conservar = [fila for fila, perfil_id in enumerate(estado['ids']) if perfil_id not in tocados]
+    ids = [estado['ids'][fila] for fila in conservar] + cambiados
+    vectorizador = VectorizadorTFIDF(estado['vocabulario'], estado['idf'])
+    matriz = sparse.vstack(
+        [matriz_anterior[conservar], vectorizar(vectorizador, cambiados, tamano_lote)],
+        format='csr'
+    )
+
+    vecinos = np.full((len(ids), k), -1, dtype=np.int64)
+    puntajes = np.zeros((len(ids), k), dtype=np.float32)
+    vecinos[:len(conservar)] = vecinos_anteriores[conservar]
+    puntajes[:len(conservar)] = puntajes_anteriores[conservar]
+
+    # Afectados: los propios cambiados, quienes tenían a uno de los tocados como
+    # vecino y quienes ahora superarían su k-ésimo vecino con un cambiado
+    afectados = np.zeros(len(ids), dtype=bool)
+    afectados[len(conservar):] = True
+    afectados |= np.isin(vecinos, list(tocados)).any(axis=1)
+
+    umbral = np.where(vecinos[:, -1] >= 0, puntajes[:, -1], 0)
+    traspuesta = matriz.T.tocsr()
+    filas_cambiadas = np.arange(len(conservar), len(ids))
+    for lote in _lotes(filas_cambiadas, _tamano_bloque(len(ids))):
+        maximos = (matriz[lote] @ traspuesta).max(axis=0).toarray().ravel()
+        afectados |= maximos > umbral
+
+    filas = np.flatnonzero(afectados)
+    _guardar_vecinos(matriz, ids, filas, k, vecinos, puntajes, progreso)
+    PerfilSimilar.objects.exclude(perfil__perfilactivo=1).delete()
+
+    _guardar_estado(directorio, dict(
+        estado,
+        generado=timezone.now().isoformat(),
+        ids=ids,
+        versiones={str(perfil_id): versiones[perfil_id] for perfil_id in ids},
+    ), matriz, vecinos, puntajes)
+    return {'completo': False, 'perfiles': len(ids), 'recalculados': len(filas), 'terminos': vocabulario}
+
+
+# ======================================
+# CONSULTA
+# ======================================
+
+def obtener_similares(perfil, limite=None):
+    """
+    Vecinos precalculados del perfil que siguen siendo públicos (una query por índice)
+    """
+    similares = (
+        PerfilSimilar.objects
+        .filter(perfil=perfil, similar__perfilactivo=1)
+        .select_related('similar')
+        .order_by('posicion')
+    )
+    if limite:
+        similares = similares[:limite]
+    return similares
@@ -0,0 +1,157 @@
+"""
+Índice en memoria de los slugs de CVs públicos
+
+Los bots recorren /cv/<slug>/ con slugs inventados o viejos. Cada proceso
+mantiene el conjunto de slugs públicos vigentes y rechaza los desconocidos
+sin ir a la base de datos:
+
+    1. slug en el índice local            -> sigue a la vista normal
+    2. slug en la caché negativa          -> 404 inmediato
+    3. índice desactualizado (generación) -> se reconstruye con una query
+    4. sigue sin estar                    -> 404 y se guarda en la caché negativa
+
+signals.py agrega o quita el slug en el proceso que hizo el cambio e
+incrementa la generación compartida en la caché, para que los demás
+procesos reconstruyan su índice en el siguiente fallo. Los cambios masivos
+sin signals (cv_importacion) llaman a invalidar(), que obliga a reconstruir
+también a este proceso y borra la caché negativa de los slugs nuevos.
+"""
+
+import threading
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponseNotFound
+
+
+CLAVE_GENERACION = 'cv_slugs:generacion'
+
+
+def _cache():
+    return caches[getattr(settings, 'CV_PUBLICO_CACHE_ALIAS', 'default')]
+
+
+def _clave_negativa(slug):
+    return f"cv_slugs:no_existe:{slug}"
+
+
+class IndiceSlugs:
+    """
+    Conjunto de slugs públicos de este proceso
+    """
+
+    def __init__(self):
+        self._slugs = None
+        self._generacion = None
+        self._construido = 0.0
+        self._lock = threading.Lock()
+
+    def _generacion_compartida(self):
+        return _cache().get_or_set(CLAVE_GENERACION, 1, None)
+
+    def reconstruir(self):
+        """
+        Carga los slugs públicos desde la base de datos (una query)
+        """
+        from .cv_snapshot import perfiles_publicos
+
+        generacion = self._generacion_compartida()
+        slugs = set(perfiles_publicos().values_list('slug', flat=True).iterator())
+        with self._lock:
+            self._slugs = slugs
+            self._generacion = generacion
+            self._construido = time.monotonic()
+
+    def _vigente(self):
+        if self._slugs is None:
+            return False
+        refresco = getattr(settings, 'CV_SLUGS_REFRESCO', 300)
+        if refresco and time.monotonic() - self._construido > refresco:
+            return False
+        return self._generacion == self._generacion_compartida()
+
+    def contiene(self, slug):
+        """
+        True si el slug es de un CV público; solo consulta la base de datos
+        cuando el índice está desactualizado
+        """
+        slugs = self._slugs
+        if slugs is not None and slug in slugs:
+            return True
+
+        cache = _cache()
+        if cache.get(_clave_negativa(slug)):
+            return False
+
+        if not self._vigente():
+            self.reconstruir()
+        if slug in self._slugs:
+            return True
+
+        cache.set(_clave_negativa(slug), True, getattr(settings, 'CV_SLUGS_NEGATIVO_TTL', 30))
+        return False
+
+    def actualizar(self, slug_nuevo=None, slug_anterior=None, publico=False):
+        """
+        Refleja el cambio de un perfil en este proceso y avisa a los demás
+        """
+        with self._lock:
+            if self._slugs is not None:
+                if slug_anterior:
+                    self._slugs.discard(slug_anterior)
+                if slug_nuevo:
+                    if publico:
+                        self._slugs.add(slug_nuevo)
+                    else:
+                        self._slugs.discard(slug_nuevo)
+
+        cache = _cache()
+        if slug_nuevo and publico:
+            cache.delete(_clave_negativa(slug_nuevo))
+        try:
+            generacion = cache.incr(CLAVE_GENERACION)
+        except ValueError:
+            generacion = None
+            cache.set(CLAVE_GENERACION, 1, None)
+
+        # Este proceso ya está al día: no hace falta reconstruir
+        if generacion is not None and self._slugs is not None:
+            with self._lock:
+                if self._generacion == generacion - 1:
+                    self._generacion = generacion
+
+    def invalidar(self, *slugs):
+        """
+        Obliga a todos los procesos (también este) a reconstruir en el
+        siguiente fallo y borra la caché negativa de los slugs indicados
+        """
+        with self._lock:
+            self._generacion = None
+
+        cache = _cache()
+        try:
+            cache.incr(CLAVE_GENERACION)
+        except ValueError:
+            cache.set(CLAVE_GENERACION, 1, None)
+        # Después de subir la generación: un 404 guardado entre medio ya no se repite
+        if slugs:
+            cache.delete_many([_clave_negativa(slug) for slug in slugs])
+
+
+indice_slugs = IndiceSlugs()
+
+
+def rechazar_slug_desconocido(vista):
+    """
+    Decorador para la vista del CV público: 404 sin tocar la base de datos
+    si el slug no pertenece a ningún CV público
+    """
+    @wraps(vista)
+    def envoltura(request, *args, slug=None, **kwargs):
+        if not indice_slugs.contiene(slug):
+            return HttpResponseNotFound('CV no encontrado', content_type='text/plain; charset=utf-8')
+        return vista(request, *args, slug=slug, **kwargs)
+
+    return envoltura
@@ -0,0 +1,187 @@
+"""
+Snapshot inmutable de un CV, compartido por el PDF, el CV público, el CV
+privado y el dashboard
+
+Todas las secciones visibles (activarparaqueseveaenfront=True) se cargan
+ya ordenadas con un prefetch por sección, de modo que el número de queries
+por render es fijo sin importar cuántas secciones estén activas o cuántas
+filas tenga cada una.
+"""
+
+from dataclasses import dataclass
+
+from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery, Value, prefetch_related_objects
+from django.db.models.functions import Coalesce
+
+from .models import (
+    DatosPersonales,
+    ExperienciaLaboral,
+    Reconocimiento,
+    CursoRealizado,
+    ProductoAcademico,
+    ProductoLaboral,
+    VentaGarage
+)
+
+
+# (clave de sección, relación en DatosPersonales, modelo, orden)
+SECCIONES_CV = (
+    ('experiencia', 'experiencias_laborales', ExperienciaLaboral, '-fechainiciogestion'),
+    ('reconocimientos', 'reconocimientos', Reconocimiento, '-fechareconocimiento'),
+    ('cursos', 'cursos_realizados', CursoRealizado, '-fechainicio'),
+    ('productos_academicos', 'productos_academicos', ProductoAcademico, '-fecha_creacion'),
+    ('productos_laborales', 'productos_laborales', ProductoLaboral, '-fechaproducto'),
+    ('venta_garage', 'ventas_garage', VentaGarage, '-fecha_publicacion'),
+)
+
+
+def _atributo_snapshot(relacion):
+    return f"_snapshot_{relacion}"
+
+
+@dataclass(frozen=True)
+class SnapshotCV:
+    """
+    Secciones visibles de un perfil, ya filtradas y ordenadas
+    """
+    perfil: DatosPersonales
+    experiencias: tuple = ()
+    reconocimientos: tuple = ()
+    cursos: tuple = ()
+    productos_academicos: tuple = ()
+    productos_laborales: tuple = ()
+    ventas_garage: tuple = ()
+
+    def seccion(self, clave):
+        """
+        Filas de una sección a partir de su clave ('experiencia', 'cursos', ...)
+        """
+        return getattr(self, CAMPOS_SNAPSHOT[clave])
+
+    def como_contexto(self):
+        """
+        Diccionario listo para usar como contexto de template
+        """
+        return {
+            'snapshot': self,
+            'experiencias': self.experiencias,
+            'reconocimientos': self.reconocimientos,
+            'cursos': self.cursos,
+            'productos_academicos': self.productos_academicos,
+            'productos_laborales': self.productos_laborales,
+            'ventas_garage': self.ventas_garage,
+        }
+
+
+# Campo del dataclass para cada clave de sección
+CAMPOS_SNAPSHOT = {
+    'experiencia': 'experiencias',
+    'reconocimientos': 'reconocimientos',
+    'cursos': 'cursos',
+    'productos_academicos': 'productos_academicos',
+    'productos_laborales': 'productos_laborales',
+    'venta_garage': 'ventas_garage',
+}
+
+
+def prefetches_cv(secciones=None):
+    """
+    Prefetch de las secciones visibles; con `secciones` solo se cargan las activas
+    """
+    return [
+        Prefetch(
+            relacion,
+            queryset=modelo.objects.filter(activarparaqueseveaenfront=True).order_by(orden),
+            to_attr=_atributo_snapshot(relacion)
+        )
+        for clave, relacion, modelo, orden in SECCIONES_CV
+        if secciones is None or secciones.get(clave, False)
+    ]
+
+
+def snapshot_desde_perfil(perfil):
+    """
+    Construye el snapshot de un perfil cuyas secciones ya fueron precargadas
+    con prefetches_cv(); las secciones no precargadas quedan vacías
+    """
+    datos = {}
+    for clave, relacion, _, _ in SECCIONES_CV:
+        filas = getattr(perfil, _atributo_snapshot(relacion), None)
+        if filas is not None:
+            datos[CAMPOS_SNAPSHOT[clave]] = tuple(filas)
+    return SnapshotCV(perfil=perfil, **datos)
+
+
+def cargar_snapshot_cv(perfil, secciones=None):
+    """
+    Carga el snapshot de un perfil con una query por sección solicitada
+    """
+    prefetch_related_objects([perfil], *prefetches_cv(secciones))
+    return snapshot_desde_perfil(perfil)
+
+
+def ultimas_filas(perfil, clave, limite=3):
+    """
+    Las `limite` filas visibles más recientes de una sección (una query)
+    """
+    for clave_seccion, relacion, _, orden in SECCIONES_CV:
+        if clave_seccion == clave:
+            return list(
+                getattr(perfil, relacion).filter(activarparaqueseveaenfront=True).order_by(orden)[:limite]
+            )
+    raise KeyError(clave)
+
+
+def perfiles_publicos():
+    """
+    Perfiles cuyo CV se puede ver públicamente
+    """
+    return DatosPersonales.objects.filter(perfilactivo=1)
+
+
+def _conteo_visibles(modelo):
+    """
+    Subquery con el número de filas visibles de `modelo` para el perfil externo
+    """
+    return Coalesce(
+        Subquery(
+            modelo.objects
+            .filter(idperfilconqueestaactivo=OuterRef('pk'), activarparaqueseveaenfront=True)
+            .order_by()
+            .values('idperfilconqueestaactivo')
+            .annotate(total=Count('pk'))
+            .values('total'),
+            output_field=IntegerField()
+        ),
+        Value(0)
+    )
+
+
+def anotar_conteos_visibles(queryset, secciones=None):
+    """
+    Anota en cada perfil `n_<clave>` con sus filas visibles, sin JOINs entre secciones
+    """
+    return queryset.annotate(**{
+        f"n_{clave}": _conteo_visibles(modelo)
+        for clave, _, modelo, _ in SECCIONES_CV
+        if secciones is None or secciones.get(clave, False)
+    })
+
+
+def contar_filas_visibles(perfil, secciones=None):
+    """
+    Total de filas visibles del perfil en las secciones indicadas (una query)
+    """
+    campos = [
+        f"n_{clave}" for clave, _, _, _ in SECCIONES_CV
+        if secciones is None or secciones.get(clave, False)
+    ]
+    if not campos:
+        return 0
+
+    conteos = (
+        anotar_conteos_visibles(DatosPersonales.objects.filter(pk=perfil.pk), secciones)
+        .values(*campos)
+        .first()
+    )
+    return sum(conteos.values()) if conteos else 0
@@ -0,0 +1,172 @@
+"""
+Exportación de los CVs públicos a HTML estático precomprimido
+
+Cada CV público se renderiza con CVPublicoView y public_cv.html y se escribe
+en <salida>/cv/<slug>/index.html junto a index.html.gz e index.html.br, de
+modo que whitenoise o un servidor de archivos los sirva sin Django ni base
+de datos. manifest.json registra la versión exportada de cada perfil; en la
+siguiente ejecución solo se renderizan los perfiles cuya versión cambió y
+se borran los que dejaron de ser públicos.
+
+Como en pdf_bulk_export, el render corre en un pool de procesos y los
+modelos se importan dentro de las funciones del pool.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+
+import brotli
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.db import connections
+from django.test import RequestFactory
+from django.urls import reverse
+from django.utils import timezone
+
+from .pdf_jobs import inicializar_proceso
+
+
+NOMBRE_MANIFIESTO = 'manifest.json'
+
+
+def version_estatica(perfil_id, fecha_actualizacion):
+    """
+    Versión exportada de un perfil (cambia con el perfil o cualquier fila hija)
+    """
+    return f"{perfil_id}-{int(fecha_actualizacion.timestamp() * 1_000_000)}"
+
+
+def _escribir_atomico(ruta, datos):
+    # El servidor de archivos nunca ve un archivo a medio escribir
+    temporal = f"{ruta}.tmp"
+    with open(temporal, 'wb') as archivo:
+        archivo.write(datos)
+    os.replace(temporal, ruta)
+
+
+def _directorio_cv(salida, slug):
+    return os.path.join(salida, 'cv', slug)
+
+
+def renderizar_cv_estatico(perfil_id, salida):
+    """
+    Renderiza y escribe el CV de un perfil con sus variantes comprimidas
+
+    Se ejecuta en un proceso del pool. Devuelve (perfil_id, entrada del manifiesto, error).
+    """
+    from .models import DatosPersonales
+    from .views import CVPublicoView
+
+    try:
+        perfil = DatosPersonales.objects.get(pk=perfil_id)
+        request = RequestFactory().get(reverse('curriculum:cv_publico', args=[perfil.slug]))
+        request.user = AnonymousUser()
+
+        # Sin pasar por dispatch: ni caché de página ni GET condicional
+        vista = CVPublicoView()
+        vista.setup(request, slug=perfil.slug)
+        respuesta = vista.get(request, slug=perfil.slug)
+        html = respuesta.render().content
+
+        directorio = _directorio_cv(salida, perfil.slug)
+        os.makedirs(directorio, exist_ok=True)
+        ruta = os.path.join(directorio, 'index.html')
+        _escribir_atomico(ruta, html)
+        _escribir_atomico(f"{ruta}.gz", gzip.compress(html, compresslevel=9, mtime=0))
+        _escribir_atomico(f"{ruta}.br", brotli.compress(html, mode=brotli.MODE_TEXT))
+
+        return perfil_id, {
+            'perfil_id': perfil_id,
+            'version': version_estatica(perfil_id, perfil.fecha_actualizacion),
+            'archivo': os.path.relpath(ruta, salida),
+            'bytes': len(html),
+            'sha256': hashlib.sha256(html).hexdigest(),
+            'fecha_exportacion': timezone.now().isoformat(),
+        }, ''
+    except Exception as e:
+        return perfil_id, None, f"{e.__class__.__name__}: {e}"
+
+
+def leer_manifiesto(salida):
+    try:
+        with open(os.path.join(salida, NOMBRE_MANIFIESTO), encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except FileNotFoundError:
+        return {'perfiles': {}}
+
+
+def _guardar_manifiesto(salida, manifiesto):
+    datos = json.dumps(manifiesto, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8')
+    _escribir_atomico(os.path.join(salida, NOMBRE_MANIFIESTO), datos)
+
+
+def exportar_cvs_estaticos(salida, todos=False, workers=None, progreso=None):
+    """
+    Exporta los CVs públicos nuevos o modificados desde la última ejecución
+
+    Args:
+        salida: directorio raíz de los archivos estáticos
+        todos: re-exportar todos los CVs aunque su versión no haya cambiado
+        workers: procesos del pool (por defecto CV_PDF_WORKERS o núcleos de CPU)
+        progreso: callable opcional (hechos, total, slug, error)
+
+    Devuelve un dict con las listas 'exportados', 'sin_cambios', 'eliminados' y 'errores'.
+    """
+    from .cv_snapshot import perfiles_publicos
+
+    os.makedirs(salida, exist_ok=True)
+    manifiesto = leer_manifiesto(salida)
+    anteriores = manifiesto.get('perfiles', {})
+
+    publicos = {
+        slug: (perfil_id, version_estatica(perfil_id, fecha))
+        for perfil_id, slug, fecha in perfiles_publicos().values_list('pk', 'slug', 'fecha_actualizacion').iterator()
+    }
+
+    pendientes = [
+        (slug, perfil_id) for slug, (perfil_id, version) in sorted(publicos.items())
+        if todos or anteriores.get(slug, {}).get('version') != version
+    ]
+    slugs_pendientes = {slug for slug, _ in pendientes}
+    resultado = {
+        'exportados': [],
+        'sin_cambios': [slug for slug in publicos if slug not in slugs_pendientes],
+        'eliminados': [],
+        'errores': [],
+    }
+
+    # Perfiles que ya no son públicos (o cambiaron de slug)
+    perfiles = {slug: entrada for slug, entrada in anteriores.items() if slug in publicos}
+    for slug in anteriores.keys() - publicos.keys():
+        shutil.rmtree(_directorio_cv(salida, slug), ignore_errors=True)
+        resultado['eliminados'].append(slug)
+
+    if pendientes:
+        workers = max(1, workers or getattr(settings, 'CV_PDF_WORKERS', None) or os.cpu_count() or 1)
+        slugs = {perfil_id: slug for slug, perfil_id in pendientes}
+        ids = [perfil_id for _, perfil_id in pendientes]
+
+        # Los procesos hijos no deben heredar conexiones abiertas
+        connections.close_all()
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=inicializar_proceso) as pool:
+            resultados = pool.map(renderizar_cv_estatico, ids, [salida] * len(ids), chunksize=8)
+            for hechos, (perfil_id, entrada, error) in enumerate(resultados, start=1):
+                slug = slugs[perfil_id]
+                if error:
+                    resultado['errores'].append((slug, error))
+                else:
+                    perfiles[slug] = entrada
+                    resultado['exportados'].append(slug)
+                if progreso:
+                    progreso(hechos, len(ids), slug, error)
+
+    _guardar_manifiesto(salida, {
+        'generado': timezone.now().isoformat(),
+        'perfiles': perfiles,
+    })
+    return resultado
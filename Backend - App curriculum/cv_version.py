@@ -0,0 +1,89 @@
+"""
+Versión de un CV para GET condicional (ETag / Last-Modified / 304)
+
+La versión de un perfil es su fecha_actualizacion: signals.py la actualiza
+también cuando se crea, edita o elimina cualquier fila hija, así que una
+sola lectura de la fila basta para saber si el cliente tiene la versión
+vigente, sin renderizar templates ni ejecutar ReportLab.
+"""
+
+from datetime import datetime, time
+from functools import wraps
+
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .models import DatosPersonales
+from .cv_snapshot import perfiles_publicos
+
+
+def _version(queryset):
+    return queryset.values_list('pk', 'fecha_actualizacion').first()
+
+
+def version_perfil_publico(request, slug, **kwargs):
+    """
+    (pk, fecha_actualizacion) del CV público con ese slug, o None
+    """
+    return _version(perfiles_publicos().filter(slug=slug))
+
+
+def version_perfil_usuario(request, *args, **kwargs):
+    """
+    (pk, fecha_actualizacion) del perfil del usuario autenticado, o None
+    """
+    if not request.user.is_authenticated:
+        return None
+    return _version(DatosPersonales.objects.filter(usuario=request.user))
+
+
+def _ultima_modificacion(fecha_actualizacion):
+    # La edad y la fecha de generación cambian a diario aunque el perfil no cambie
+    inicio_del_dia = timezone.make_aware(datetime.combine(timezone.localdate(), time.min))
+    return max(fecha_actualizacion, inicio_del_dia)
+
+
+def etag_cv(pk, fecha_actualizacion, variante=''):
+    marca = int(fecha_actualizacion.timestamp() * 1_000_000)
+    return quote_etag(f"cv-{pk}-{marca}-{timezone.localdate():%Y%m%d}{variante}")
+
+
+def condicional_cv(obtener_version, variante='', privado=False):
+    """
+    Decorador: responde 304 si el cliente ya tiene la versión vigente del CV
+
+    A diferencia de django.views.decorators.http.condition, los headers de
+    validación solo se agregan a respuestas 200 (no a la página de espera
+    del PDF ni a redirecciones).
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return vista(request, *args, **kwargs)
+
+            version = obtener_version(request, *args, **kwargs)
+            if version is None:
+                return vista(request, *args, **kwargs)
+
+            pk, fecha_actualizacion = version
+            etag = etag_cv(pk, fecha_actualizacion, variante)
+            ultima_modificacion = _ultima_modificacion(fecha_actualizacion).timestamp()
+
+            respuesta = get_conditional_response(request, etag=etag, last_modified=ultima_modificacion)
+            if respuesta is None:
+                respuesta = vista(request, *args, **kwargs)
+                if respuesta.status_code != 200:
+                    return respuesta
+                respuesta.headers.setdefault('ETag', etag)
+                respuesta.headers.setdefault('Last-Modified', http_date(ultima_modificacion))
+
+            if privado:
+                patch_cache_control(respuesta, private=True, no_cache=True)
+            else:
+                patch_cache_control(respuesta, public=True, no_cache=True)
+            return respuesta
+
+        return envoltura
+    return decorador
@@ -4,6 +4,7 @@ from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
+from django.core.validators import FileExtensionValidator
 from crispy_forms.helper import FormHelper
 from crispy_forms.layout import Layout, Submit, Row, Column, Div, HTML
 from datetime import date
@@ -14,7 +15,8 @@ from .models import (
     CursoRealizado,
     ProductoAcademico,
     ProductoLaboral,
-    VentaGarage
+    VentaGarage,
+    BusquedaGuardada
 )
 
 
@@ -53,7 +55,8 @@ class DatosPersonalesForm(forms.ModelForm):
             # Control de secciones PDF
             'mostrar_experiencia_pdf', 'mostrar_reconocimientos_pdf',
             'mostrar_cursos_pdf', 'mostrar_productos_academicos_pdf',
-            'mostrar_productos_laborales_pdf', 'mostrar_venta_garage_pdf'
+            'mostrar_productos_laborales_pdf', 'mostrar_venta_garage_pdf',
+            'tema_pdf'
         ]
         widgets = {
             'descripcionperfil': forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Mi Perfil Profesional'}),
@@ -72,6 +75,7 @@ class DatosPersonalesForm(forms.ModelForm):
             'direcciondomiciliaria': forms.TextInput(attrs={'class': 'form-control'}),
             'sitioweb': forms.URLInput(attrs={'class': 'form-control', 'placeholder': 'https://'}),
             'foto': forms.FileInput(attrs={'class': 'form-control', 'accept': 'image/*'}),
+            'tema_pdf': forms.Select(attrs={'class': 'form-select'}),
         }
     
     def clean_fechanacimiento(self):
@@ -325,3 +329,79 @@ class SelectorSeccionesPDFForm(forms.Form):
             self.fields['mostrar_productos_academicos'].initial = perfil.mostrar_productos_academicos_pdf
             self.fields['mostrar_productos_laborales'].initial = perfil.mostrar_productos_laborales_pdf
             self.fields['mostrar_venta_garage'].initial = perfil.mostrar_venta_garage_pdf
+
+
+# ======================================
+# FORMULARIO: BÚSQUEDAS GUARDADAS
+# ======================================
+
+class BusquedaGuardadaForm(forms.ModelForm):
+    """
+    Nombre, palabras clave y experiencia mínima; las facetas llegan de los filtros activos
+    """
+    class Meta:
+        model = BusquedaGuardada
+        fields = ['nombre', 'palabras', 'anos_minimos']
+        widgets = {
+            'nombre': forms.TextInput(attrs={'class': 'form-control form-control-sm', 'placeholder': 'Ej: Desarrolladores Quito'}),
+            'palabras': forms.TextInput(attrs={'class': 'form-control form-control-sm', 'placeholder': 'Ej: python django'}),
+            'anos_minimos': forms.NumberInput(attrs={'class': 'form-control form-control-sm', 'min': 0, 'max': 60}),
+        }
+
+
+# ======================================
+# FORMULARIOS: IMPORTACIÓN MASIVA
+# ======================================
+
+class PerfilImportacionForm(DatosPersonalesForm):
+    """
+    DatosPersonalesForm más la visibilidad; la unicidad se comprueba por lote (cv_importacion.py)
+    """
+    class Meta(DatosPersonalesForm.Meta):
+        fields = DatosPersonalesForm.Meta.fields + ['perfilactivo']
+    
+    def validate_unique(self):
+        pass
+
+
+class ImportarPerfilesForm(forms.Form):
+    """
+    Subida de un archivo de perfiles desde el admin
+    """
+    archivo = forms.FileField(
+        label='Archivo',
+        help_text='CSV (una fila por perfil) o JSON Lines (un perfil por línea, con experiencias y cursos anidados)'
+    )
+    seccion = forms.ChoiceField(
+        label='Contenido',
+        choices=[
+            ('', 'Perfiles'),
+            ('experiencias', 'Experiencias de perfiles existentes'),
+            ('cursos', 'Cursos de perfiles existentes'),
+        ],
+        required=False
+    )
+    
+    def clean_archivo(self):
+        archivo = self.cleaned_data.get('archivo')
+        from .cv_importacion import formato_de_archivo, validar_codificacion
+        try:
+            self.formato = formato_de_archivo(archivo.name)
+            # Se lee decodificando durante la importación: un byte inválido a
+            # mitad del archivo la cortaría con lotes ya guardados
+            validar_codificacion(archivo)
+        except ValueError as error:
+            raise ValidationError(str(error))
+        return archivo
+
+
+class ImportarCVForm(forms.Form):
+    """
+    Subida del propio CV desde LinkedIn o JSON Resume (cv_importacion_externa.py)
+    """
+    archivo = forms.FileField(
+        label='Archivo',
+        help_text='ZIP de "Obtener una copia de tus datos" de LinkedIn o un archivo JSON Resume (.json)',
+        validators=[FileExtensionValidator(['zip', 'json'])],
+        widget=forms.FileInput(attrs={'class': 'form-control', 'accept': '.zip,.json'})
+    )
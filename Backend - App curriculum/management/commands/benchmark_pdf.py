@@ -0,0 +1,74 @@
+"""
+Benchmark de generación de PDF con perfiles sintéticos
+
+Uso:
+    python manage.py benchmark_pdf --salida bench.json
+    python manage.py benchmark_pdf --base bench.json --tolerancia 0.2
+"""
+
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from curriculum.pdf_benchmark import (
+    TAMANOS_POR_DEFECTO,
+    ejecutar_benchmark,
+    comparar_con_base,
+)
+
+
+class Command(BaseCommand):
+    help = 'Mide tiempo, memoria, queries y tamaño de generar_cv_pdf_profesional y detecta regresiones'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tamanos',
+            nargs='*',
+            type=int,
+            default=list(TAMANOS_POR_DEFECTO),
+            help='Filas por tabla hija de cada perfil sintético (por defecto 1 10 100 1000)'
+        )
+        parser.add_argument('--todas', action='store_true', help='Medir las 64 combinaciones de secciones')
+        parser.add_argument('--salida', help='Archivo JSON donde guardar los resultados')
+        parser.add_argument('--base', help='Resultados JSON previos contra los que comparar')
+        parser.add_argument(
+            '--tolerancia',
+            type=float,
+            default=getattr(settings, 'CV_PDF_BENCHMARK_TOLERANCIA', 0.2),
+            help='Aumento relativo permitido frente a la base (0.2 = 20%%)'
+        )
+    
+    def handle(self, *args, **options):
+        def progreso(resultado):
+            self.stdout.write(
+                f"{resultado['filas']:>5} filas | {resultado['secciones']:<45} | "
+                f"{resultado['tiempo_s']:>8.3f} s | {resultado['memoria_pico_kb']:>10.1f} KB | "
+                f"{resultado['queries']:>3} queries | {resultado['tamano_pdf_bytes']:>9} bytes"
+            )
+        
+        resultados = ejecutar_benchmark(
+            tamanos=options['tamanos'],
+            todas_las_combinaciones=options['todas'],
+            progreso=progreso,
+        )
+        
+        if options['salida']:
+            with open(options['salida'], 'w', encoding='utf-8') as archivo:
+                json.dump({'resultados': resultados}, archivo, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Resultados guardados en {options['salida']}"))
+        
+        if options['base']:
+            with open(options['base'], encoding='utf-8') as archivo:
+                base = json.load(archivo)['resultados']
+            
+            regresiones = comparar_con_base(resultados, base, options['tolerancia'])
+            for r in regresiones:
+                self.stdout.write(self.style.ERROR(
+                    f"Regresión en {r['filas']} filas / {r['secciones']}: "
+                    f"{r['metrica']} {r['base']} -> {r['actual']}"
+                ))
+            if regresiones:
+                raise CommandError(f"{len(regresiones)} métricas superan el umbral de regresión")
+            
+            self.stdout.write(self.style.SUCCESS('Sin regresiones frente a la base'))
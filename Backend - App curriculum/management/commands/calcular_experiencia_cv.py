@@ -0,0 +1,61 @@
+"""
+Recalcula los años de experiencia (periodos solapados fusionados) de los CVs
+
+Los trabajos sin fecha de fin suman un día cada día, así que conviene
+programarlo a diario (cron). También es necesario una vez tras crear las
+columnas de experiencia en EstadisticasCV.
+
+Uso:
+    python manage.py calcular_experiencia_cv
+    python manage.py calcular_experiencia_cv --ids 3 8 15
+    python manage.py calcular_experiencia_cv --lote 10000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from curriculum.cv_busquedas_guardadas import busquedas_con_experiencia, reevaluar_perfiles
+from curriculum.cv_experiencia import actualizar_experiencia
+from curriculum.cv_facetas import indice_facetas
+from curriculum.models import ExperienciaLaboral
+
+
+class Command(BaseCommand):
+    help = 'Recalcula los años de experiencia guardados de los CVs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', nargs='*', type=int, help='Ids de DatosPersonales (por defecto, todos)')
+        parser.add_argument('--lote', type=int, default=5000, help='Perfiles por lote')
+
+    def handle(self, *args, **options):
+        def progreso(hechos, total):
+            self.stdout.write(f"  {hechos}/{total} perfiles")
+
+        inicio = time.perf_counter()
+        total = actualizar_experiencia(
+            perfil_ids=options['ids'] or None,
+            tamano_lote=options['lote'],
+            progreso=progreso if options['verbosity'] > 1 else None
+        )
+        # bulk_update no dispara signals: los tramos de experiencia cambiaron
+        indice_facetas.invalidar()
+
+        if busquedas_con_experiencia():
+            # Solo crece la experiencia de quien tiene trabajos en curso
+            en_curso = (
+                ExperienciaLaboral.objects
+                .filter(fechafingestion__isnull=True, activarparaqueseveaenfront=True)
+                .values_list('idperfilconqueestaactivo', flat=True)
+                .distinct()
+            )
+            if options['ids']:
+                en_curso = en_curso.filter(idperfilconqueestaactivo__in=options['ids'])
+            ids = sorted(en_curso)
+            agregados = 0
+            for desde in range(0, len(ids), options['lote']):
+                agregados += reevaluar_perfiles(ids[desde:desde + options['lote']])[0]
+            self.stdout.write(f"Búsquedas guardadas: {agregados} resultados nuevos")
+        self.stdout.write(self.style.SUCCESS(
+            f"Experiencia recalculada para {total} perfiles en {time.perf_counter() - inicio:.1f}s"
+        ))
@@ -0,0 +1,53 @@
+"""
+Precalcula los perfiles similares (TF-IDF y similitud coseno) de los CVs públicos
+
+Incremental: solo recalcula los perfiles que cambiaron desde la última
+ejecución y los vecinos que dependen de ellos. Pensado para cron; --completo
+reconstruye también el vocabulario (conviene de vez en cuando, porque los
+términos nuevos no entran al vocabulario en las ejecuciones incrementales).
+
+Uso:
+    python manage.py calcular_similares_cv
+    python manage.py calcular_similares_cv --completo
+    python manage.py calcular_similares_cv --estado /var/cv/similares -k 20
+"""
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from curriculum.cv_similares import calcular_similares
+
+
+class Command(BaseCommand):
+    help = 'Precalcula los perfiles similares de los CVs públicos'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--estado',
+            default=getattr(settings, 'CV_SIMILARES_DIR', None),
+            help='Directorio del estado entre ejecuciones (por defecto CV_SIMILARES_DIR)'
+        )
+        parser.add_argument('--completo', action='store_true', help='Reconstruir vocabulario y todos los vecinos')
+        parser.add_argument('-k', type=int, default=None, help='Vecinos por perfil (por defecto CV_SIMILARES_K o 10)')
+
+    def handle(self, *args, **options):
+        if not options['estado']:
+            raise CommandError('Indica --estado o configura CV_SIMILARES_DIR')
+
+        def progreso(hechos, total):
+            self.stdout.write(f"  {hechos}/{total} perfiles")
+
+        inicio = time.perf_counter()
+        resultado = calcular_similares(
+            options['estado'],
+            completo=options['completo'],
+            k=options['k'],
+            progreso=progreso if options['verbosity'] > 1 else None
+        )
+        modo = 'completo' if resultado['completo'] else 'incremental'
+        self.stdout.write(self.style.SUCCESS(
+            f"Similares ({modo}): {resultado['recalculados']} de {resultado['perfiles']} perfiles recalculados, "
+            f"{resultado['terminos']} términos, {time.perf_counter() - inicio:.1f}s"
+        ))
@@ -0,0 +1,53 @@
+"""
+Exporta los CVs en PDF de varios perfiles a un ZIP
+
+Uso:
+    python manage.py exportar_cvs --salida cvs.zip
+    python manage.py exportar_cvs --ids 3 8 15 --workers 4 --salida seleccion.zip
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from curriculum.models import DatosPersonales
+from curriculum.pdf_bulk_export import generar_zip_cvs
+
+
+class Command(BaseCommand):
+    help = 'Genera en paralelo los PDFs de los perfiles indicados y los escribe en un ZIP'
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--salida', required=True, help='Ruta del archivo ZIP a generar')
+        parser.add_argument('--ids', nargs='*', type=int, help='Ids de DatosPersonales (por defecto, todos)')
+        parser.add_argument('--solo-activos', action='store_true', help='Exportar solo perfiles activos')
+        parser.add_argument('--workers', type=int, default=None, help='Procesos del pool (por defecto CV_PDF_WORKERS o núcleos de CPU)')
+    
+    def handle(self, *args, **options):
+        perfiles = DatosPersonales.objects.order_by('pk')
+        if options['ids']:
+            perfiles = perfiles.filter(pk__in=options['ids'])
+        if options['solo_activos']:
+            perfiles = perfiles.filter(perfilactivo=1)
+        
+        perfil_ids = list(perfiles.values_list('pk', flat=True))
+        if not perfil_ids:
+            raise CommandError('No hay perfiles para exportar')
+        
+        errores = []
+        
+        def progreso(hechos, total, perfil_id, error):
+            if error:
+                errores.append(perfil_id)
+                self.stdout.write(self.style.ERROR(f"[{hechos}/{total}] Perfil {perfil_id}: {error}"))
+            else:
+                self.stdout.write(f"[{hechos}/{total}] Perfil {perfil_id} exportado")
+        
+        with open(options['salida'], 'wb') as destino:
+            for parte in generar_zip_cvs(perfil_ids, workers=options['workers'], progreso=progreso):
+                destino.write(parte)
+        
+        exportados = len(perfil_ids) - len(errores)
+        self.stdout.write(self.style.SUCCESS(
+            f"{exportados} de {len(perfil_ids)} CVs exportados en {options['salida']}"
+        ))
+        if errores:
+            self.stdout.write(self.style.WARNING(f"Perfiles con error (ver reporte.csv): {errores}"))
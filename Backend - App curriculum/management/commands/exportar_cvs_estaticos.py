@@ -0,0 +1,51 @@
+"""
+Exporta los CVs públicos a HTML estático (con variantes .gz y .br) y un manifest.json
+
+Por defecto solo re-exporta los perfiles que cambiaron desde la última ejecución.
+
+Uso:
+    python manage.py exportar_cvs_estaticos --salida /srv/cvs
+    python manage.py exportar_cvs_estaticos --salida /srv/cvs --todos --workers 8
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from curriculum.cv_static_export import exportar_cvs_estaticos
+
+
+class Command(BaseCommand):
+    help = 'Renderiza los CVs públicos a archivos estáticos precomprimidos'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--salida',
+            default=getattr(settings, 'CV_ESTATICOS_DIR', None),
+            help='Directorio de salida (por defecto CV_ESTATICOS_DIR)'
+        )
+        parser.add_argument('--todos', action='store_true', help='Re-exportar todos los CVs aunque no hayan cambiado')
+        parser.add_argument('--workers', type=int, default=None, help='Procesos del pool (por defecto CV_PDF_WORKERS o núcleos de CPU)')
+    
+    def handle(self, *args, **options):
+        if not options['salida']:
+            raise CommandError('Indica --salida o configura CV_ESTATICOS_DIR')
+        
+        def progreso(hechos, total, slug, error):
+            if error:
+                self.stdout.write(self.style.ERROR(f"[{hechos}/{total}] {slug}: {error}"))
+            else:
+                self.stdout.write(f"[{hechos}/{total}] {slug} exportado")
+        
+        resultado = exportar_cvs_estaticos(
+            options['salida'],
+            todos=options['todos'],
+            workers=options['workers'],
+            progreso=progreso
+        )
+        
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(resultado['exportados'])} exportados, {len(resultado['sin_cambios'])} sin cambios, "
+            f"{len(resultado['eliminados'])} eliminados en {options['salida']}"
+        ))
+        if resultado['errores']:
+            self.stdout.write(self.style.WARNING(f"CVs con error: {[slug for slug, _ in resultado['errores']]}"))
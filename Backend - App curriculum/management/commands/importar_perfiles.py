@@ -0,0 +1,94 @@
+"""
+Importa perfiles en masa (una cohorte) desde CSV o JSON Lines
+
+Valida cada fila con las mismas reglas que el formulario web y crea los
+usuarios (sin contraseña utilizable), perfiles, experiencias y cursos con
+bulk_create por lotes. Las filas con errores no se importan y se listan en
+el reporte (--errores); el resto sigue.
+
+Uso:
+    python manage.py importar_perfiles cohorte.jsonl
+    python manage.py importar_perfiles cohorte.csv --experiencias exp.csv --cursos cursos.csv
+    python manage.py importar_perfiles cohorte.csv --lote 1000 --errores errores.csv
+"""
+
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from curriculum.cv_importacion import (
+    TAMANO_LOTE,
+    ResultadoImportacion,
+    escribir_reporte,
+    formato_de_archivo,
+    importar_perfiles,
+    importar_seccion,
+    leer_filas
+)
+
+
+class Command(BaseCommand):
+    help = 'Importa perfiles en masa desde CSV o JSON Lines'
+
+    def add_arguments(self, parser):
+        parser.add_argument('archivo', help='Perfiles: .csv o .jsonl')
+        parser.add_argument('--experiencias', help='CSV de experiencias con la columna numerocedula')
+        parser.add_argument('--cursos', help='CSV de cursos con la columna numerocedula')
+        parser.add_argument('--lote', type=int, default=TAMANO_LOTE, help='Filas por lote')
+        parser.add_argument('--errores', help='Ruta del reporte de errores en CSV (por defecto, stderr)')
+        parser.add_argument(
+            '--sin-derivados',
+            action='store_true',
+            help='No recalcular estadísticas ni índice de búsqueda (correr luego los comandos de recálculo)'
+        )
+
+    def _abrir(self, ruta):
+        try:
+            return open(ruta, encoding='utf-8-sig', newline=''), formato_de_archivo(ruta)
+        except (OSError, ValueError) as error:
+            raise CommandError(str(error))
+
+    def handle(self, *args, **options):
+        derivados = not options['sin_derivados']
+        resultado = ResultadoImportacion()
+
+        def progreso(resultado):
+            if options['verbosity'] > 1:
+                self.stdout.write(
+                    f"  {resultado.perfiles} perfiles, {dict(resultado.filas)} filas, "
+                    f"{resultado.filas_rechazadas} rechazadas"
+                )
+
+        inicio = time.perf_counter()
+        archivo, formato = self._abrir(options['archivo'])
+        with archivo:
+            importar_perfiles(
+                leer_filas(archivo, formato), options['lote'], derivados, progreso, resultado
+            )
+
+        for seccion in ('experiencias', 'cursos'):
+            if options[seccion]:
+                archivo, formato = self._abrir(options[seccion])
+                with archivo:
+                    importar_seccion(
+                        seccion, leer_filas(archivo, formato), options['lote'], derivados, progreso, resultado
+                    )
+
+        if resultado.errores:
+            if options['errores']:
+                with open(options['errores'], 'w', encoding='utf-8', newline='') as reporte:
+                    escribir_reporte(resultado.errores, reporte)
+            else:
+                escribir_reporte(resultado.errores, sys.stderr)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultado.perfiles} perfiles importados ({dict(resultado.filas)}) "
+            f"en {time.perf_counter() - inicio:.1f}s"
+        ))
+        if resultado.errores:
+            self.stdout.write(self.style.WARNING(
+                f"{resultado.filas_rechazadas} filas rechazadas, {len(resultado.errores)} errores"
+            ))
+        if not derivados:
+            self.stdout.write('Pendiente: correr recalcular_estadisticas_cv y reindexar_busqueda_cv')
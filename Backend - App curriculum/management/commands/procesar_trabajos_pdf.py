@@ -0,0 +1,82 @@
+"""
+Worker de render PDF: procesa la cola TrabajoRenderPDF en un pool de procesos
+
+Uso:
+    python manage.py procesar_trabajos_pdf --workers 4
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from curriculum.pdf_jobs import (
+    reclamar_trabajos,
+    liberar_trabajos_colgados,
+    purgar_trabajos,
+    inicializar_proceso,
+    ejecutar_trabajo,
+)
+
+
+# Segundos entre purgas de trabajos terminados
+INTERVALO_PURGA = 3600
+
+
+class Command(BaseCommand):
+    help = 'Procesa los trabajos de generación de PDF pendientes en un pool de procesos'
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=getattr(settings, 'CV_PDF_WORKERS', None) or os.cpu_count() or 1,
+            help='Número de procesos del pool (por defecto CV_PDF_WORKERS o núcleos de CPU)'
+        )
+        parser.add_argument(
+            '--intervalo',
+            type=float,
+            default=2.0,
+            help='Segundos de espera entre consultas cuando la cola está vacía'
+        )
+        parser.add_argument(
+            '--una-vez',
+            action='store_true',
+            help='Procesa los trabajos pendientes y termina'
+        )
+    
+    def handle(self, *args, **options):
+        workers = max(1, options['workers'])
+        self.stdout.write(f"Worker de PDF iniciado con {workers} procesos")
+        
+        ultima_purga = None
+        with ProcessPoolExecutor(max_workers=workers, initializer=inicializar_proceso) as pool:
+            while True:
+                liberados = liberar_trabajos_colgados()
+                if liberados:
+                    self.stdout.write(self.style.WARNING(f"{liberados} trabajos colgados devueltos a la cola"))
+                
+                if ultima_purga is None or time.monotonic() - ultima_purga > INTERVALO_PURGA:
+                    purgados = purgar_trabajos()
+                    ultima_purga = time.monotonic()
+                    if purgados:
+                        self.stdout.write(f"{purgados} trabajos terminados purgados")
+                
+                trabajos = reclamar_trabajos(workers * 2)
+                
+                if not trabajos:
+                    if options['una_vez']:
+                        break
+                    time.sleep(options['intervalo'])
+                    continue
+                
+                # Los procesos hijos no deben heredar conexiones abiertas
+                connections.close_all()
+                
+                for trabajo_id, estado in pool.map(ejecutar_trabajo, trabajos):
+                    self.stdout.write(f"Trabajo {trabajo_id}: {estado}")
+        
+        self.stdout.write(self.style.SUCCESS('Cola de PDFs procesada'))
@@ -0,0 +1,40 @@
+"""
+Recalcula los contadores por sección y la completitud guardados en EstadisticasCV,
+y los contadores globales de la página principal
+
+Necesario una vez tras crear la tabla, y cuando se modifiquen filas con
+queryset.update() o SQL directo (no disparan signals).
+
+Uso:
+    python manage.py recalcular_estadisticas_cv
+    python manage.py recalcular_estadisticas_cv --ids 3 8 15
+"""
+
+from django.core.management.base import BaseCommand
+
+from curriculum.models import DatosPersonales
+from curriculum.cv_estadisticas import actualizar_estadisticas
+from curriculum.cv_contadores import reconciliar_contadores
+
+
+class Command(BaseCommand):
+    help = 'Recalcula las estadísticas guardadas de los CVs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', nargs='*', type=int, help='Ids de DatosPersonales (por defecto, todos)')
+
+    def handle(self, *args, **options):
+        perfiles = DatosPersonales.objects.order_by('pk')
+        if options['ids']:
+            perfiles = perfiles.filter(pk__in=options['ids'])
+
+        total = 0
+        for perfil_id in perfiles.values_list('pk', flat=True).iterator():
+            actualizar_estadisticas(perfil_id)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Estadísticas recalculadas para {total} perfiles"))
+
+        if not options['ids']:
+            contadores = reconciliar_contadores()
+            self.stdout.write(f"Contadores globales: {contadores}")
@@ -0,0 +1,36 @@
+"""
+Reconstruye el índice de búsqueda de texto completo de los CVs
+
+Necesario una vez tras crear la tabla, y cuando se modifiquen filas con
+queryset.update() o SQL directo (no disparan signals).
+
+Uso:
+    python manage.py reindexar_busqueda_cv
+    python manage.py reindexar_busqueda_cv --ids 3 8 15
+"""
+
+from django.core.management.base import BaseCommand
+
+from curriculum.models import DatosPersonales
+from curriculum.cv_busqueda import actualizar_indice_busqueda, preparar_indice_busqueda
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de búsqueda de los CVs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ids', nargs='*', type=int, help='Ids de DatosPersonales (por defecto, todos)')
+
+    def handle(self, *args, **options):
+        preparar_indice_busqueda()
+
+        perfiles = DatosPersonales.objects.order_by('pk')
+        if options['ids']:
+            perfiles = perfiles.filter(pk__in=options['ids'])
+
+        total = 0
+        for perfil_id in perfiles.values_list('pk', flat=True).iterator():
+            actualizar_indice_busqueda(perfil_id)
+            total += 1
+
+        self.stdout.write(self.style.SUCCESS(f"{total} perfiles indexados"))
@@ -0,0 +1,68 @@
+"""
+Reporte CSV de completitud de los CVs, de menor a mayor completitud
+
+Uso:
+    python manage.py reporte_completitud --salida completitud.csv
+    python manage.py reporte_completitud --maximo 50 --solo-activos --salida pendientes.csv
+"""
+
+import csv
+import sys
+
+from django.core.management.base import BaseCommand
+
+from curriculum.models import DatosPersonales
+from curriculum.cv_estadisticas import SECCIONES_COMPLETITUD, anotar_completitud
+
+
+class Command(BaseCommand):
+    help = 'Escribe un CSV con la completitud de cada CV y las secciones vacías'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--salida', help='Ruta del CSV (por defecto, salida estándar)')
+        parser.add_argument('--maximo', type=int, default=None, help='Solo perfiles con completitud menor o igual a este valor')
+        parser.add_argument('--solo-activos', action='store_true', help='Solo perfiles activos')
+
+    def handle(self, *args, **options):
+        perfiles = anotar_completitud(DatosPersonales.objects.all())
+        if options['maximo'] is not None:
+            perfiles = perfiles.filter(completitud_cv__lte=options['maximo'])
+        if options['solo_activos']:
+            perfiles = perfiles.filter(perfilactivo=1)
+
+        conteos = [f"n_{clave}" for clave in SECCIONES_COMPLETITUD]
+        filas = perfiles.order_by('completitud_cv', 'pk').values(
+            'pk', 'nombres', 'apellidos', 'numerocedula', 'usuario__email', 'foto',
+            'fecha_actualizacion', 'completitud_cv', *conteos
+        )
+
+        destino = open(options['salida'], 'w', newline='', encoding='utf-8') if options['salida'] else sys.stdout
+        try:
+            escritor = csv.writer(destino)
+            escritor.writerow([
+                'perfil_id', 'nombre', 'cedula', 'email', 'completitud',
+                *SECCIONES_COMPLETITUD, 'pendiente', 'fecha_actualizacion'
+            ])
+
+            total = 0
+            for fila in filas.iterator():
+                pendiente = [clave for clave in SECCIONES_COMPLETITUD if not fila[f"n_{clave}"]]
+                if not fila['foto']:
+                    pendiente.append('foto')
+                escritor.writerow([
+                    fila['pk'],
+                    f"{fila['nombres']} {fila['apellidos']}",
+                    fila['numerocedula'],
+                    fila['usuario__email'],
+                    fila['completitud_cv'],
+                    *(fila[campo] for campo in conteos),
+                    ' '.join(pendiente),
+                    fila['fecha_actualizacion'].isoformat(),
+                ])
+                total += 1
+        finally:
+            if destino is not sys.stdout:
+                destino.close()
+
+        if options['salida']:
+            self.stdout.write(self.style.SUCCESS(f"{total} perfiles escritos en {options['salida']}"))
@@ -0,0 +1,34 @@
+"""
+Reconstruye las etiquetas normalizadas de los productos académicos
+
+Necesario una vez tras crear las tablas de etiquetas, y cuando se modifique
+el clasificador con queryset.update() o SQL directo (no disparan signals).
+También borra las etiquetas que quedaron sin productos.
+
+Uso:
+    python manage.py sincronizar_etiquetas
+    python manage.py sincronizar_etiquetas --lote 500
+"""
+
+from django.core.management.base import BaseCommand
+
+from curriculum.models import Etiqueta
+from curriculum.cv_etiquetas import sincronizar_todas
+from curriculum.cv_facetas import indice_facetas
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye las etiquetas de los productos académicos'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=1000, help='Productos por transacción')
+
+    def handle(self, *args, **options):
+        total = sincronizar_todas(tamano_lote=options['lote'])
+        huerfanas, _ = Etiqueta.objects.filter(asignaciones__isnull=True).delete()
+        indice_facetas.invalidar()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} productos sincronizados, {Etiqueta.objects.count()} etiquetas "
+            f"({huerfanas} sin uso eliminadas)"
+        ))
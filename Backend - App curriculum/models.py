@@ -1,12 +1,15 @@
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator, FileExtensionValidator
 from django.core.exceptions import ValidationError
 from django.urls import reverse
 from datetime import date
 import uuid
 
+from .pdf_themes import TEMA_CHOICES, TEMA_POR_DEFECTO
+
 
 # ======================================
 # VALIDADORES PERSONALIZADOS
@@ -85,7 +88,7 @@ class DatosPersonales(models.Model):
     numerocedula = models.CharField(max_length=10, unique=True, verbose_name='Número de Cédula')
     sexo = models.CharField(max_length=1, choices=SEXO_CHOICES, verbose_name='Sexo')
     estadocivil = models.CharField(max_length=50, choices=ESTADO_CIVIL_CHOICES, verbose_name='Estado Civil')
-    licenciaconducir = models.CharField(max_length=6, choices=LICENCIA_CHOICES, default='NINGUNA', verbose_name='Licencia de Conducir')
+    licenciaconducir = models.CharField(max_length=7, choices=LICENCIA_CHOICES, default='NINGUNA', verbose_name='Licencia de Conducir')
     
     # Contacto
     telefonoconvencional = models.CharField(max_length=15, blank=True, verbose_name='Teléfono Convencional')
@@ -105,6 +108,7 @@ class DatosPersonales(models.Model):
     mostrar_productos_academicos_pdf = models.BooleanField(default=True, verbose_name='Mostrar Productos Académicos en PDF')
     mostrar_productos_laborales_pdf = models.BooleanField(default=True, verbose_name='Mostrar Productos Laborales en PDF')
     mostrar_venta_garage_pdf = models.BooleanField(default=True, verbose_name='Mostrar Venta Garage en PDF')
+    tema_pdf = models.CharField(max_length=20, choices=TEMA_CHOICES, default=TEMA_POR_DEFECTO, verbose_name='Tema del PDF')
     
     # Metadata
     fecha_creacion = models.DateTimeField(auto_now_add=True)
@@ -121,9 +125,12 @@ class DatosPersonales(models.Model):
     
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = f"{self.nombres.lower()}-{self.apellidos.lower()}-{uuid.uuid4().hex[:8]}"
+            self.slug = self.generar_slug()
         super().save(*args, **kwargs)
     
+    def generar_slug(self):
+        return f"{self.nombres.lower()}-{self.apellidos.lower()}-{uuid.uuid4().hex[:8]}"
+    
     @property
     def nombre_completo(self):
         return f"{self.nombres} {self.apellidos}"
@@ -192,6 +199,14 @@ class ExperienciaLaboral(models.Model):
         verbose_name = 'Experiencia Laboral'
         verbose_name_plural = 'Experiencias Laborales'
         ordering = ['-fechainiciogestion']  # CORREGIDO: Orden cronológico de más reciente a antigua
+        # Secciones visibles de un perfil, ya ordenadas (ver cv_snapshot.SECCIONES_CV)
+        indexes = [
+            models.Index(
+                fields=['idperfilconqueestaactivo', '-fechainiciogestion'],
+                condition=models.Q(activarparaqueseveaenfront=True),
+                name='experiencialab_visible_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.cargodesempenado} en {self.nombrempresa}"
@@ -258,6 +273,13 @@ class Reconocimiento(models.Model):
         verbose_name = 'Reconocimiento'
         verbose_name_plural = 'Reconocimientos'
         ordering = ['-fechareconocimiento']  # CORREGIDO: Orden cronológico
+        indexes = [
+            models.Index(
+                fields=['idperfilconqueestaactivo', '-fechareconocimiento'],
+                condition=models.Q(activarparaqueseveaenfront=True),
+                name='reconocim_visible_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.tiporeconocimiento} - {self.entidadpatrocinadora}"
@@ -318,6 +340,13 @@ class CursoRealizado(models.Model):
         verbose_name = 'Curso Realizado'
         verbose_name_plural = 'Cursos Realizados'
         ordering = ['-fechainicio']  # CORREGIDO: Orden cronológico
+        indexes = [
+            models.Index(
+                fields=['idperfilconqueestaactivo', '-fechainicio'],
+                condition=models.Q(activarparaqueseveaenfront=True),
+                name='cursos_visible_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.nombrecurso} - {self.entidadpatrocinadora}"
@@ -355,6 +384,12 @@ class ProductoAcademico(models.Model):
         help_text='Etiquetas separadas por comas. Ej: ingeniería,tecnologíainformación,basesdedatos,pregrado'
     )
     descripcion = models.TextField(verbose_name='Descripción')
+    etiquetas = models.ManyToManyField(
+        'Etiqueta',
+        through='EtiquetaProducto',
+        related_name='productos_academicos',
+        blank=True
+    )
     
     # Control
     activarparaqueseveaenfront = models.BooleanField(default=True, verbose_name='Activar para Front')
@@ -367,13 +402,71 @@ class ProductoAcademico(models.Model):
         verbose_name = 'Producto Académico'
         verbose_name_plural = 'Productos Académicos'
         ordering = ['-fecha_creacion']
+        indexes = [
+            models.Index(
+                fields=['idperfilconqueestaactivo', '-fecha_creacion'],
+                condition=models.Q(activarparaqueseveaenfront=True),
+                name='prodacad_visible_idx'
+            ),
+        ]
     
     def __str__(self):
         return self.nombrerecurso
     
     def get_etiquetas(self):
         """Devuelve lista de etiquetas"""
-        return [tag.strip() for tag in self.clasificador.split(',') if tag.strip()]
+        # Las normalizadas por sincronizar_etiquetas, en su forma canónica
+        # (Etiqueta.nombre) y ordenadas por clave; prefetch_related('etiquetas')
+        # evita la query. clasificador es solo el texto que edita el usuario
+        return [etiqueta.nombre for etiqueta in self.etiquetas.all()]
+
+
+# ======================================
+# MODELO: ETIQUETAS DE PRODUCTOS ACADÉMICOS
+# ======================================
+
+class Etiqueta(models.Model):
+    """
+    Etiqueta normalizada del clasificador de productos académicos
+    `clave` es el nombre sin tildes y en minúsculas (ver cv_etiquetas.py)
+    """
+    nombre = models.CharField(max_length=100, verbose_name='Nombre')
+    clave = models.CharField(max_length=100, unique=True, verbose_name='Clave')
+    
+    class Meta:
+        db_table = 'etiquetas'
+        verbose_name = 'Etiqueta'
+        verbose_name_plural = 'Etiquetas'
+        ordering = ['clave']
+    
+    def __str__(self):
+        return self.nombre
+
+
+class EtiquetaProducto(models.Model):
+    """
+    Relación producto académico - etiqueta
+    La mantiene cv_etiquetas.py a partir de ProductoAcademico.clasificador
+    """
+    etiqueta = models.ForeignKey(Etiqueta, on_delete=models.CASCADE, related_name='asignaciones')
+    producto = models.ForeignKey(
+        ProductoAcademico,
+        on_delete=models.CASCADE,
+        related_name='asignaciones_etiqueta',
+        db_column='idproductoacademico'
+    )
+    
+    class Meta:
+        db_table = 'etiquetasproductos'
+        verbose_name = 'Etiqueta de Producto'
+        verbose_name_plural = 'Etiquetas de Productos'
+        constraints = [
+            # También sirve de índice para "productos con la etiqueta X"
+            models.UniqueConstraint(fields=['etiqueta', 'producto'], name='etiqueta_producto_unico'),
+        ]
+    
+    def __str__(self):
+        return f"{self.etiqueta} - {self.producto}"
 
 
 # ======================================
@@ -408,6 +501,13 @@ class ProductoLaboral(models.Model):
         verbose_name = 'Producto Laboral'
         verbose_name_plural = 'Productos Laborales'
         ordering = ['-fechaproducto']
+        indexes = [
+            models.Index(
+                fields=['idperfilconqueestaactivo', '-fechaproducto'],
+                condition=models.Q(activarparaqueseveaenfront=True),
+                name='prodlab_visible_idx'
+            ),
+        ]
     
     def __str__(self):
         return self.nombreproducto
@@ -461,6 +561,13 @@ class VentaGarage(models.Model):
         verbose_name = 'Venta Garage'
         verbose_name_plural = 'Ventas Garage'
         ordering = ['-fecha_publicacion']
+        indexes = [
+            models.Index(
+                fields=['idperfilconqueestaactivo', '-fecha_publicacion'],
+                condition=models.Q(activarparaqueseveaenfront=True),
+                name='ventagarage_visible_idx'
+            ),
+        ]
     
     def __str__(self):
         return f"{self.nombreproducto} - ${self.valordelbien}"
@@ -471,3 +578,278 @@ class VentaGarage(models.Model):
             return '#28a745'  # Verde
         else:
             return '#ffc107'  # Amarillo
+
+
+# ======================================
+# MODELO: TRABAJOS DE RENDER PDF
+# ======================================
+
+class TrabajoRenderPDF(models.Model):
+    """
+    Cola de trabajos de generación de PDF
+    Los procesa el comando procesar_trabajos_pdf fuera del ciclo de request
+    """
+    PENDIENTE = 'pendiente'
+    PROCESANDO = 'procesando'
+    COMPLETADO = 'completado'
+    ERROR = 'error'
+    
+    ESTADO_CHOICES = [
+        (PENDIENTE, 'Pendiente'),
+        (PROCESANDO, 'Procesando'),
+        (COMPLETADO, 'Completado'),
+        (ERROR, 'Error'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    perfil = models.ForeignKey(
+        DatosPersonales,
+        on_delete=models.CASCADE,
+        related_name='trabajos_pdf'
+    )
+    
+    secciones = models.JSONField(verbose_name='Secciones Seleccionadas')
+    huella = models.CharField(max_length=64, db_index=True, verbose_name='Huella del CV')
+    estado = models.CharField(max_length=20, choices=ESTADO_CHOICES, default=PENDIENTE, db_index=True, verbose_name='Estado')
+    error = models.TextField(blank=True, verbose_name='Error')
+    
+    # Metadata
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_inicio = models.DateTimeField(null=True, blank=True)
+    fecha_fin = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        db_table = 'trabajosrenderpdf'
+        verbose_name = 'Trabajo de Render PDF'
+        verbose_name_plural = 'Trabajos de Render PDF'
+        ordering = ['fecha_creacion']
+    
+    def __str__(self):
+        return f"PDF de {self.perfil} - {self.estado}"
+
+
+# ======================================
+# MODELO: ESTADÍSTICAS DEL CV
+# ======================================
+
+# Año medio, para pasar días de experiencia a años
+DIAS_POR_ANO = 365.25
+
+
+class EstadisticasCV(models.Model):
+    """
+    Contadores de filas visibles por sección y completitud del CV
+    Los mantiene cv_estadisticas.py desde signals; no se editan a mano
+    """
+    perfil = models.OneToOneField(
+        DatosPersonales,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='estadisticas',
+        db_column='idperfil'
+    )
+    
+    total_experiencia = models.PositiveIntegerField(default=0, verbose_name='Experiencias')
+    total_reconocimientos = models.PositiveIntegerField(default=0, verbose_name='Reconocimientos')
+    total_cursos = models.PositiveIntegerField(default=0, verbose_name='Cursos')
+    total_productos_academicos = models.PositiveIntegerField(default=0, verbose_name='Productos Académicos')
+    total_productos_laborales = models.PositiveIntegerField(default=0, verbose_name='Productos Laborales')
+    total_venta_garage = models.PositiveIntegerField(default=0, verbose_name='Venta Garage')
+    completitud = models.PositiveSmallIntegerField(default=0, verbose_name='Completitud (%)')
+    
+    # Experiencia laboral visible con los periodos solapados fusionados (cv_experiencia.py)
+    dias_experiencia = models.PositiveIntegerField(default=0, db_index=True, verbose_name='Días de experiencia')
+    experiencia_por_ano = models.JSONField(default=dict, blank=True, verbose_name='Días de experiencia por año')
+    fecha_calculo_experiencia = models.DateField(null=True, blank=True, verbose_name='Experiencia calculada al')
+    
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'estadisticascv'
+        verbose_name = 'Estadísticas del CV'
+        verbose_name_plural = 'Estadísticas de CVs'
+    
+    def __str__(self):
+        return f"Estadísticas de {self.perfil_id} - {self.completitud}%"
+    
+    @property
+    def anos_experiencia(self):
+        """Años completos de experiencia (sin contar solapamientos)"""
+        return int(self.dias_experiencia // DIAS_POR_ANO)
+
+
+# ======================================
+# MODELO: DOCUMENTO CV MATERIALIZADO
+# ======================================
+
+class DocumentoCV(models.Model):
+    """
+    Contenido visible del CV ya resuelto en JSON, una fila por perfil
+    Lo reconstruye cv_documento.py desde signals; `version` sube en cada escritura
+    """
+    perfil = models.OneToOneField(
+        DatosPersonales,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='documento',
+        db_column='idperfil'
+    )
+    
+    version = models.PositiveIntegerField(default=0, verbose_name='Versión')
+    contenido = models.JSONField(default=dict, verbose_name='Contenido')
+    
+    fecha_generacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'documentoscv'
+        verbose_name = 'Documento CV'
+        verbose_name_plural = 'Documentos CV'
+    
+    def __str__(self):
+        return f"Documento CV de {self.perfil_id} - v{self.version}"
+
+
+# ======================================
+# MODELO: ÍNDICE DE BÚSQUEDA
+# ======================================
+
+class IndiceBusquedaCV(models.Model):
+    """
+    Texto buscable de cada perfil, agrupado por peso
+    El índice invertido (FTS5 en SQLite, GIN en PostgreSQL) lo crea cv_busqueda.py
+    """
+    perfil = models.OneToOneField(
+        DatosPersonales,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='indice_busqueda',
+        db_column='idperfil'
+    )
+    
+    texto_perfil = models.TextField(blank=True, verbose_name='Datos del Perfil')
+    texto_experiencia = models.TextField(blank=True, verbose_name='Experiencia')
+    texto_formacion = models.TextField(blank=True, verbose_name='Cursos y Productos Académicos')
+    
+    # Solo PostgreSQL: en SQLite queda vacío y se usa la tabla FTS5
+    vector = SearchVectorField(null=True, editable=False)
+    
+    fecha_actualizacion = models.DateTimeField(auto_now=True)
+    
+    class Meta:
+        db_table = 'indicebusquedacv'
+        verbose_name = 'Índice de Búsqueda'
+        verbose_name_plural = 'Índices de Búsqueda'
+    
+    def __str__(self):
+        return f"Índice de búsqueda de {self.perfil_id}"
+
+
+# ======================================
+# MODELO: PERFILES SIMILARES
+# ======================================
+
+class PerfilSimilar(models.Model):
+    """
+    Vecino precalculado de un perfil por similitud coseno de TF-IDF
+    Lo escribe cv_similares.py (calcular_similares); la vista solo lo lee
+    """
+    perfil = models.ForeignKey(
+        DatosPersonales,
+        on_delete=models.CASCADE,
+        related_name='similares',
+        db_column='idperfil'
+    )
+    similar = models.ForeignKey(
+        DatosPersonales,
+        on_delete=models.CASCADE,
+        related_name='+',
+        db_column='idperfilsimilar'
+    )
+    posicion = models.PositiveSmallIntegerField(verbose_name='Posición')
+    puntaje = models.FloatField(verbose_name='Similitud')
+    
+    class Meta:
+        db_table = 'perfilessimilares'
+        verbose_name = 'Perfil Similar'
+        verbose_name_plural = 'Perfiles Similares'
+        ordering = ['perfil', 'posicion']
+        constraints = [
+            # También es el índice de la consulta de la vista: perfil = X ORDER BY posicion
+            models.UniqueConstraint(fields=['perfil', 'posicion'], name='perfil_similar_posicion_unica'),
+        ]
+    
+    def __str__(self):
+        return f"{self.perfil_id} ~ {self.similar_id} ({self.puntaje:.2f})"
+
+
+# ======================================
+# MODELO: BÚSQUEDAS GUARDADAS
+# ======================================
+
+class BusquedaGuardada(models.Model):
+    """
+    Búsqueda de un reclutador: palabras clave, facetas y experiencia mínima
+    cv_busquedas_guardadas.py mantiene sus resultados al cambiar los perfiles
+    """
+    usuario = models.ForeignKey(User, on_delete=models.CASCADE, related_name='busquedas_guardadas')
+    nombre = models.CharField(max_length=100, verbose_name='Nombre')
+    palabras = models.CharField(max_length=200, blank=True, verbose_name='Palabras clave')
+    filtros = models.JSONField(default=dict, blank=True, verbose_name='Facetas')
+    anos_minimos = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name='Años mínimos de experiencia')
+    
+    fecha_creacion = models.DateTimeField(auto_now_add=True)
+    fecha_revision = models.DateTimeField(null=True, blank=True, verbose_name='Última revisión')
+    
+    class Meta:
+        db_table = 'busquedasguardadas'
+        verbose_name = 'Búsqueda Guardada'
+        verbose_name_plural = 'Búsquedas Guardadas'
+        ordering = ['-fecha_creacion']
+    
+    def __str__(self):
+        return f"{self.nombre} ({self.usuario})"
+
+
+class TerminoBusqueda(models.Model):
+    """
+    Índice invertido: término (palabra, valor de faceta o '*') -> búsquedas que lo exigen
+    """
+    busqueda = models.ForeignKey(BusquedaGuardada, on_delete=models.CASCADE, related_name='terminos')
+    termino = models.CharField(max_length=150, db_index=True)
+    
+    class Meta:
+        db_table = 'terminosbusquedas'
+        constraints = [
+            models.UniqueConstraint(fields=['busqueda', 'termino'], name='termino_busqueda_unico'),
+        ]
+    
+    def __str__(self):
+        return f"{self.termino} -> {self.busqueda_id}"
+
+
+class ResultadoBusqueda(models.Model):
+    """
+    Perfil que cumple una búsqueda guardada, desde `fecha_coincidencia`
+    """
+    busqueda = models.ForeignKey(BusquedaGuardada, on_delete=models.CASCADE, related_name='resultados')
+    perfil = models.ForeignKey(
+        DatosPersonales,
+        on_delete=models.CASCADE,
+        related_name='busquedas_coincidentes',
+        db_column='idperfil'
+    )
+    fecha_coincidencia = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        db_table = 'resultadosbusquedas'
+        verbose_name = 'Resultado de Búsqueda'
+        verbose_name_plural = 'Resultados de Búsquedas'
+        constraints = [
+            models.UniqueConstraint(fields=['busqueda', 'perfil'], name='resultado_busqueda_unico'),
+        ]
+        indexes = [
+            models.Index(fields=['busqueda', '-fecha_coincidencia'], name='resultado_busqueda_fecha_idx'),
+        ]
+    
+    def __str__(self):
+        return f"{self.busqueda_id} - {self.perfil_id}"
@@ -0,0 +1,249 @@
+"""
+Benchmark de generar_cv_pdf_profesional con perfiles sintéticos
+
+Crea perfiles con N filas en cada tabla hija (y descripciones largas),
+mide tiempo, memoria pico, número de queries y tamaño del PDF para cada
+combinación de secciones, y compara contra una línea base guardada.
+Todo se ejecuta dentro de una transacción que se revierte al final.
+"""
+
+import itertools
+import time
+import tracemalloc
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from .models import (
+    DatosPersonales,
+    ExperienciaLaboral,
+    Reconocimiento,
+    CursoRealizado,
+    ProductoAcademico,
+    ProductoLaboral,
+    VentaGarage
+)
+from .pdf_generator import generar_cv_pdf_profesional
+from .cv_estadisticas import actualizar_estadisticas
+from .cv_documento import actualizar_documento
+
+
+TAMANOS_POR_DEFECTO = (1, 10, 100, 1000)
+
+CLAVES_SECCIONES = (
+    'experiencia',
+    'reconocimientos',
+    'cursos',
+    'productos_academicos',
+    'productos_laborales',
+    'venta_garage',
+)
+
+# Métrica comparable -> holgura absoluta (evita falsos positivos por ruido en valores pequeños)
+METRICAS_COMPARABLES = {
+    'tiempo_s': 0.05,
+    'memoria_pico_kb': 64,
+    'queries': 0,
+}
+
+TEXTO_LARGO = (
+    "Responsable del análisis, diseño e implementación de soluciones de software, "
+    "coordinación de equipos multidisciplinarios, levantamiento de requerimientos "
+    "con usuarios finales y seguimiento de indicadores de calidad del servicio. "
+) * 20
+
+
+# ======================================
+# DATOS SINTÉTICOS
+# ======================================
+
+def crear_perfil_sintetico(filas, indice=0):
+    """
+    Crea un perfil con `filas` registros visibles en cada una de sus seis tablas hijas
+    """
+    usuario = User.objects.create(username=f"benchmark_{filas}_{indice}")
+    perfil = DatosPersonales.objects.create(
+        usuario=usuario,
+        nombres='Perfil',
+        apellidos=f'Benchmark {filas}',
+        lugarnacimiento='Manta, Ecuador',
+        fechanacimiento=date(1990, 1, 1),
+        numerocedula=f"{filas:05d}{indice:05d}"[-10:],
+        sexo='H',
+        estadocivil='Soltero/a',
+        direcciondomiciliaria='Av. Principal 123',
+        telefonoconvencional='0991234567',
+        sitioweb='https://example.com',
+    )
+
+    hoy = date.today()
+    fechas = [hoy - timedelta(days=30 * (i + 1)) for i in range(filas)]
+
+    ExperienciaLaboral.objects.bulk_create([
+        ExperienciaLaboral(
+            idperfilconqueestaactivo=perfil,
+            cargodesempenado=f'Cargo {i}',
+            nombrempresa=f'Empresa {i}',
+            lugarempresa='Quito',
+            fechainiciogestion=fecha,
+            fechafingestion=fecha + timedelta(days=20),
+            descripcionfunciones=TEXTO_LARGO,
+        ) for i, fecha in enumerate(fechas)
+    ])
+    Reconocimiento.objects.bulk_create([
+        Reconocimiento(
+            idperfilconqueestaactivo=perfil,
+            tiporeconocimiento='Académico',
+            fechareconocimiento=fecha,
+            descripcionreconocimiento=f'Reconocimiento {i}',
+            entidadpatrocinadora=f'Entidad {i}',
+        ) for i, fecha in enumerate(fechas)
+    ])
+    CursoRealizado.objects.bulk_create([
+        CursoRealizado(
+            idperfilconqueestaactivo=perfil,
+            nombrecurso=f'Curso {i}',
+            fechainicio=fecha,
+            fechafin=fecha + timedelta(days=10),
+            totalhoras=40,
+            descripcioncurso=f'Descripción del curso {i}',
+            entidadpatrocinadora=f'Entidad {i}',
+        ) for i, fecha in enumerate(fechas)
+    ])
+    ProductoAcademico.objects.bulk_create([
+        ProductoAcademico(
+            idperfilconqueestaactivo=perfil,
+            nombrerecurso=f'Producto académico {i}',
+            clasificador='ingeniería,tecnología,basesdedatos',
+            descripcion=f'Descripción {i}',
+        ) for i in range(filas)
+    ])
+    ProductoLaboral.objects.bulk_create([
+        ProductoLaboral(
+            idperfilconqueestaactivo=perfil,
+            nombreproducto=f'Producto laboral {i}',
+            fechaproducto=fecha,
+            descripcion=f'Descripción {i}',
+        ) for i, fecha in enumerate(fechas)
+    ])
+    VentaGarage.objects.bulk_create([
+        VentaGarage(
+            idperfilconqueestaactivo=perfil,
+            nombreproducto=f'Artículo {i}',
+            estadoproducto='Bueno',
+            descripcion=f'Descripción {i}',
+            valordelbien=Decimal('10.00'),
+            fecha_publicacion=fecha,
+        ) for i, fecha in enumerate(fechas)
+    ])
+
+    # bulk_create no dispara signals
+    perfil.estadisticas = actualizar_estadisticas(perfil.pk)
+    perfil.documento = actualizar_documento(perfil.pk)
+    return perfil
+
+
+def combinaciones_secciones(todas=False):
+    """
+    Combinaciones a medir: cada sección sola, ninguna y todas;
+    con `todas=True`, las 64 combinaciones posibles
+    """
+    if todas:
+        for activas in itertools.product((False, True), repeat=len(CLAVES_SECCIONES)):
+            yield dict(zip(CLAVES_SECCIONES, activas))
+        return
+
+    yield {clave: False for clave in CLAVES_SECCIONES}
+    for seleccionada in CLAVES_SECCIONES:
+        yield {clave: clave == seleccionada for clave in CLAVES_SECCIONES}
+    yield {clave: True for clave in CLAVES_SECCIONES}
+
+
+def nombre_combinacion(secciones):
+    activas = [clave for clave, activa in secciones.items() if activa]
+    if not activas:
+        return 'ninguna'
+    if len(activas) == len(CLAVES_SECCIONES):
+        return 'todas'
+    return '+'.join(activas)
+
+
+# ======================================
+# MEDICIÓN
+# ======================================
+
+def medir_render(perfil_id, secciones):
+    """
+    Renderiza un PDF y devuelve sus métricas
+    """
+    # Instancia nueva para no reutilizar prefetches de una medición anterior
+    perfil = DatosPersonales.objects.get(pk=perfil_id)
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    with CaptureQueriesContext(connection) as queries:
+        buffer = generar_cv_pdf_profesional(perfil, secciones)
+    tiempo = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'tiempo_s': round(tiempo, 4),
+        'memoria_pico_kb': round(pico / 1024, 1),
+        'queries': len(queries),
+        'tamano_pdf_bytes': len(buffer.getvalue()),
+    }
+
+
+def ejecutar_benchmark(tamanos=TAMANOS_POR_DEFECTO, todas_las_combinaciones=False, progreso=None):
+    """
+    Ejecuta el benchmark completo y devuelve una lista de resultados
+
+    Los perfiles sintéticos se crean y se descartan dentro de una transacción.
+    """
+    resultados = []
+
+    with transaction.atomic():
+        for filas in tamanos:
+            perfil = crear_perfil_sintetico(filas)
+            for secciones in combinaciones_secciones(todas_las_combinaciones):
+                resultado = {
+                    'filas': filas,
+                    'secciones': nombre_combinacion(secciones),
+                    **medir_render(perfil.pk, secciones),
+                }
+                resultados.append(resultado)
+                if progreso:
+                    progreso(resultado)
+
+        transaction.set_rollback(True)
+
+    return resultados
+
+
+def comparar_con_base(resultados, base, tolerancia):
+    """
+    Devuelve las regresiones: métricas que superan la base en más de `tolerancia` (0.2 = 20%)
+    """
+    indice_base = {(r['filas'], r['secciones']): r for r in base}
+    regresiones = []
+
+    for resultado in resultados:
+        anterior = indice_base.get((resultado['filas'], resultado['secciones']))
+        if anterior is None:
+            continue
+        for metrica, holgura in METRICAS_COMPARABLES.items():
+            limite = max(anterior[metrica] * (1 + tolerancia), anterior[metrica] + holgura)
+            if resultado[metrica] > limite:
+                regresiones.append({
+                    'filas': resultado['filas'],
+                    'secciones': resultado['secciones'],
+                    'metrica': metrica,
+                    'base': anterior[metrica],
+                    'actual': resultado[metrica],
+                })
+
+    return regresiones
@@ -0,0 +1,124 @@
+"""
+Exportación masiva de CVs en PDF a un ZIP transmitido por streaming
+
+Los PDFs se generan en paralelo en un pool de procesos y se escriben en el
+ZIP a medida que llegan; nunca hay más de una ventana de PDFs en memoria.
+El error de un perfil no detiene el lote: queda registrado en reporte.csv
+dentro del mismo ZIP.
+
+Como en pdf_jobs, los modelos se importan dentro de las funciones que corren
+en los procesos del pool.
+"""
+
+import csv
+import io
+import logging
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.db import connections
+from django.utils.text import slugify
+
+from .pdf_generator import renderizar_pdf_cv
+from .pdf_jobs import inicializar_proceso
+
+
+logger = logging.getLogger(__name__)
+
+
+class SalidaStreaming(io.RawIOBase):
+    """
+    Destino de escritura no posicionable: acumula lo que escribe zipfile
+    hasta que el generador lo entrega
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._buffer = bytearray()
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._buffer.extend(datos)
+        return len(datos)
+
+    def vaciar(self):
+        datos = bytes(self._buffer)
+        self._buffer.clear()
+        return datos
+
+
+def renderizar_pdf_perfil(perfil_id):
+    """
+    Genera el PDF de un perfil respetando sus flags mostrar_*_pdf
+
+    Se ejecuta en un proceso del pool. Devuelve (perfil_id, nombre_archivo, pdf, error).
+    """
+    from .models import DatosPersonales
+
+    try:
+        perfil = DatosPersonales.objects.get(pk=perfil_id)
+        nombre = f"CV_{slugify(perfil.nombre_completo) or perfil_id}_{perfil.numerocedula}.pdf"
+        with renderizar_pdf_cv(perfil) as renderizado:
+            return perfil_id, nombre, renderizado.read(), ''
+    except Exception as e:
+        return perfil_id, None, None, f"{e.__class__.__name__}: {e}"
+
+
+def _resultados_en_paralelo(perfil_ids, workers):
+    """
+    Itera los resultados manteniendo como máximo workers * 2 PDFs en vuelo
+    """
+    ventana = workers * 2
+
+    # Los procesos hijos no deben heredar conexiones abiertas
+    connections.close_all()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=inicializar_proceso) as pool:
+        for inicio in range(0, len(perfil_ids), ventana):
+            lote = perfil_ids[inicio:inicio + ventana]
+            yield from pool.map(renderizar_pdf_perfil, lote)
+
+
+def generar_zip_cvs(perfil_ids, workers=None, progreso=None):
+    """
+    Genera, por partes, un ZIP con el PDF de cada perfil y un reporte.csv
+
+    Args:
+        perfil_ids: ids de DatosPersonales a exportar
+        workers: procesos del pool (por defecto CV_PDF_WORKERS o núcleos de CPU)
+        progreso: callable opcional (hechos, total, perfil_id, error)
+    """
+    perfil_ids = list(perfil_ids)
+    total = len(perfil_ids)
+    workers = max(1, workers or getattr(settings, 'CV_PDF_WORKERS', None) or os.cpu_count() or 1)
+
+    salida = SalidaStreaming()
+    reporte = io.StringIO()
+    escritor = csv.writer(reporte)
+    escritor.writerow(['perfil_id', 'archivo', 'estado', 'error'])
+
+    with zipfile.ZipFile(salida, 'w', compression=zipfile.ZIP_DEFLATED) as archivo_zip:
+        hechos = 0
+        for perfil_id, nombre, pdf, error in _resultados_en_paralelo(perfil_ids, workers):
+            hechos += 1
+            if error:
+                logger.warning('Exportación de CV %s fallida: %s', perfil_id, error)
+                escritor.writerow([perfil_id, '', 'error', error])
+            else:
+                archivo_zip.writestr(nombre, pdf)
+                escritor.writerow([perfil_id, nombre, 'ok', ''])
+
+            if progreso:
+                progreso(hechos, total, perfil_id, error)
+
+            datos = salida.vaciar()
+            if datos:
+                yield datos
+
+        archivo_zip.writestr('reporte.csv', reporte.getvalue())
+
+    yield salida.vaciar()
@@ -0,0 +1,189 @@
+"""
+Caché de PDFs de CV direccionada por contenido
+
+La clave de cada PDF es una huella (SHA-256) de la versión del perfil
+(fecha_actualizacion), su tema y las secciones seleccionadas. Si nada
+cambió, la huella es la misma y el PDF se sirve desde el storage sin volver
+a ejecutar ReportLab ni leer las secciones.
+"""
+
+import hashlib
+from datetime import date
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import default_storage
+
+from .pdf_generator import renderizar_pdf_cv, obtener_secciones_perfil
+
+
+# Incrementar cuando cambie el diseño del PDF para invalidar la caché completa
+VERSION_GENERADOR_PDF = 1
+
+
+# ======================================
+# HUELLA DEL CV
+# ======================================
+
+def calcular_huella_cv(perfil, secciones_seleccionadas=None):
+    """
+    Calcula la huella de un CV sin consultar sus secciones
+
+    fecha_actualizacion es la versión del CV completo: cambia al guardar el
+    perfil y con cualquier fila hija (signals.tocar_perfil, importaciones).
+    Incluye la fecha actual porque el PDF muestra la edad y la fecha de
+    generación, que cambian aunque el perfil no cambie.
+    """
+    if secciones_seleccionadas is None:
+        secciones_seleccionadas = obtener_secciones_perfil(perfil)
+
+    huella = hashlib.sha256(repr((
+        VERSION_GENERADOR_PDF,
+        date.today().isoformat(),
+        perfil.pk,
+        perfil.fecha_actualizacion.isoformat(),
+        perfil.tema_pdf,
+        sorted(secciones_seleccionadas.items()),
+    )).encode())
+    return huella.hexdigest()
+
+
+# ======================================
+# CACHÉ EN STORAGE
+# ======================================
+
+def _cache():
+    return caches[getattr(settings, 'CV_PDF_CACHE_ALIAS', 'default')]
+
+
+class CachePDF:
+    """
+    Guarda los PDFs renderizados en el storage configurado, acotados en tamaño
+
+    Cuando el total supera max_bytes se eliminan primero los archivos más antiguos.
+    Recorrer el directorio cuesta una llamada por archivo en Azure, así que el
+    total se lleva en un contador de la caché de Django (CV_PDF_CACHE_ALIAS) y
+    solo se recorre cuando el contador pasa del límite o expiró (cada
+    CV_PDF_CACHE_PURGA_INTERVALO segundos, para corregir lo que cambió fuera de
+    esta clase).
+    """
+
+    def __init__(self, storage=None, directorio=None, max_bytes=None):
+        self.storage = storage or default_storage
+        self.directorio = directorio or getattr(settings, 'CV_PDF_CACHE_DIR', 'cache_pdf')
+        self.max_bytes = max_bytes or getattr(settings, 'CV_PDF_CACHE_MAX_BYTES', 200 * 1024 * 1024)
+        self.intervalo_purga = getattr(settings, 'CV_PDF_CACHE_PURGA_INTERVALO', 15 * 60)
+
+    @property
+    def _clave_total(self):
+        return f"cv_pdf_cache:{self.directorio}:bytes"
+
+    @property
+    def _clave_purga(self):
+        return f"cv_pdf_cache:{self.directorio}:purgando"
+
+    def ruta(self, huella):
+        return f"{self.directorio}/{huella}.pdf"
+
+    def existe(self, huella):
+        return self.storage.exists(self.ruta(huella))
+
+    def obtener(self, huella):
+        """
+        Devuelve el archivo abierto si está en caché, o None
+        """
+        nombre = self.ruta(huella)
+        if not self.storage.exists(nombre):
+            return None
+        return self.storage.open(nombre, 'rb')
+
+    def guardar(self, huella, contenido):
+        """
+        Guarda el PDF (bytes o archivo abierto) y aplica el límite de tamaño
+        """
+        nombre = self.ruta(huella)
+        if not self.storage.exists(nombre):
+            if isinstance(contenido, bytes):
+                contenido = ContentFile(contenido)
+            else:
+                contenido = File(contenido, name=f"{huella}.pdf")
+            self.storage.save(nombre, contenido)
+            self._registrar(contenido.size, conservar=nombre)
+        return nombre
+
+    def _registrar(self, tamano, conservar=None):
+        """
+        Suma el PDF nuevo al total y purga solo si hace falta
+        """
+        cache = _cache()
+        try:
+            total = cache.incr(self._clave_total, tamano)
+        except ValueError:
+            # Contador expirado o caché reiniciada: el total real sale de purgar()
+            total = None
+
+        if total is not None and total <= self.max_bytes:
+            return
+        # Un solo proceso recorre el directorio a la vez
+        if cache.add(self._clave_purga, 1, 60):
+            try:
+                self.purgar(conservar=conservar)
+            finally:
+                cache.delete(self._clave_purga)
+
+    def purgar(self, conservar=None):
+        """
+        Elimina los PDFs más antiguos hasta quedar bajo max_bytes y deja el
+        total resultante en el contador
+        """
+        try:
+            _, archivos = self.storage.listdir(self.directorio)
+        except (FileNotFoundError, NotImplementedError):
+            return
+
+        entradas = []
+        total = 0
+        for archivo in archivos:
+            nombre = f"{self.directorio}/{archivo}"
+            try:
+                tamano = self.storage.size(nombre)
+                modificado = self.storage.get_modified_time(nombre)
+            except (FileNotFoundError, NotImplementedError):
+                continue
+            entradas.append((modificado, nombre, tamano))
+            total += tamano
+
+        entradas.sort()
+        for _, nombre, tamano in entradas:
+            if total <= self.max_bytes:
+                break
+            if nombre == conservar:
+                continue
+            self.storage.delete(nombre)
+            total -= tamano
+
+        _cache().set(self._clave_total, total, self.intervalo_purga)
+
+
+cache_pdf = CachePDF()
+
+
+def obtener_pdf_cv(perfil, secciones_seleccionadas=None):
+    """
+    Devuelve (archivo, huella) del PDF del CV, renderizándolo solo si no está en caché
+    """
+    huella = calcular_huella_cv(perfil, secciones_seleccionadas)
+
+    archivo = cache_pdf.obtener(huella)
+    if archivo is None:
+        renderizado = renderizar_pdf_cv(perfil, secciones_seleccionadas)
+        cache_pdf.guardar(huella, renderizado)
+        archivo = cache_pdf.obtener(huella)
+        if archivo is None:
+            renderizado.seek(0)
+            archivo = renderizado
+        else:
+            renderizado.close()
+
+    return archivo, huella
@@ -1,116 +1,154 @@
-
-
 from io import BytesIO
+from itertools import islice
+import tempfile
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
-from reportlab.lib import colors
 from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
+    SimpleDocTemplate, Paragraph, Spacer, Table,
     PageBreak, KeepTogether
 )
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
 from datetime import date
 
+from django.conf import settings
+
+from .pdf_themes import obtener_estilos
 
-def generar_cv_pdf_profesional(perfil, secciones_seleccionadas=None):
+
+def obtener_secciones_perfil(perfil):
     """
-    Genera PDF con secciones seleccionables
-    
-    Args:
-        perfil: Instancia de DatosPersonales
-        secciones_seleccionadas: Dict con las secciones a incluir
-            {
-                'experiencia': True/False,
-                'reconocimientos': True/False,
-                'cursos': True/False,
-                'productos_academicos': True/False,
-                'productos_laborales': True/False,
-                'venta_garage': True/False
-            }
+    Devuelve el dict de secciones a incluir según los flags mostrar_*_pdf del perfil
     """
-    buffer = BytesIO()
-    
-    # Si no se especifican secciones, usar configuración del perfil
-    if secciones_seleccionadas is None:
-        secciones_seleccionadas = {
-            'experiencia': perfil.mostrar_experiencia_pdf,
-            'reconocimientos': perfil.mostrar_reconocimientos_pdf,
-            'cursos': perfil.mostrar_cursos_pdf,
-            'productos_academicos': perfil.mostrar_productos_academicos_pdf,
-            'productos_laborales': perfil.mostrar_productos_laborales_pdf,
-            'venta_garage': perfil.mostrar_venta_garage_pdf,
-        }
-    
-    # Configuración del documento
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=2*cm,
-        leftMargin=2*cm,
-        topMargin=2*cm,
-        bottomMargin=2*cm,
-        title=f"CV_{perfil.nombre_completo}"
-    )
-    
-    elements = []
-    styles = getSampleStyleSheet()
-    
-    # Estilos personalizados
-    titulo_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=24,
-        textColor=colors.HexColor('#2E7D32'),
-        spaceAfter=6,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    subtitulo_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor('#666666'),
-        spaceAfter=15,
-        alignment=TA_CENTER
-    )
-    
-    seccion_style = ParagraphStyle(
-        'SectionTitle',
-        parent=styles['Heading2'],
-        fontSize=14,
-        textColor=colors.HexColor('#2E7D32'),
-        spaceAfter=10,
-        spaceBefore=15,
-        fontName='Helvetica-Bold'
-    )
-    
-    texto_normal = ParagraphStyle(
-        'CustomNormal',
-        parent=styles['Normal'],
-        fontSize=10,
-        spaceAfter=6,
-        alignment=TA_JUSTIFY
-    )
-    
-    texto_bold = ParagraphStyle(
-        'CustomBold',
-        parent=texto_normal,
-        fontName='Helvetica-Bold'
-    )
-    
+    return {
+        'experiencia': perfil.mostrar_experiencia_pdf,
+        'reconocimientos': perfil.mostrar_reconocimientos_pdf,
+        'cursos': perfil.mostrar_cursos_pdf,
+        'productos_academicos': perfil.mostrar_productos_academicos_pdf,
+        'productos_laborales': perfil.mostrar_productos_laborales_pdf,
+        'venta_garage': perfil.mostrar_venta_garage_pdf,
+    }
+
+
+# ======================================
+# ELEMENTOS POR ÍTEM
+# ======================================
+
+def _elementos_experiencia(exp, estilos):
+    elementos = [
+        Paragraph(f"<b>{exp.cargodesempenado}</b> - {exp.nombrempresa}", estilos.negrita),
+    ]
+
+    fecha_inicio = exp.fechainiciogestion.strftime("%m/%Y")
+    fecha_fin = exp.fechafingestion.strftime("%m/%Y") if exp.fechafingestion else "Presente"
+    elementos.append(Paragraph(f"{fecha_inicio} - {fecha_fin} | {exp.lugarempresa}", estilos.fechas))
+
+    if exp.descripcionfunciones:
+        elementos.append(Paragraph(exp.descripcionfunciones, estilos.normal))
+
+    return elementos
+
+
+def _elementos_reconocimiento(rec, estilos):
+    elementos = [
+        Paragraph(f"<b>{rec.tiporeconocimiento}</b> - {rec.entidadpatrocinadora}", estilos.negrita),
+        Paragraph(f"{rec.fechareconocimiento.strftime('%m/%Y')}", estilos.fechas),
+    ]
+
+    if rec.descripcionreconocimiento:
+        elementos.append(Paragraph(rec.descripcionreconocimiento, estilos.normal))
+
+    return elementos
+
+
+def _elementos_curso(curso, estilos):
+    elementos = [
+        Paragraph(f"<b>{curso.nombrecurso}</b> - {curso.entidadpatrocinadora}", estilos.negrita),
+        Paragraph(
+            f"{curso.fechainicio.strftime('%m/%Y')} - {curso.fechafin.strftime('%m/%Y')} | {curso.totalhoras} horas",
+            estilos.fechas
+        ),
+    ]
+
+    if curso.descripcioncurso:
+        elementos.append(Paragraph(curso.descripcioncurso, estilos.normal))
+
+    return elementos
+
+
+def _elementos_producto_academico(prod, estilos):
+    elementos = [Paragraph(f"<b>{prod.nombrerecurso}</b>", estilos.negrita)]
+
+    if prod.clasificador:
+        elementos.append(Paragraph(f"<i>Clasificadores: {prod.clasificador}</i>", estilos.etiquetas))
+
+    if prod.descripcion:
+        elementos.append(Paragraph(prod.descripcion, estilos.normal))
+
+    return elementos
+
+
+def _elementos_producto_laboral(prod, estilos):
+    elementos = [
+        Paragraph(f"<b>{prod.nombreproducto}</b>", estilos.negrita),
+        Paragraph(f"{prod.fechaproducto.strftime('%m/%Y')}", estilos.fechas),
+    ]
+
+    if prod.descripcion:
+        elementos.append(Paragraph(prod.descripcion, estilos.normal))
+
+    return elementos
+
+
+def _elementos_venta(venta, estilos):
+    elementos = [
+        Paragraph(f"<b>{venta.nombreproducto}</b> - Estado: {venta.estadoproducto}", estilos.negrita),
+        Paragraph(
+            f"Precio: ${venta.valordelbien} | Publicado: {venta.fecha_publicacion.strftime('%d/%m/%Y')}",
+            estilos.normal
+        ),
+    ]
+
+    if venta.descripcion:
+        elementos.append(Paragraph(venta.descripcion, estilos.normal))
+
+    return elementos
+
+
+# (clave de sección, título, constructor de elementos por ítem)
+SECCIONES_PDF = (
+    ('experiencia', "EXPERIENCIA LABORAL", _elementos_experiencia),
+    ('reconocimientos', "RECONOCIMIENTOS", _elementos_reconocimiento),
+    ('cursos', "CURSOS REALIZADOS", _elementos_curso),
+    ('productos_academicos', "PRODUCTOS ACADÉMICOS", _elementos_producto_academico),
+    ('productos_laborales', "PRODUCTOS LABORALES", _elementos_producto_laboral),
+    ('venta_garage', "VENTA GARAGE", _elementos_venta),
+)
+
+
+# ======================================
+# FLUJO DE FLOWABLES
+# ======================================
+
+def _flowables_cv(perfil, secciones_seleccionadas, filas_de_seccion, estilos):
+    """
+    Genera, uno a uno, los flowables del CV
+
+    `filas_de_seccion(clave)` devuelve un iterable con las filas visibles de
+    la sección; puede ser una tupla del snapshot o un iterador por lotes.
+    """
+    texto_normal = estilos.normal
+
+    # Separador entre ítems: el Spacer no guarda estado, se reutiliza
+    separador = Spacer(1, 0.3*cm)
+
     # ======================================
     # ENCABEZADO
     # ======================================
-    
-    nombre = Paragraph(perfil.nombre_completo.upper(), titulo_style)
-    elements.append(nombre)
-    
+
+    yield Paragraph(perfil.nombre_completo.upper(), estilos.titulo)
+
     # Información básica
-    info_basica = f"{perfil.descripcionperfil}"
-    elements.append(Paragraph(info_basica, subtitulo_style))
-    
+    yield Paragraph(f"{perfil.descripcionperfil}", estilos.subtitulo)
+
     # Datos de contacto
     contacto_data = [
         [
@@ -126,249 +164,206 @@ def generar_cv_pdf_profesional(perfil, secciones_seleccionadas=None):
             Paragraph(f"<b>Nacionalidad:</b> {perfil.nacionalidad}", texto_normal),
         ]
     ]
-    
+
     if perfil.sitioweb:
         contacto_data.append([
             Paragraph(f"<b>Sitio Web:</b> {perfil.sitioweb}", texto_normal),
             Paragraph(f"<b>Licencia:</b> {perfil.get_licenciaconducir_display()}", texto_normal),
         ])
-    
+
     contacto_table = Table(contacto_data, colWidths=[8*cm, 8*cm])
-    contacto_table.setStyle(TableStyle([
-        ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-        ('LEFTPADDING', (0, 0), (-1, -1), 0),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 0),
-    ]))
-    
-    elements.append(contacto_table)
-    elements.append(Spacer(1, 0.3*cm))
-    
+    contacto_table.setStyle(estilos.tabla_contacto)
+
+    yield contacto_table
+    yield separador
+
     # Línea separadora
     linea = Table([['']], colWidths=[16*cm])
-    linea.setStyle(TableStyle([
-        ('LINEABOVE', (0, 0), (-1, 0), 2, colors.HexColor('#2E7D32')),
-    ]))
-    elements.append(linea)
-    elements.append(Spacer(1, 0.3*cm))
-    
-    # ======================================
-    # EXPERIENCIA LABORAL
-    # ======================================
-    
-    if secciones_seleccionadas.get('experiencia', False):
-        experiencias = perfil.experiencias_laborales.filter(activarparaqueseveaenfront=True).order_by('-fechainiciogestion')
-        
-        if experiencias.exists():
-            elements.append(Paragraph("EXPERIENCIA LABORAL", seccion_style))
-            
-            for exp in experiencias:
-                exp_elementos = []
-                
-                cargo_empresa = Paragraph(
-                    f"<b>{exp.cargodesempenado}</b> - {exp.nombrempresa}",
-                    texto_bold
-                )
-                exp_elementos.append(cargo_empresa)
-                
-                fecha_inicio = exp.fechainiciogestion.strftime("%m/%Y")
-                fecha_fin = exp.fechafingestion.strftime("%m/%Y") if exp.fechafingestion else "Presente"
-                
-                fechas = Paragraph(
-                    f"{fecha_inicio} - {fecha_fin} | {exp.lugarempresa}",
-                    ParagraphStyle('dates', parent=texto_normal, fontSize=9, textColor=colors.grey)
-                )
-                exp_elementos.append(fechas)
-                
-                if exp.descripcionfunciones:
-                    desc = Paragraph(exp.descripcionfunciones, texto_normal)
-                    exp_elementos.append(desc)
-                
-                exp_elementos.append(Spacer(1, 0.3*cm))
-                
-                elements.append(KeepTogether(exp_elementos))
-    
-    # ======================================
-    # RECONOCIMIENTOS
-    # ======================================
-    
-    if secciones_seleccionadas.get('reconocimientos', False):
-        reconocimientos = perfil.reconocimientos.filter(activarparaqueseveaenfront=True).order_by('-fechareconocimiento')
-        
-        if reconocimientos.exists():
-            elements.append(Spacer(1, 0.3*cm))
-            elements.append(Paragraph("RECONOCIMIENTOS", seccion_style))
-            
-            for rec in reconocimientos:
-                rec_elementos = []
-                
-                titulo_rec = Paragraph(
-                    f"<b>{rec.tiporeconocimiento}</b> - {rec.entidadpatrocinadora}",
-                    texto_bold
-                )
-                rec_elementos.append(titulo_rec)
-                
-                fecha_rec = Paragraph(
-                    f"{rec.fechareconocimiento.strftime('%m/%Y')}",
-                    ParagraphStyle('dates', parent=texto_normal, fontSize=9, textColor=colors.grey)
-                )
-                rec_elementos.append(fecha_rec)
-                
-                if rec.descripcionreconocimiento:
-                    desc_rec = Paragraph(rec.descripcionreconocimiento, texto_normal)
-                    rec_elementos.append(desc_rec)
-                
-                rec_elementos.append(Spacer(1, 0.3*cm))
-                
-                elements.append(KeepTogether(rec_elementos))
-    
-    # ======================================
-    # CURSOS REALIZADOS
-    # ======================================
-    
-    if secciones_seleccionadas.get('cursos', False):
-        cursos = perfil.cursos_realizados.filter(activarparaqueseveaenfront=True).order_by('-fechainicio')
-        
-        if cursos.exists():
-            elements.append(Spacer(1, 0.3*cm))
-            elements.append(Paragraph("CURSOS REALIZADOS", seccion_style))
-            
-            for curso in cursos:
-                curso_elementos = []
-                
-                titulo_curso = Paragraph(
-                    f"<b>{curso.nombrecurso}</b> - {curso.entidadpatrocinadora}",
-                    texto_bold
-                )
-                curso_elementos.append(titulo_curso)
-                
-                fecha_curso = Paragraph(
-                    f"{curso.fechainicio.strftime('%m/%Y')} - {curso.fechafin.strftime('%m/%Y')} | {curso.totalhoras} horas",
-                    ParagraphStyle('dates', parent=texto_normal, fontSize=9, textColor=colors.grey)
-                )
-                curso_elementos.append(fecha_curso)
-                
-                if curso.descripcioncurso:
-                    desc_curso = Paragraph(curso.descripcioncurso, texto_normal)
-                    curso_elementos.append(desc_curso)
-                
-                curso_elementos.append(Spacer(1, 0.3*cm))
-                
-                elements.append(KeepTogether(curso_elementos))
-    
-    # ======================================
-    # PRODUCTOS ACADÉMICOS
-    # ======================================
-    
-    if secciones_seleccionadas.get('productos_academicos', False):
-        productos_acad = perfil.productos_academicos.filter(activarparaqueseveaenfront=True)
-        
-        if productos_acad.exists():
-            elements.append(Spacer(1, 0.3*cm))
-            elements.append(Paragraph("PRODUCTOS ACADÉMICOS", seccion_style))
-            
-            for prod in productos_acad:
-                prod_elementos = []
-                
-                titulo_prod = Paragraph(f"<b>{prod.nombrerecurso}</b>", texto_bold)
-                prod_elementos.append(titulo_prod)
-                
-                if prod.clasificador:
-                    etiquetas = Paragraph(
-                        f"<i>Clasificadores: {prod.clasificador}</i>",
-                        ParagraphStyle('tags', parent=texto_normal, fontSize=9, textColor=colors.grey)
-                    )
-                    prod_elementos.append(etiquetas)
-                
-                if prod.descripcion:
-                    desc_prod = Paragraph(prod.descripcion, texto_normal)
-                    prod_elementos.append(desc_prod)
-                
-                prod_elementos.append(Spacer(1, 0.3*cm))
-                
-                elements.append(KeepTogether(prod_elementos))
-    
-    # ======================================
-    # PRODUCTOS LABORALES
-    # ======================================
-    
-    if secciones_seleccionadas.get('productos_laborales', False):
-        productos_lab = perfil.productos_laborales.filter(activarparaqueseveaenfront=True).order_by('-fechaproducto')
-        
-        if productos_lab.exists():
-            elements.append(Spacer(1, 0.3*cm))
-            elements.append(Paragraph("PRODUCTOS LABORALES", seccion_style))
-            
-            for prod in productos_lab:
-                prod_elementos = []
-                
-                titulo_prod = Paragraph(f"<b>{prod.nombreproducto}</b>", texto_bold)
-                prod_elementos.append(titulo_prod)
-                
-                fecha_prod = Paragraph(
-                    f"{prod.fechaproducto.strftime('%m/%Y')}",
-                    ParagraphStyle('dates', parent=texto_normal, fontSize=9, textColor=colors.grey)
-                )
-                prod_elementos.append(fecha_prod)
-                
-                if prod.descripcion:
-                    desc_prod = Paragraph(prod.descripcion, texto_normal)
-                    prod_elementos.append(desc_prod)
-                
-                prod_elementos.append(Spacer(1, 0.3*cm))
-                
-                elements.append(KeepTogether(prod_elementos))
-    
+    linea.setStyle(estilos.linea_separadora)
+    yield linea
+    yield separador
+
     # ======================================
-    # VENTA GARAGE
+    # SECCIONES
     # ======================================
-    
-    if secciones_seleccionadas.get('venta_garage', False):
-        ventas = perfil.ventas_garage.filter(activarparaqueseveaenfront=True).order_by('-fecha_publicacion')
-        
-        if ventas.exists():
-            elements.append(Spacer(1, 0.3*cm))
-            elements.append(Paragraph("VENTA GARAGE", seccion_style))
-            
-            for venta in ventas:
-                venta_elementos = []
-                
-                titulo_venta = Paragraph(
-                    f"<b>{venta.nombreproducto}</b> - Estado: {venta.estadoproducto}",
-                    texto_bold
-                )
-                venta_elementos.append(titulo_venta)
-                
-                precio = Paragraph(
-                    f"Precio: ${venta.valordelbien} | Publicado: {venta.fecha_publicacion.strftime('%d/%m/%Y')}",
-                    texto_normal
-                )
-                venta_elementos.append(precio)
-                
-                if venta.descripcion:
-                    desc_venta = Paragraph(venta.descripcion, texto_normal)
-                    venta_elementos.append(desc_venta)
-                
-                venta_elementos.append(Spacer(1, 0.3*cm))
-                
-                elements.append(KeepTogether(venta_elementos))
-    
+
+    for clave, titulo, construir_elementos in SECCIONES_PDF:
+        if not secciones_seleccionadas.get(clave, False):
+            continue
+
+        encabezado_emitido = False
+        for fila in filas_de_seccion(clave):
+            if not encabezado_emitido:
+                if clave != 'experiencia':
+                    yield separador
+                yield Paragraph(titulo, estilos.seccion)
+                encabezado_emitido = True
+
+            elementos = construir_elementos(fila, estilos)
+            elementos.append(separador)
+            yield KeepTogether(elementos)
+
     # ======================================
     # PIE DE PÁGINA
     # ======================================
-    
-    elements.append(Spacer(1, 1*cm))
-    
-    pie = Paragraph(
-        f"<i>CV generado el {date.today().strftime('%d/%m/%Y')}</i>",
-        ParagraphStyle('footer', parent=texto_normal, fontSize=8, textColor=colors.grey, alignment=TA_CENTER)
+
+    yield Spacer(1, 1*cm)
+    yield Paragraph(f"<i>CV generado el {date.today().strftime('%d/%m/%Y')}</i>", estilos.pie)
+
+
+def _crear_documento(destino, perfil, estilos):
+    return SimpleDocTemplate(
+        destino,
+        pagesize=A4,
+        rightMargin=estilos.margen,
+        leftMargin=estilos.margen,
+        topMargin=estilos.margen,
+        bottomMargin=estilos.margen,
+        title=f"CV_{perfil.nombre_completo}"
     )
-    elements.append(pie)
-    
+
+
+def generar_cv_pdf_profesional(perfil, secciones_seleccionadas=None, snapshot=None, estilos=None):
+    """
+    Genera PDF con secciones seleccionables
+
+    Args:
+        perfil: Instancia de DatosPersonales
+        secciones_seleccionadas: Dict con las secciones a incluir
+            {
+                'experiencia': True/False,
+                'reconocimientos': True/False,
+                'cursos': True/False,
+                'productos_academicos': True/False,
+                'productos_laborales': True/False,
+                'venta_garage': True/False
+            }
+        snapshot: SnapshotCV ya cargado (opcional, se carga si no se pasa)
+        estilos: EstilosPDF a usar (por defecto, el tema elegido en el perfil)
+    """
+    buffer = BytesIO()
+
+    # Si no se especifican secciones, usar configuración del perfil
+    if secciones_seleccionadas is None:
+        secciones_seleccionadas = obtener_secciones_perfil(perfil)
+
+    if snapshot is None:
+        from .cv_snapshot import cargar_snapshot_cv
+        snapshot = cargar_snapshot_cv(perfil, secciones_seleccionadas)
+
+    if estilos is None:
+        estilos = obtener_estilos(perfil.tema_pdf)
+
+    doc = _crear_documento(buffer, perfil, estilos)
+    elements = list(_flowables_cv(perfil, secciones_seleccionadas, snapshot.seccion, estilos))
+
     # ======================================
     # CONSTRUIR PDF
     # ======================================
-    
+
     doc.build(elements)
-    
+
     buffer.seek(0)
     return buffer
+
+
+# ======================================
+# MODO CV GRANDE (STREAMING)
+# ======================================
+
+class FlowablesPerezosos(list):
+    """
+    Lista que se va llenando desde un generador a medida que ReportLab la consume
+
+    doc.build() solo usa len(), indexado, del e inserciones al inicio, así que
+    basta con mantener unos pocos flowables cargados por delante.
+    """
+
+    def __init__(self, generador, lote=50):
+        super().__init__()
+        self._generador = generador
+        self._lote = lote
+
+    def _cargar_hasta(self, cantidad):
+        while self._generador is not None and list.__len__(self) < cantidad:
+            nuevos = list(islice(self._generador, self._lote))
+            if not nuevos:
+                self._generador = None
+            list.extend(self, nuevos)
+
+    def __len__(self):
+        self._cargar_hasta(2)
+        return list.__len__(self)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __getitem__(self, indice):
+        if isinstance(indice, int) and indice >= 0:
+            self._cargar_hasta(indice + 1)
+        return list.__getitem__(self, indice)
+
+
+def generar_cv_pdf_streaming(perfil, secciones_seleccionadas=None, estilos=None, destino=None):
+    """
+    Genera el PDF de un CV grande con memoria acotada
+
+    Las filas se leen con iteradores por lotes, los flowables se crean a
+    medida que ReportLab los consume y el resultado se escribe en un archivo
+    temporal que pasa a disco al superar CV_PDF_SPOOL_MAX_BYTES.
+    Devuelve el archivo posicionado al inicio.
+    """
+    from .cv_snapshot import SECCIONES_CV
+
+    if secciones_seleccionadas is None:
+        secciones_seleccionadas = obtener_secciones_perfil(perfil)
+
+    if estilos is None:
+        estilos = obtener_estilos(perfil.tema_pdf)
+
+    if destino is None:
+        destino = tempfile.SpooledTemporaryFile(
+            max_size=getattr(settings, 'CV_PDF_SPOOL_MAX_BYTES', 5 * 1024 * 1024)
+        )
+
+    tamano_lote = getattr(settings, 'CV_PDF_TAMANO_LOTE', 200)
+    consultas = {
+        clave: (relacion, orden) for clave, relacion, _, orden in SECCIONES_CV
+    }
+
+    def filas_de_seccion(clave):
+        relacion, orden = consultas[clave]
+        return (
+            getattr(perfil, relacion)
+            .filter(activarparaqueseveaenfront=True)
+            .order_by(orden)
+            .iterator(chunk_size=tamano_lote)
+        )
+
+    doc = _crear_documento(destino, perfil, estilos)
+    doc.build(FlowablesPerezosos(_flowables_cv(perfil, secciones_seleccionadas, filas_de_seccion, estilos)))
+
+    destino.seek(0)
+    return destino
+
+
+def renderizar_pdf_cv(perfil, secciones_seleccionadas=None):
+    """
+    Genera el PDF eligiendo el modo según el tamaño del CV
+
+    Los CVs con más de CV_PDF_UMBRAL_FILAS filas visibles usan el modo
+    streaming; el resto se arma desde el documento materializado (ver
+    cv_documento.py). Devuelve un archivo posicionado al inicio.
+    """
+    from .cv_documento import obtener_documento, snapshot_desde_documento, contar_filas_documento
+
+    if secciones_seleccionadas is None:
+        secciones_seleccionadas = obtener_secciones_perfil(perfil)
+
+    documento = obtener_documento(perfil)
+    umbral = getattr(settings, 'CV_PDF_UMBRAL_FILAS', 300)
+    if contar_filas_documento(documento, secciones_seleccionadas) > umbral:
+        return generar_cv_pdf_streaming(perfil, secciones_seleccionadas)
+
+    snapshot = snapshot_desde_documento(documento, perfil=perfil)
+    return generar_cv_pdf_profesional(perfil, secciones_seleccionadas, snapshot=snapshot)
@@ -0,0 +1,189 @@
+"""
+Cola de trabajos de render PDF respaldada por la base de datos
+
+Las vistas encolan un TrabajoRenderPDF y el comando procesar_trabajos_pdf
+los ejecuta en un pool de procesos, sin broker externo. El resultado se
+guarda en la caché de PDFs (pdf_cache) bajo la huella del CV.
+
+Los modelos se importan dentro de las funciones para que los procesos del
+pool puedan importar este módulo antes de ejecutar django.setup().
+"""
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+
+from .pdf_cache import cache_pdf, calcular_huella_cv
+from .pdf_generator import renderizar_pdf_cv, obtener_secciones_perfil
+
+
+# Estado devuelto por ejecutar_trabajo cuando el trabajo fue borrado
+TRABAJO_ELIMINADO = 'eliminado'
+
+
+# ======================================
+# ENCOLADO
+# ======================================
+
+def encolar_render_pdf(perfil, secciones_seleccionadas=None, huella=None):
+    """
+    Devuelve el trabajo para el PDF del perfil, creándolo si no existe uno vigente
+
+    Un trabajo completado cuyo PDF fue expulsado de la caché se vuelve a encolar.
+    """
+    from .models import TrabajoRenderPDF
+
+    if secciones_seleccionadas is None:
+        secciones_seleccionadas = obtener_secciones_perfil(perfil)
+    if huella is None:
+        huella = calcular_huella_cv(perfil, secciones_seleccionadas)
+
+    trabajo = (
+        TrabajoRenderPDF.objects
+        .filter(huella=huella)
+        .exclude(estado=TrabajoRenderPDF.ERROR)
+        .order_by('-fecha_creacion')
+        .first()
+    )
+
+    if trabajo is None:
+        return TrabajoRenderPDF.objects.create(
+            perfil=perfil,
+            secciones=secciones_seleccionadas,
+            huella=huella,
+        )
+
+    if trabajo.estado == TrabajoRenderPDF.COMPLETADO and not cache_pdf.existe(huella):
+        reencolar_trabajo(trabajo)
+
+    return trabajo
+
+
+def reencolar_trabajo(trabajo):
+    """
+    Devuelve un trabajo al estado pendiente
+    """
+    from .models import TrabajoRenderPDF
+
+    TrabajoRenderPDF.objects.filter(pk=trabajo.pk).update(
+        estado=TrabajoRenderPDF.PENDIENTE,
+        fecha_inicio=None,
+        fecha_fin=None,
+        error='',
+    )
+    trabajo.estado = TrabajoRenderPDF.PENDIENTE
+
+
+# ======================================
+# PROCESAMIENTO
+# ======================================
+
+def reclamar_trabajos(limite):
+    """
+    Marca como 'procesando' hasta `limite` trabajos pendientes y devuelve sus ids
+
+    Cada trabajo se reclama con un UPDATE condicionado al estado, así dos
+    workers nunca procesan el mismo trabajo (también en SQLite).
+    """
+    from .models import TrabajoRenderPDF
+
+    candidatos = (
+        TrabajoRenderPDF.objects
+        .filter(estado=TrabajoRenderPDF.PENDIENTE)
+        .order_by('fecha_creacion')
+        .values_list('pk', flat=True)[:limite]
+    )
+
+    reclamados = []
+    for pk in candidatos:
+        actualizados = TrabajoRenderPDF.objects.filter(
+            pk=pk, estado=TrabajoRenderPDF.PENDIENTE
+        ).update(estado=TrabajoRenderPDF.PROCESANDO, fecha_inicio=timezone.now())
+        if actualizados:
+            reclamados.append(pk)
+    return reclamados
+
+
+def liberar_trabajos_colgados(minutos=10):
+    """
+    Devuelve a pendiente los trabajos que llevan demasiado tiempo procesándose
+    (por ejemplo, si un worker murió a mitad del render)
+    """
+    from .models import TrabajoRenderPDF
+
+    limite = timezone.now() - timedelta(minutes=minutos)
+    return TrabajoRenderPDF.objects.filter(
+        estado=TrabajoRenderPDF.PROCESANDO,
+        fecha_inicio__lt=limite,
+    ).update(estado=TrabajoRenderPDF.PENDIENTE, fecha_inicio=None)
+
+
+def purgar_trabajos(dias=None):
+    """
+    Borra los trabajos terminados (completados o con error) hace más de `dias`
+
+    La huella incluye la fecha, así que cada usuario deja un trabajo nuevo
+    por día; los viejos ya no se reutilizan. Devuelve cuántos se borraron.
+    """
+    from .models import TrabajoRenderPDF
+
+    if dias is None:
+        dias = getattr(settings, 'CV_PDF_TRABAJOS_RETENCION_DIAS', 2)
+    limite = timezone.now() - timedelta(days=dias)
+    borrados, _ = TrabajoRenderPDF.objects.filter(
+        estado__in=[TrabajoRenderPDF.COMPLETADO, TrabajoRenderPDF.ERROR],
+        fecha_fin__lt=limite,
+    ).delete()
+    return borrados
+
+
+def inicializar_proceso():
+    """
+    Inicializador de cada proceso del pool
+    """
+    import django
+    from django.apps import apps
+
+    if not apps.ready:
+        django.setup()
+    connections.close_all()
+
+
+def ejecutar_trabajo(trabajo_id):
+    """
+    Renderiza el PDF de un trabajo y lo guarda en la caché
+
+    Se ejecuta dentro de un proceso del pool. Devuelve (trabajo_id, estado),
+    con TRABAJO_ELIMINADO si el trabajo ya no existe.
+    """
+    from .models import TrabajoRenderPDF
+
+    try:
+        trabajo = TrabajoRenderPDF.objects.select_related('perfil').get(pk=trabajo_id)
+    except TrabajoRenderPDF.DoesNotExist:
+        # El perfil (y con él el trabajo) se borró después de reclamarlo
+        return trabajo_id, TRABAJO_ELIMINADO
+
+    try:
+        # La huella se recalcula por si el perfil cambió desde que se encoló
+        huella = calcular_huella_cv(trabajo.perfil, trabajo.secciones)
+        if not cache_pdf.existe(huella):
+            with renderizar_pdf_cv(trabajo.perfil, trabajo.secciones) as renderizado:
+                cache_pdf.guardar(huella, renderizado)
+
+        TrabajoRenderPDF.objects.filter(pk=trabajo_id).update(
+            estado=TrabajoRenderPDF.COMPLETADO,
+            huella=huella,
+            fecha_fin=timezone.now(),
+        )
+        return trabajo_id, TrabajoRenderPDF.COMPLETADO
+
+    except Exception as e:
+        TrabajoRenderPDF.objects.filter(pk=trabajo_id).update(
+            estado=TrabajoRenderPDF.ERROR,
+            error=str(e),
+            fecha_fin=timezone.now(),
+        )
+        return trabajo_id, TrabajoRenderPDF.ERROR
@@ -0,0 +1,152 @@
+"""
+Temas del PDF del CV
+
+Cada tema es inmutable y sus estilos de ReportLab se compilan una sola vez
+por proceso (obtener_estilos está memoizado), de modo que los renders no
+vuelven a llamar a getSampleStyleSheet() ni a crear ParagraphStyle por ítem.
+"""
+
+from dataclasses import dataclass
+from functools import lru_cache
+
+from reportlab.lib import colors
+from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import cm
+from reportlab.platypus import TableStyle
+
+
+TEMA_POR_DEFECTO = 'clasico'
+
+
+@dataclass(frozen=True)
+class TemaPDF:
+    """
+    Definición de un tema: colores, fuentes y márgenes
+    """
+    nombre: str
+    etiqueta: str
+    color_primario: str = '#2E7D32'
+    color_subtitulo: str = '#666666'
+    color_atenuado: str = '#808080'
+    fuente: str = 'Helvetica'
+    fuente_negrita: str = 'Helvetica-Bold'
+    tamano_titulo: int = 24
+    tamano_seccion: int = 14
+    tamano_texto: int = 10
+    margen_cm: float = 2
+
+
+@dataclass(frozen=True)
+class EstilosPDF:
+    """
+    Estilos de ReportLab ya compilados para un tema
+    """
+    tema: TemaPDF
+    titulo: ParagraphStyle
+    subtitulo: ParagraphStyle
+    seccion: ParagraphStyle
+    normal: ParagraphStyle
+    negrita: ParagraphStyle
+    fechas: ParagraphStyle
+    etiquetas: ParagraphStyle
+    pie: ParagraphStyle
+    tabla_contacto: TableStyle
+    linea_separadora: TableStyle
+
+    @property
+    def margen(self):
+        return self.tema.margen_cm * cm
+
+
+TEMAS = {
+    tema.nombre: tema for tema in (
+        TemaPDF(nombre='clasico', etiqueta='Clásico (verde)'),
+        TemaPDF(nombre='azul', etiqueta='Azul corporativo', color_primario='#1565C0'),
+        TemaPDF(
+            nombre='sobrio',
+            etiqueta='Sobrio (serif)',
+            color_primario='#212121',
+            color_subtitulo='#555555',
+            fuente='Times-Roman',
+            fuente_negrita='Times-Bold',
+            tamano_titulo=22,
+            tamano_texto=11,
+        ),
+        TemaPDF(nombre='compacto', etiqueta='Compacto', tamano_titulo=20, tamano_seccion=12, tamano_texto=9, margen_cm=1.5),
+    )
+}
+
+TEMA_CHOICES = [(tema.nombre, tema.etiqueta) for tema in TEMAS.values()]
+
+
+@lru_cache(maxsize=None)
+def obtener_estilos(nombre_tema=TEMA_POR_DEFECTO):
+    """
+    Compila (una vez por proceso) y devuelve los estilos de un tema
+
+    Un nombre desconocido usa el tema por defecto.
+    """
+    tema = TEMAS.get(nombre_tema) or TEMAS[TEMA_POR_DEFECTO]
+    base = getSampleStyleSheet()
+    primario = colors.HexColor(tema.color_primario)
+    atenuado = colors.HexColor(tema.color_atenuado)
+
+    normal = ParagraphStyle(
+        f'{tema.nombre}-Normal',
+        parent=base['Normal'],
+        fontName=tema.fuente,
+        fontSize=tema.tamano_texto,
+        spaceAfter=6,
+        alignment=TA_JUSTIFY
+    )
+
+    return EstilosPDF(
+        tema=tema,
+        titulo=ParagraphStyle(
+            f'{tema.nombre}-Title',
+            parent=base['Heading1'],
+            fontSize=tema.tamano_titulo,
+            textColor=primario,
+            spaceAfter=6,
+            alignment=TA_CENTER,
+            fontName=tema.fuente_negrita
+        ),
+        subtitulo=ParagraphStyle(
+            f'{tema.nombre}-Subtitle',
+            parent=base['Normal'],
+            fontName=tema.fuente,
+            fontSize=tema.tamano_texto + 1,
+            textColor=colors.HexColor(tema.color_subtitulo),
+            spaceAfter=15,
+            alignment=TA_CENTER
+        ),
+        seccion=ParagraphStyle(
+            f'{tema.nombre}-Section',
+            parent=base['Heading2'],
+            fontSize=tema.tamano_seccion,
+            textColor=primario,
+            spaceAfter=10,
+            spaceBefore=15,
+            fontName=tema.fuente_negrita
+        ),
+        normal=normal,
+        negrita=ParagraphStyle(f'{tema.nombre}-Bold', parent=normal, fontName=tema.fuente_negrita),
+        fechas=ParagraphStyle(f'{tema.nombre}-Dates', parent=normal, fontSize=tema.tamano_texto - 1, textColor=atenuado),
+        etiquetas=ParagraphStyle(f'{tema.nombre}-Tags', parent=normal, fontSize=tema.tamano_texto - 1, textColor=atenuado),
+        pie=ParagraphStyle(
+            f'{tema.nombre}-Footer',
+            parent=normal,
+            fontSize=tema.tamano_texto - 2,
+            textColor=atenuado,
+            alignment=TA_CENTER
+        ),
+        tabla_contacto=TableStyle([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), 0),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 0),
+        ]),
+        linea_separadora=TableStyle([
+            ('LINEABOVE', (0, 0), (-1, 0), 2, primario),
+        ]),
+    )
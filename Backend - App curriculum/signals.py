@@ -0,0 +1,435 @@
+"""
+Signals del módulo curriculum
+
+Los datos derivados de un perfil (estadísticas, documento, índice de
+búsqueda, facetas y búsquedas guardadas) se recalculan al confirmar la
+transacción, una sola vez por perfil y tabla aunque cambien muchas filas.
+Las filas hijas que se borran en cascada con su perfil no recalculan nada.
+"""
+
+import threading
+
+from django.db import connections, transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, post_migrate
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import (
+    DatosPersonales,
+    ExperienciaLaboral,
+    Reconocimiento,
+    CursoRealizado,
+    ProductoAcademico,
+    ProductoLaboral,
+    VentaGarage
+)
+from .cv_page_cache import invalidar_cv_publico
+from .cv_slug_index import indice_slugs
+from .cv_estadisticas import actualizar_estadisticas, clave_de_modelo
+from .cv_contadores import registrar_cambio_perfil
+from .cv_documento import actualizar_documento
+from .cv_busqueda import actualizar_indice_busqueda, preparar_indice_busqueda
+from .cv_etiquetas import sincronizar_etiquetas
+from .cv_facetas import indice_facetas
+from .cv_busquedas_guardadas import reevaluar_perfiles
+
+
+MODELOS_SECCION = (
+    ExperienciaLaboral,
+    Reconocimiento,
+    CursoRealizado,
+    ProductoAcademico,
+    ProductoLaboral,
+    VentaGarage,
+)
+
+
+_estado = threading.local()
+
+
+# ======================================
+# TAREAS POR TRANSACCIÓN
+# ======================================
+
+class _TareaPerfil:
+    """
+    Recálculo de un perfil que espera al commit; las filas que cambian en la
+    misma transacción suman sus secciones a la misma tarea
+    """
+
+    def __init__(self, funcion, perfil_id):
+        self.funcion = funcion
+        self.perfil_id = perfil_id
+        self.opciones = {}
+
+    def sumar(self, **opciones):
+        if 'claves' in opciones:
+            # None son todas las secciones
+            claves, actuales = opciones['claves'], self.opciones.get('claves', ())
+            opciones['claves'] = None if claves is None or actuales is None else sorted({*actuales, *claves})
+        if 'crear' in opciones:
+            opciones['crear'] = opciones['crear'] or self.opciones.get('crear', False)
+        self.opciones.update(opciones)
+
+    def __call__(self):
+        tareas = _tareas()
+        if tareas.get((self.funcion, self.perfil_id)) is self:
+            del tareas[(self.funcion, self.perfil_id)]
+        self.funcion(self.perfil_id, **self.opciones)
+
+
+def _tareas():
+    if not hasattr(_estado, 'tareas'):
+        _estado.tareas = {}
+    return _estado.tareas
+
+
+def _tarea_pendiente(funcion, perfil_id):
+    """
+    Tarea de la transacción en curso, o None
+
+    Si la transacción (o el savepoint) se revirtió, Django ya sacó la tarea
+    de run_on_commit: se descarta.
+    """
+    tarea = _tareas().get((funcion, perfil_id))
+    if tarea is None:
+        return None
+    if not any(registro[1] is tarea for registro in transaction.get_connection().run_on_commit):
+        del _tareas()[(funcion, perfil_id)]
+        return None
+    return tarea
+
+
+def _al_confirmar(funcion, perfil_id, **opciones):
+    """
+    funcion(perfil_id, **opciones) al confirmar la transacción (en autocommit,
+    enseguida), una sola vez por función y perfil
+    """
+    tarea = _tarea_pendiente(funcion, perfil_id)
+    if tarea is not None:
+        tarea.sumar(**opciones)
+        return
+
+    tarea = _TareaPerfil(funcion, perfil_id)
+    tarea.sumar(**opciones)
+    _tareas()[(funcion, perfil_id)] = tarea
+    transaction.on_commit(tarea)
+
+
+# ======================================
+# BORRADO DEL PERFIL
+# ======================================
+
+def _perfiles_en_borrado():
+    if not hasattr(_estado, 'borrando'):
+        _estado.borrando = {}
+    return _estado.borrando
+
+
+@receiver(pre_delete, sender=DatosPersonales, dispatch_uid='marcar_perfil_en_borrado')
+def marcar_perfil_en_borrado(sender, instance, origin=None, **kwargs):
+    """
+    Marca el perfil con el origen del borrado: sus filas hijas caen en el
+    mismo borrado y los datos derivados se van con él
+    """
+    _perfiles_en_borrado()[instance.pk] = origin
+
+
+@receiver(post_delete, sender=DatosPersonales, dispatch_uid='desmarcar_perfil_en_borrado')
+def desmarcar_perfil_en_borrado(sender, instance, **kwargs):
+    _perfiles_en_borrado().pop(instance.pk, None)
+
+
+def _omitir_fila(instance, raw, kwargs):
+    """
+    True para fixtures y para filas hijas borradas en cascada con su perfil
+    """
+    if raw:
+        return True
+    borrando = _perfiles_en_borrado()
+    perfil_id = instance.idperfilconqueestaactivo_id
+    # Mismo origen: una marca que quedó de un borrado fallido no aplica a otro
+    return perfil_id in borrando and borrando[perfil_id] is kwargs.get('origin')
+
+
+# ======================================
+# VERSIÓN DEL PERFIL
+# ======================================
+
+def _invalidar_cv_publico(*slugs):
+    # Tras el commit: antes, otra visita todavía lee la fila vieja y volvería
+    # a guardar la página vieja en la caché
+    transaction.on_commit(lambda: invalidar_cv_publico(*slugs))
+
+
+def _invalidar_cv_publico_de(perfil_id):
+    invalidar_cv_publico(DatosPersonales.objects.filter(pk=perfil_id).values_list('slug', flat=True).first())
+
+
+def tocar_perfil(sender, instance, raw=False, **kwargs):
+    """
+    Actualiza fecha_actualizacion del perfil cuando cambia una de sus filas hijas,
+    para que sea la versión del CV completo (ver cv_version.py)
+    """
+    if _omitir_fila(instance, raw, kwargs):
+        return
+
+    perfil_id = instance.idperfilconqueestaactivo_id
+    # Una vez por transacción: las demás filas salen en el mismo commit
+    if _tarea_pendiente(_invalidar_cv_publico_de, perfil_id) is None:
+        DatosPersonales.objects.filter(pk=perfil_id).update(fecha_actualizacion=timezone.now())
+    _al_confirmar(_invalidar_cv_publico_de, perfil_id)
+
+
+for modelo in MODELOS_SECCION:
+    post_save.connect(tocar_perfil, sender=modelo, dispatch_uid=f'tocar_perfil_save_{modelo.__name__}')
+    post_delete.connect(tocar_perfil, sender=modelo, dispatch_uid=f'tocar_perfil_delete_{modelo.__name__}')
+
+
+# ======================================
+# ESTADÍSTICAS DEL CV
+# ======================================
+
+def recontar_seccion(sender, instance, raw=False, **kwargs):
+    """
+    Recalcula el contador de la sección de la fila (alta, baja o cambio de
+    visibilidad) y la completitud del perfil
+    """
+    if _omitir_fila(instance, raw, kwargs):
+        return
+    _al_confirmar(
+        actualizar_estadisticas,
+        instance.idperfilconqueestaactivo_id,
+        claves=[clave_de_modelo(sender)],
+        crear=kwargs.get('signal') is post_save
+    )
+
+
+for modelo in MODELOS_SECCION:
+    post_save.connect(recontar_seccion, sender=modelo, dispatch_uid=f'recontar_seccion_save_{modelo.__name__}')
+    post_delete.connect(recontar_seccion, sender=modelo, dispatch_uid=f'recontar_seccion_delete_{modelo.__name__}')
+
+
+@receiver(post_save, sender=DatosPersonales, dispatch_uid='actualizar_completitud')
+def actualizar_completitud(sender, instance, created=False, raw=False, **kwargs):
+    """
+    La foto cuenta para la completitud; un perfil nuevo arranca sus contadores
+    """
+    if raw:
+        return
+    _al_confirmar(actualizar_estadisticas, instance.pk, claves=None if created else (), crear=True)
+
+
+# ======================================
+# CACHÉ DEL CV PÚBLICO
+# ======================================
+
+@receiver(pre_save, sender=DatosPersonales, dispatch_uid='recordar_estado_anterior')
+def recordar_estado_anterior(sender, instance, raw=False, **kwargs):
+    """
+    Guarda el slug y la visibilidad previos: si cambia el slug hay que invalidar
+    también la URL anterior, y la visibilidad mueve el contador de CVs públicos
+    """
+    if raw or not instance.pk:
+        return
+    anterior = (
+        DatosPersonales.objects.filter(pk=instance.pk).values_list('slug', 'perfilactivo').first()
+    )
+    if anterior is not None:
+        instance._slug_anterior, instance._perfilactivo_anterior = anterior
+
+
+@receiver(post_save, sender=DatosPersonales, dispatch_uid='invalidar_cv_publico_save')
+@receiver(post_delete, sender=DatosPersonales, dispatch_uid='invalidar_cv_publico_delete')
+def invalidar_cv_publico_perfil(sender, instance, **kwargs):
+    slug_anterior = getattr(instance, '_slug_anterior', None)
+    _invalidar_cv_publico(instance.slug, slug_anterior)
+
+    publico = kwargs.get('signal') is post_save and instance.perfilactivo == 1
+    slug = instance.slug
+    # Tras el commit: los demás procesos reconstruyen su índice desde la base
+    # de datos al ver la generación nueva y todavía no verían el slug
+    transaction.on_commit(lambda: indice_slugs.actualizar(slug, slug_anterior, publico=publico))
+
+
+# ======================================
+# DOCUMENTO CV
+# ======================================
+
+def reconstruir_seccion_documento(sender, instance, raw=False, **kwargs):
+    """
+    Vuelve a materializar la sección de la fila en el documento del perfil
+    """
+    if _omitir_fila(instance, raw, kwargs):
+        return
+    _al_confirmar(
+        actualizar_documento,
+        instance.idperfilconqueestaactivo_id,
+        claves=[clave_de_modelo(sender)],
+        crear=kwargs.get('signal') is post_save
+    )
+
+
+for modelo in MODELOS_SECCION:
+    post_save.connect(reconstruir_seccion_documento, sender=modelo, dispatch_uid=f'documento_save_{modelo.__name__}')
+    post_delete.connect(reconstruir_seccion_documento, sender=modelo, dispatch_uid=f'documento_delete_{modelo.__name__}')
+
+
+@receiver(post_save, sender=DatosPersonales, dispatch_uid='actualizar_documento_perfil')
+def actualizar_documento_perfil(sender, instance, created=False, raw=False, **kwargs):
+    if raw:
+        return
+    _al_confirmar(actualizar_documento, instance.pk, claves=None if created else (), crear=True)
+
+
+# ======================================
+# ÍNDICE DE BÚSQUEDA
+# ======================================
+
+MODELOS_BUSQUEDA = (ExperienciaLaboral, CursoRealizado, ProductoAcademico)
+
+
+def reindexar_perfil(sender, instance, raw=False, **kwargs):
+    """
+    Actualiza el texto buscable del perfil al cambiar una fila indexada
+    """
+    if _omitir_fila(instance, raw, kwargs):
+        return
+    _al_confirmar(
+        actualizar_indice_busqueda,
+        instance.idperfilconqueestaactivo_id,
+        crear=kwargs.get('signal') is post_save
+    )
+
+
+for modelo in MODELOS_BUSQUEDA:
+    post_save.connect(reindexar_perfil, sender=modelo, dispatch_uid=f'busqueda_save_{modelo.__name__}')
+    post_delete.connect(reindexar_perfil, sender=modelo, dispatch_uid=f'busqueda_delete_{modelo.__name__}')
+
+
+@receiver(post_save, sender=DatosPersonales, dispatch_uid='indexar_datos_perfil')
+def indexar_datos_perfil(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _al_confirmar(actualizar_indice_busqueda, instance.pk, crear=True)
+
+
+@receiver(post_migrate, dispatch_uid='preparar_indice_busqueda')
+def preparar_busqueda_tras_migrar(sender, app_config=None, using='default', **kwargs):
+    """
+    Crea las estructuras de texto completo propias del motor (FTS5 o GIN)
+    """
+    if app_config is None or app_config.name != 'curriculum':
+        return
+    preparar_indice_busqueda(connections[using])
+
+
+# ======================================
+# ETIQUETAS DE PRODUCTOS ACADÉMICOS
+# ======================================
+
+@receiver(post_save, sender=ProductoAcademico, dispatch_uid='sincronizar_etiquetas')
+def sincronizar_etiquetas_producto(sender, instance, raw=False, **kwargs):
+    """
+    Refleja el clasificador en la tabla de etiquetas (el borrado va en cascada)
+    """
+    if raw:
+        return
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and 'clasificador' not in update_fields:
+        return
+    sincronizar_etiquetas(instance)
+
+
+# ======================================
+# ÍNDICE DE FACETAS
+# ======================================
+
+def _actualizar_facetas(perfil_id):
+    _al_confirmar(indice_facetas.actualizar_perfil, perfil_id)
+
+
+@receiver(post_save, sender=DatosPersonales, dispatch_uid='facetas_perfil_save')
+@receiver(post_delete, sender=DatosPersonales, dispatch_uid='facetas_perfil_delete')
+def actualizar_facetas_perfil(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _actualizar_facetas(instance.pk)
+
+
+def actualizar_facetas_seccion(sender, instance, raw=False, **kwargs):
+    """
+    La experiencia cambia el tramo de años y los productos académicos las etiquetas
+    """
+    if _omitir_fila(instance, raw, kwargs):
+        return
+    _actualizar_facetas(instance.idperfilconqueestaactivo_id)
+
+
+for modelo in (ExperienciaLaboral, ProductoAcademico):
+    post_save.connect(actualizar_facetas_seccion, sender=modelo, dispatch_uid=f'facetas_save_{modelo.__name__}')
+    post_delete.connect(actualizar_facetas_seccion, sender=modelo, dispatch_uid=f'facetas_delete_{modelo.__name__}')
+
+
+# ======================================
+# BÚSQUEDAS GUARDADAS
+# ======================================
+
+def _reevaluar_perfil(perfil_id):
+    reevaluar_perfiles([perfil_id])
+
+
+def _reevaluar_busquedas(perfil_id):
+    # Se programa después del índice de texto y las estadísticas: corre con ellos al día
+    _al_confirmar(_reevaluar_perfil, perfil_id)
+
+
+@receiver(post_save, sender=DatosPersonales, dispatch_uid='busquedas_guardadas_perfil')
+def reevaluar_busquedas_perfil(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    _reevaluar_busquedas(instance.pk)
+
+
+def reevaluar_busquedas_seccion(sender, instance, raw=False, **kwargs):
+    """
+    Las secciones indexadas cambian las palabras, los años de experiencia y las etiquetas
+    """
+    if _omitir_fila(instance, raw, kwargs):
+        return
+    _reevaluar_busquedas(instance.idperfilconqueestaactivo_id)
+
+
+for modelo in MODELOS_BUSQUEDA:
+    post_save.connect(reevaluar_busquedas_seccion, sender=modelo, dispatch_uid=f'busquedas_guardadas_save_{modelo.__name__}')
+    post_delete.connect(reevaluar_busquedas_seccion, sender=modelo, dispatch_uid=f'busquedas_guardadas_delete_{modelo.__name__}')
+
+
+# ======================================
+# CONTADORES GLOBALES
+# ======================================
+
+@receiver(post_save, sender=DatosPersonales, dispatch_uid='contar_perfil_guardado')
+def contar_perfil_guardado(sender, instance, created=False, raw=False, **kwargs):
+    """
+    Alta de perfil o cambio de visibilidad (ver cv_contadores.py)
+    """
+    if raw:
+        return
+
+    publico = instance.perfilactivo == 1
+    if created:
+        cambio = {'total': 1, 'publicos': int(publico)}
+    else:
+        era_publico = getattr(instance, '_perfilactivo_anterior', None) == 1
+        if publico == era_publico:
+            return
+        cambio = {'publicos': 1 if publico else -1}
+
+    transaction.on_commit(lambda: registrar_cambio_perfil(**cambio))
+
+
+@receiver(post_delete, sender=DatosPersonales, dispatch_uid='contar_perfil_eliminado')
+def contar_perfil_eliminado(sender, instance, **kwargs):
+    cambio = {'total': -1, 'publicos': -1 if instance.perfilactivo == 1 else 0}
+    transaction.on_commit(lambda: registrar_cambio_perfil(**cambio))
@@ -15,3 +15,10 @@ class AzureMediaStorage(AzureStorage):
     azure_container = settings.AZURE_CONTAINER
     expiration_secs = None
     overwrite_files = True
+    
+    def leer_en_partes(self, name):
+        """
+        Contenido del blob por partes, sin el archivo temporal que usa open()
+        """
+        descarga = self.client.download_blob(self._get_valid_path(name), timeout=self.timeout)
+        yield from descarga.chunks()
@@ -0,0 +1,51 @@
+"""
+Texto indexado para la búsqueda de CVs
+
+Solo entran campos públicos del documento: un perfil no se encuentra por
+datos privados como la cédula o el lugar de nacimiento.
+"""
+
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from ..cv_busqueda import textos_perfil
+from ..models import DatosPersonales, ExperienciaLaboral
+
+
+class TextoIndexadoTests(TestCase):
+
+    def setUp(self):
+        usuario = User.objects.create_user('ana')
+        self.perfil = DatosPersonales.objects.create(
+            usuario=usuario,
+            nombres='Ana',
+            apellidos='Perez',
+            descripcionperfil='Desarrolladora backend',
+            lugarnacimiento='Manta',
+            fechanacimiento=date(1990, 5, 17),
+            numerocedula='1312345678',
+            sexo='M',
+            estadocivil='Soltero/a',
+            direcciondomiciliaria='Calle 13',
+        )
+        ExperienciaLaboral.objects.create(
+            idperfilconqueestaactivo=self.perfil,
+            cargodesempenado='Desarrolladora',
+            nombrempresa='ACME',
+            lugarempresa='Quito',
+            nombrecontactoempresarial='Luis Contacto',
+            telefonocontactoempresarial='0987654321',
+            fechainiciogestion=date(2018, 1, 1),
+            descripcionfunciones='APIs con Django',
+        )
+
+    def test_solo_campos_publicos(self):
+        texto_perfil, texto_experiencia, _ = textos_perfil(self.perfil.pk)
+        self.assertIn('Ana', texto_perfil)
+        self.assertIn('Django', texto_experiencia)
+        texto = f"{texto_perfil}\n{texto_experiencia}"
+        for valor in ('Manta', '1312345678', 'Calle 13', 'Luis Contacto', '0987654321'):
+            with self.subTest(valor=valor):
+                self.assertNotIn(valor, texto)
@@ -0,0 +1,143 @@
+"""
+Datos del documento CV que sirve cv_publico_json
+
+La vista se sirve sin autenticación: el perfil y las filas de cada sección
+salen solo de las listas blancas de cv_documento, sin identificadores
+personales, contactos de terceros, certificados ni campos internos.
+"""
+
+import json
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from ..cv_documento import CAMPOS_PERFIL_PUBLICO, CAMPOS_PUBLICOS_SECCION, actualizar_documento
+from ..cv_snapshot import SECCIONES_CV
+from ..models import CursoRealizado, DatosPersonales, ExperienciaLaboral, Reconocimiento
+
+
+CAMPOS_PRIVADOS_PERFIL = (
+    'numerocedula',
+    'fechanacimiento',
+    'lugarnacimiento',
+    'direcciondomiciliaria',
+    'direcciontrabajo',
+    'telefonofijo',
+    'telefonoconvencional',
+    'sexo',
+    'estadocivil',
+    'licenciaconducir',
+    'perfilactivo',
+    'mostrar_experiencia_pdf',
+    'mostrar_reconocimientos_pdf',
+    'mostrar_cursos_pdf',
+    'mostrar_productos_academicos_pdf',
+    'mostrar_productos_laborales_pdf',
+    'mostrar_venta_garage_pdf',
+    'tema_pdf',
+)
+
+CAMPOS_PRIVADOS_SECCION = (
+    'emailempresa',
+    'nombrecontactoempresarial',
+    'telefonocontactoempresarial',
+    'nombrecontactoauspicia',
+    'telefonocontactoauspicia',
+    'emailempresapatrocinadora',
+    'rutacertificado',
+    'activarparaqueseveaenfront',
+    'fecha_creacion',
+)
+
+VALORES_PRIVADOS = (
+    '1312345678',
+    '1990-05-17',
+    '0991234567',
+    '052123456',
+    'Calle 13',
+    'rrhh@acme.test',
+    'Luis Contacto',
+    '0987654321',
+    'Marta Auspicia',
+    '0976543210',
+    'cursos@acme.test',
+    'certificados/',
+)
+
+
+class DocumentoPublicoTests(TestCase):
+
+    def setUp(self):
+        usuario = User.objects.create_user('ana', password='clave-de-prueba')
+        self.perfil = DatosPersonales.objects.create(
+            usuario=usuario,
+            nombres='Ana',
+            apellidos='Perez',
+            lugarnacimiento='Manta',
+            fechanacimiento=date(1990, 5, 17),
+            numerocedula='1312345678',
+            sexo='M',
+            estadocivil='Soltero/a',
+            telefonoconvencional='052123456',
+            telefonofijo='0991234567',
+            direcciondomiciliaria='Calle 13 y Avenida 24',
+            slug='ana-perez-prueba',
+        )
+        ExperienciaLaboral.objects.create(
+            idperfilconqueestaactivo=self.perfil,
+            cargodesempenado='Desarrolladora',
+            nombrempresa='ACME',
+            lugarempresa='Quito',
+            emailempresa='rrhh@acme.test',
+            nombrecontactoempresarial='Luis Contacto',
+            telefonocontactoempresarial='0987654321',
+            fechainiciogestion=date(2018, 1, 1),
+            descripcionfunciones='Backend',
+        )
+        Reconocimiento.objects.create(
+            idperfilconqueestaactivo=self.perfil,
+            tiporeconocimiento='Académico',
+            fechareconocimiento=date(2019, 6, 1),
+            descripcionreconocimiento='Mejor proyecto',
+            entidadpatrocinadora='Universidad',
+            nombrecontactoauspicia='Marta Auspicia',
+            telefonocontactoauspicia='0976543210',
+        )
+        CursoRealizado.objects.create(
+            idperfilconqueestaactivo=self.perfil,
+            nombrecurso='Django',
+            fechainicio=date(2020, 1, 1),
+            fechafin=date(2020, 2, 1),
+            totalhoras=40,
+            descripcioncurso='Curso de Django',
+            entidadpatrocinadora='ACME',
+            emailempresapatrocinadora='cursos@acme.test',
+            # Solo el nombre: no hace falta subir el archivo al storage
+            rutacertificado='certificados/cursos/curso.pdf',
+        )
+        self.contenido = actualizar_documento(self.perfil.pk).contenido
+
+    def test_perfil_sin_datos_personales(self):
+        perfil = self.contenido['perfil']
+        self.assertEqual(perfil['nombre_completo'], 'Ana Perez')
+        self.assertEqual(set(perfil), set(CAMPOS_PERFIL_PUBLICO))
+        for campo in CAMPOS_PRIVADOS_PERFIL:
+            with self.subTest(campo=campo):
+                self.assertNotIn(campo, perfil)
+                self.assertNotIn(f"{campo}_display", perfil)
+
+    def test_secciones_sin_contactos_ni_certificados(self):
+        self.assertEqual(set(CAMPOS_PUBLICOS_SECCION), {clave for clave, _, _, _ in SECCIONES_CV})
+        for clave in ('experiencia', 'reconocimientos', 'cursos'):
+            filas = self.contenido['secciones'][clave]
+            self.assertEqual(len(filas), 1)
+            for campo in CAMPOS_PRIVADOS_SECCION:
+                with self.subTest(seccion=clave, campo=campo):
+                    self.assertNotIn(campo, filas[0])
+
+    def test_ningun_valor_privado_en_el_json(self):
+        texto = json.dumps(self.contenido, ensure_ascii=False)
+        for valor in VALORES_PRIVADOS:
+            with self.subTest(valor=valor):
+                self.assertNotIn(valor, texto)
@@ -0,0 +1,31 @@
+"""
+Validación del archivo de la importación masiva desde el admin
+"""
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+
+from ..forms import ImportarPerfilesForm
+
+
+ENCABEZADOS = 'nombres,apellidos,numerocedula\n'
+
+
+def _formulario(nombre, contenido):
+    archivo = SimpleUploadedFile(nombre, contenido, content_type='text/csv')
+    return ImportarPerfilesForm(data={'seccion': ''}, files={'archivo': archivo})
+
+
+class ImportarPerfilesFormTests(SimpleTestCase):
+
+    def test_utf8_con_bom(self):
+        form = _formulario('perfiles.csv', ('﻿' + ENCABEZADOS + 'José,Núñez,1312345678\n').encode('utf-8'))
+        self.assertTrue(form.is_valid(), form.errors)
+        self.assertEqual(form.formato, 'csv')
+        # El archivo queda al principio para la importación
+        self.assertEqual(form.cleaned_data['archivo'].read(3), b'\xef\xbb\xbf')
+
+    def test_otra_codificacion_es_error_del_formulario(self):
+        form = _formulario('perfiles.csv', (ENCABEZADOS + 'José,Núñez,1312345678\n').encode('latin-1'))
+        self.assertFalse(form.is_valid())
+        self.assertIn('UTF-8', form.errors['archivo'][0])
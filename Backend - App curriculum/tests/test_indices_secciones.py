@@ -0,0 +1,46 @@
+"""
+Planes de las consultas de secciones visibles (índices *_visible_idx)
+
+Cada sección del CV se lee filtrando por perfil y visibilidad y ordenando
+por fecha; el índice parcial compuesto tiene que resolver el filtro y el
+ORDER BY sin ordenar aparte.
+"""
+
+import unittest
+
+from django.db import connection
+from django.test import TestCase
+
+from ..cv_snapshot import SECCIONES_CV
+
+
+def _consulta_seccion(modelo, orden):
+    # La misma consulta que cv_snapshot.prefetches_cv para un perfil
+    return modelo.objects.filter(idperfilconqueestaactivo_id=1, activarparaqueseveaenfront=True).order_by(orden)
+
+
+def _indice_visible(modelo):
+    return next(indice.name for indice in modelo._meta.indexes if indice.name.endswith('_visible_idx'))
+
+
+class PlanSeccionesVisiblesTests(TestCase):
+
+    @unittest.skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN de SQLite')
+    def test_sqlite_usa_indice_sin_ordenar(self):
+        for clave, _, modelo, orden in SECCIONES_CV:
+            with self.subTest(seccion=clave):
+                plan = _consulta_seccion(modelo, orden).explain()
+                self.assertIn(f"USING INDEX {_indice_visible(modelo)}", plan)
+                self.assertNotIn('USE TEMP B-TREE FOR ORDER BY', plan)
+
+    @unittest.skipUnless(connection.vendor == 'postgresql', 'EXPLAIN de PostgreSQL')
+    def test_postgres_usa_indice_sin_ordenar(self):
+        # Con las tablas vacías el planificador prefiere un seq scan
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+        for clave, _, modelo, orden in SECCIONES_CV:
+            with self.subTest(seccion=clave):
+                plan = _consulta_seccion(modelo, orden).explain()
+                self.assertIn(_indice_visible(modelo), plan)
+                self.assertNotIn('Sort', plan)
@@ -0,0 +1,104 @@
+"""
+Recálculo de los datos derivados desde signals.py
+
+Una transacción que toca muchas filas de un perfil recalcula cada tabla
+derivada una sola vez al confirmar, y las filas borradas en cascada con su
+perfil no recalculan nada.
+"""
+
+from datetime import date
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..models import DatosPersonales, DocumentoCV, EstadisticasCV, ExperienciaLaboral, IndiceBusquedaCV
+
+
+def _perfil(numero):
+    usuario = User.objects.create_user(f"usuario{numero}")
+    return DatosPersonales.objects.create(
+        usuario=usuario,
+        nombres='Ana',
+        apellidos='Perez',
+        lugarnacimiento='Manta',
+        fechanacimiento=date(1990, 5, 17),
+        numerocedula=f"13{numero:08d}",
+        sexo='M',
+        estadocivil='Soltero/a',
+        direcciondomiciliaria='Calle 13',
+        slug=f"ana-perez-{numero}",
+    )
+
+
+def _experiencia(perfil, numero):
+    return ExperienciaLaboral(
+        idperfilconqueestaactivo=perfil,
+        cargodesempenado=f"Cargo {numero}",
+        nombrempresa='ACME',
+        lugarempresa='Quito',
+        fechainiciogestion=date(2000 + numero % 20, 1, 1),
+        descripcionfunciones='Backend',
+    )
+
+
+class RecalculoPorTransaccionTests(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.perfil = _perfil(1)
+
+    def test_una_tarea_por_tabla_derivada(self):
+        with self.captureOnCommitCallbacks(execute=True) as tareas:
+            for numero in range(5):
+                _experiencia(self.perfil, numero).save()
+
+        # Versión, estadísticas, documento, índice, facetas y búsquedas guardadas
+        self.assertEqual(len(tareas), 6)
+        self.assertEqual(EstadisticasCV.objects.get(perfil=self.perfil).total_experiencia, 5)
+        contenido = DocumentoCV.objects.get(perfil=self.perfil).contenido
+        self.assertEqual(len(contenido['secciones']['experiencia']), 5)
+
+    def test_savepoint_revertido_no_pierde_el_recalculo(self):
+        with self.captureOnCommitCallbacks(execute=True) as tareas:
+            try:
+                with transaction.atomic():
+                    _experiencia(self.perfil, 0).save()
+                    raise ValueError
+            except ValueError:
+                pass
+            _experiencia(self.perfil, 1).save()
+
+        self.assertEqual(len(tareas), 6)
+        self.assertEqual(EstadisticasCV.objects.get(perfil=self.perfil).total_experiencia, 1)
+
+
+class BorradoEnCascadaTests(TestCase):
+
+    def _borrar_con_experiencias(self, numero, cantidad):
+        with self.captureOnCommitCallbacks(execute=True):
+            perfil = _perfil(numero)
+        ExperienciaLaboral.objects.bulk_create([_experiencia(perfil, i) for i in range(cantidad)])
+        with CaptureQueriesContext(connection) as consultas:
+            with self.captureOnCommitCallbacks(execute=True):
+                perfil.delete()
+        return len(consultas)
+
+    def test_queries_no_dependen_de_las_filas_hijas(self):
+        self.assertEqual(self._borrar_con_experiencias(2, 3), self._borrar_con_experiencias(3, 30))
+        self.assertFalse(DatosPersonales.objects.exists())
+        self.assertFalse(EstadisticasCV.objects.exists())
+        self.assertFalse(DocumentoCV.objects.exists())
+        self.assertFalse(IndiceBusquedaCV.objects.exists())
+
+    def test_borrar_una_fila_si_recalcula(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            perfil = _perfil(4)
+            experiencias = [_experiencia(perfil, numero) for numero in range(2)]
+            for experiencia in experiencias:
+                experiencia.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            experiencias[0].delete()
+
+        self.assertEqual(EstadisticasCV.objects.get(perfil=perfil).total_experiencia, 1)
@@ -13,6 +13,14 @@ urlpatterns = [
     # ======================================
     path('', views.HomeView.as_view(), name='home'),
     path('cv/<slug:slug>/', views.CVPublicoView.as_view(), name='cv_publico'),
+    path('cv/<slug:slug>/json/', views.cv_publico_json, name='cv_publico_json'),
+    path('buscar/', views.BuscarCVView.as_view(), name='buscar_cvs'),
+    path('reclutamiento/', views.FiltrarPerfilesView.as_view(), name='filtrar_perfiles'),
+    path('reclutamiento/busquedas/', views.BusquedasGuardadasView.as_view(), name='busquedas_guardadas'),
+    path('reclutamiento/busquedas/guardar/', views.GuardarBusquedaView.as_view(), name='guardar_busqueda'),
+    path('reclutamiento/busquedas/<int:pk>/', views.DetalleBusquedaView.as_view(), name='detalle_busqueda'),
+    path('reclutamiento/busquedas/<int:pk>/eliminar/', views.EliminarBusquedaView.as_view(), name='eliminar_busqueda'),
+    path('reclutamiento/<slug:slug>/similares/', views.PerfilesSimilaresView.as_view(), name='perfiles_similares'),
     
     # ======================================
     # AUTENTICACIÓN
@@ -32,6 +40,7 @@ urlpatterns = [
     # ======================================
     path('perfil/crear/', views.CrearPerfilView.as_view(), name='crear_perfil'),
     path('perfil/editar/', views.EditarPerfilView.as_view(), name='editar_perfil'),
+    path('perfil/importar/', views.ImportarCVView.as_view(), name='importar_cv'),
     
     # ======================================
     # FORMACIÓN ACADÉMICA
@@ -80,4 +89,11 @@ urlpatterns = [
     # ======================================
     path('descargar-cv/', views.descargar_cv_pdf, name='descargar_cv'),
     path('visualizar-cv/', views.visualizar_cv_pdf, name='visualizar_cv'),
+    path('pdf/trabajos/<uuid:pk>/', views.estado_trabajo_pdf, name='estado_trabajo_pdf'),
+    path('pdf/trabajos/<uuid:pk>/archivo/', views.pdf_trabajo, name='pdf_trabajo'),
+    
+    # ======================================
+    # DESCARGA DE DATOS DEL USUARIO
+    # ======================================
+    path('mis-datos/', views.exportar_mis_datos, name='exportar_mis_datos'),
 ]
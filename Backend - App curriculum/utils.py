@@ -202,37 +202,7 @@ def generar_descripcion_meta(perfil):
 
 def obtener_porcentaje_completitud(perfil):
     """
-    Calcula el porcentaje de completitud del CV
+    Porcentaje de completitud del CV (ver cv_estadisticas.py)
     """
-    total = 10
-    completado = 0
-    
-    # Datos personales (2 puntos)
-    if perfil.foto:
-        completado += 1
-    if perfil.resumen_profesional:
-        completado += 1
-    
-    # Formación (2 puntos)
-    if perfil.formacion_academica.exists():
-        completado += 2
-    
-    # Experiencia (2 puntos)
-    if perfil.experiencias.exists():
-        completado += 2
-    
-    # Habilidades (2 puntos)
-    if perfil.habilidades.count() >= 5:
-        completado += 2
-    elif perfil.habilidades.exists():
-        completado += 1
-    
-    # Proyectos (1 punto)
-    if perfil.proyectos.exists():
-        completado += 1
-    
-    # Certificaciones (1 punto)
-    if perfil.certificaciones.exists():
-        completado += 1
-    
-    return int((completado / total) * 100)
+    from .cv_estadisticas import obtener_estadisticas
+    return obtener_estadisticas(perfil).completitud
@@ -5,15 +5,23 @@ Vistas para el Sistema de CV Profesional
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth import login, logout, authenticate
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.contrib import messages
 from django.views.generic import (
-    ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView
+    ListView, DetailView, CreateView, UpdateView, DeleteView, TemplateView, View, FormView
 )
-from django.urls import reverse_lazy
-from django.http import HttpResponse, FileResponse, Http404
+from django.urls import reverse, reverse_lazy
+from django.http import HttpResponse, FileResponse, Http404, JsonResponse, StreamingHttpResponse
+from django.conf import settings
+from django.core.paginator import Paginator
 from django.db.models import Q, Count
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.utils.text import slugify
 from .models import (
+    DatosPersonales,
+    TrabajoRenderPDF,
+    BusquedaGuardada,
     PerfilProfesional,
     FormacionAcademica,
     ExperienciaProfesional,
@@ -31,9 +39,29 @@ from .forms import (
     HabilidadForm,
     ProyectoForm,
     ReferenciaProfesionalForm,
-    CertificacionForm
+    CertificacionForm,
+    BusquedaGuardadaForm,
+    ImportarCVForm
 )
-from .pdf_generator import generar_cv_pdf
+from .pdf_cache import obtener_pdf_cv, calcular_huella_cv, cache_pdf
+from .pdf_jobs import encolar_render_pdf, reencolar_trabajo
+from .cv_snapshot import (
+    cargar_snapshot_cv,
+    perfiles_publicos,
+    ultimas_filas
+)
+from .cv_version import condicional_cv, version_perfil_publico, version_perfil_usuario
+from .cv_page_cache import cache_cv_publico
+from .cv_slug_index import rechazar_slug_desconocido
+from .cv_estadisticas import obtener_estadisticas, conteos_por_seccion
+from .cv_contadores import obtener_contadores_globales
+from .cv_documento import obtener_documento, snapshot_desde_documento
+from .cv_busqueda import buscar_cvs
+from .cv_facetas import FACETAS, indice_facetas
+from .cv_similares import obtener_similares
+from .cv_busquedas_guardadas import busquedas_de_usuario, guardar_busqueda
+from .cv_importacion_externa import importar_cv_externo, leer_cv_externo
+from .cv_exportacion_datos import exportar_datos_usuario
 
 
 # ======================================
@@ -48,38 +76,212 @@ class HomeView(TemplateView):
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['total_usuarios'] = PerfilProfesional.objects.count()
-        context['cvs_publicos'] = PerfilProfesional.objects.filter(cv_publico=True).count()
+        # Contadores mantenidos por signals, sin COUNT por visita (ver cv_contadores.py)
+        contadores = obtener_contadores_globales()
+        context['total_usuarios'] = contadores['total_perfiles']
+        context['cvs_publicos'] = contadores['cvs_publicos']
         return context
 
 
+@method_decorator(rechazar_slug_desconocido, name='dispatch')
+@method_decorator(cache_cv_publico, name='dispatch')
+@method_decorator(condicional_cv(version_perfil_publico), name='dispatch')
 class CVPublicoView(DetailView):
     """
     Ver CV público de un usuario
     """
-    model = PerfilProfesional
+    model = DatosPersonales
     template_name = 'curriculum/cv/public_cv.html'
     context_object_name = 'perfil'
     slug_field = 'slug'
     slug_url_kwarg = 'slug'
     
     def get_queryset(self):
-        return PerfilProfesional.objects.filter(cv_publico=True)
+        return perfiles_publicos().select_related('documento')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        # Secciones desde el documento materializado (ver cv_documento.py)
+        documento = obtener_documento(self.object)
+        context.update(snapshot_desde_documento(documento, perfil=self.object).como_contexto())
+        return context
+
+
+@rechazar_slug_desconocido
+@condicional_cv(version_perfil_publico, variante='-json')
+def cv_publico_json(request, slug):
+    """
+    CV público como JSON (el documento materializado)
+    """
+    perfil = get_object_or_404(perfiles_publicos().select_related('documento'), slug=slug)
+    documento = obtener_documento(perfil)
+    
+    datos = dict(documento.contenido, version=documento.version)
+    return JsonResponse(datos, json_dumps_params={'ensure_ascii': False})
+
+
+class BuscarCVView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+    """
+    Búsqueda de texto completo sobre los CVs públicos, para reclutadores (staff)
+    """
+    template_name = 'curriculum/cv/buscar.html'
+    context_object_name = 'resultados'
+    paginate_by = getattr(settings, 'CV_BUSQUEDA_POR_PAGINA', 20)
+    
+    def test_func(self):
+        return self.request.user.is_staff
+    
+    def get_queryset(self):
+        return buscar_cvs(self.request.GET.get('q', ''))
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['consulta'] = self.request.GET.get('q', '').strip()
+        return context
+
+
+class FiltrarPerfilesView(LoginRequiredMixin, UserPassesTestMixin, TemplateView):
+    """
+    Filtro por facetas para reclutadores (staff), con conteos por opción
+    """
+    template_name = 'curriculum/cv/filtrar.html'
+    
+    def test_func(self):
+        return self.request.user.is_staff
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        filtros = {faceta: self.request.GET.getlist(faceta) for faceta, _ in FACETAS}
+        resultado = indice_facetas.filtrar(filtros)
+        
+        # Solo la página visible va a la base de datos
+        paginator = Paginator(resultado.ids, getattr(settings, 'CV_FACETAS_POR_PAGINA', 20))
+        page_obj = paginator.get_page(self.request.GET.get('page'))
+        ids = list(page_obj.object_list)
+        perfiles = DatosPersonales.objects.select_related('estadisticas').in_bulk(ids)
+        
+        parametros = self.request.GET.copy()
+        parametros.pop('page', None)
+        
+        context.update({
+            'facetas': [(faceta, titulo, resultado.facetas[faceta]) for faceta, titulo in FACETAS],
+            'total': resultado.total,
+            'resultados': [perfiles[perfil_id] for perfil_id in ids if perfil_id in perfiles],
+            'page_obj': page_obj,
+            'paginator': paginator,
+            'is_paginated': page_obj.has_other_pages(),
+            'parametros': parametros.urlencode(),
+            'filtros_activos': [(faceta, valor) for faceta, valores in filtros.items() for valor in valores],
+            'busqueda_form': BusquedaGuardadaForm(),
+        })
+        return context
+
+
+class PerfilesSimilaresView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+    """
+    Perfiles parecidos al indicado, leídos de los vecinos precalculados
+    """
+    template_name = 'curriculum/cv/similares.html'
+    context_object_name = 'perfil'
+    
+    def test_func(self):
+        return self.request.user.is_staff
+    
+    def get_queryset(self):
+        return DatosPersonales.objects.all()
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['similares'] = obtener_similares(self.object, getattr(settings, 'CV_SIMILARES_K', 10))
+        return context
+
+
+class BusquedasGuardadasView(LoginRequiredMixin, UserPassesTestMixin, ListView):
+    """
+    Búsquedas guardadas del reclutador con sus resultados nuevos
+    """
+    template_name = 'curriculum/cv/busquedas.html'
+    context_object_name = 'busquedas'
+    
+    def test_func(self):
+        return self.request.user.is_staff
+    
+    def get_queryset(self):
+        return busquedas_de_usuario(self.request.user)
+
+
+class GuardarBusquedaView(LoginRequiredMixin, UserPassesTestMixin, View):
+    """
+    Guarda los filtros activos de reclutamiento como búsqueda
+    """
+    
+    def test_func(self):
+        return self.request.user.is_staff
+    
+    def post(self, request):
+        form = BusquedaGuardadaForm(request.POST)
+        if not form.is_valid():
+            messages.error(request, 'Revisa el nombre y los años de experiencia de la búsqueda.')
+            return redirect('curriculum:filtrar_perfiles')
+        
+        busqueda = form.save(commit=False)
+        busqueda.usuario = request.user
+        busqueda.filtros = {faceta: request.POST.getlist(faceta) for faceta, _ in FACETAS}
+        guardar_busqueda(busqueda)
+        messages.success(request, f'Búsqueda "{busqueda.nombre}" guardada.')
+        return redirect('curriculum:detalle_busqueda', pk=busqueda.pk)
+
+
+class DetalleBusquedaView(LoginRequiredMixin, UserPassesTestMixin, DetailView):
+    """
+    Resultados de una búsqueda guardada, marcando los nuevos desde la última visita
+    """
+    template_name = 'curriculum/cv/busqueda_detalle.html'
+    context_object_name = 'busqueda'
+    
+    def test_func(self):
+        return self.request.user.is_staff
+    
+    def get_queryset(self):
+        return BusquedaGuardada.objects.filter(usuario=self.request.user)
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        perfil = self.object
+        resultados = (
+            self.object.resultados
+            .select_related('perfil__estadisticas')
+            .order_by('-fecha_coincidencia', 'pk')
+        )
+        paginator = Paginator(resultados, getattr(settings, 'CV_FACETAS_POR_PAGINA', 20))
+        page_obj = paginator.get_page(self.request.GET.get('page'))
         
-        context['formacion'] = perfil.formacion_academica.all()[:5]
-        context['experiencias'] = perfil.experiencias.all()[:10]
-        context['habilidades'] = perfil.habilidades.all()[:20]
-        context['proyectos'] = perfil.proyectos.filter(destacado=True)[:6]
-        context['certificaciones'] = perfil.certificaciones.all()[:10]
-        context['referencias'] = perfil.referencias.all()[:3]
+        context.update({
+            'resultados': page_obj.object_list,
+            'revision_anterior': self.object.fecha_revision,
+            'page_obj': page_obj,
+            'paginator': paginator,
+            'is_paginated': page_obj.has_other_pages(),
+        })
         
+        # update() directo: guardar la búsqueda la volvería a evaluar completa
+        BusquedaGuardada.objects.filter(pk=self.object.pk).update(fecha_revision=timezone.now())
         return context
 
 
+class EliminarBusquedaView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+    """
+    Elimina una búsqueda guardada (solo POST, desde el listado)
+    """
+    http_method_names = ['post']
+    success_url = reverse_lazy('curriculum:busquedas_guardadas')
+    
+    def test_func(self):
+        return self.request.user.is_staff
+    
+    def get_queryset(self):
+        return BusquedaGuardada.objects.filter(usuario=self.request.user)
+
+
 # ======================================
 # AUTENTICACIÓN
 # ======================================
@@ -162,37 +364,32 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         
         try:
-            perfil = self.request.user.perfil
+            perfil = DatosPersonales.objects.select_related('estadisticas').get(usuario=self.request.user)
+            estadisticas = obtener_estadisticas(perfil)
+            conteos = conteos_por_seccion(estadisticas)
             context['tiene_perfil'] = True
             context['perfil'] = perfil
             
-            # Estadísticas
+            # Estadísticas (contadores guardados, ver cv_estadisticas.py)
             context['stats'] = {
-                'formacion': perfil.formacion_academica.count(),
-                'experiencias': perfil.experiencias.count(),
-                'habilidades': perfil.habilidades.count(),
-                'proyectos': perfil.proyectos.count(),
-                'certificaciones': perfil.certificaciones.count(),
-                'referencias': perfil.referencias.count(),
+                'experiencias': conteos['experiencia'],
+                'reconocimientos': conteos['reconocimientos'],
+                'cursos': conteos['cursos'],
+                'productos_academicos': conteos['productos_academicos'],
+                'productos_laborales': conteos['productos_laborales'],
+                'ventas_garage': conteos['venta_garage'],
             }
             
             # Progreso del CV (porcentaje de completitud)
-            total_secciones = 6
-            secciones_completas = sum([
-                1 if context['stats']['formacion'] > 0 else 0,
-                1 if context['stats']['experiencias'] > 0 else 0,
-                1 if context['stats']['habilidades'] > 0 else 0,
-                1 if context['stats']['proyectos'] > 0 else 0,
-                1 if perfil.resumen_profesional else 0,
-                1 if perfil.foto else 0,
-            ])
-            context['progreso'] = int((secciones_completas / total_secciones) * 100)
+            context['progreso'] = estadisticas.completitud
             
-            # Últimas actualizaciones
-            context['ultimas_experiencias'] = perfil.experiencias.all()[:3]
-            context['ultimos_proyectos'] = perfil.proyectos.all()[:3]
+            # Últimas actualizaciones (solo se consultan si hay filas)
+            context['ultimas_experiencias'] = (
+                ultimas_filas(perfil, 'experiencia') if conteos['experiencia'] else []
+            )
+            context['ultimos_cursos'] = ultimas_filas(perfil, 'cursos') if conteos['cursos'] else []
             
-        except PerfilProfesional.DoesNotExist:
+        except DatosPersonales.DoesNotExist:
             context['tiene_perfil'] = False
         
         return context
@@ -240,28 +437,58 @@ class EditarPerfilView(LoginRequiredMixin, UpdateView):
         return super().form_valid(form)
 
 
+class ImportarCVView(LoginRequiredMixin, FormView):
+    """
+    Carga experiencias, cursos, reconocimientos y productos desde LinkedIn o JSON Resume
+    """
+    form_class = ImportarCVForm
+    template_name = 'curriculum/cv/importar.html'
+    login_url = 'curriculum:login'
+    
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and not DatosPersonales.objects.filter(usuario=request.user).exists():
+            messages.error(request, 'Debes crear tu perfil primero.')
+            return redirect('curriculum:crear_perfil')
+        return super().dispatch(request, *args, **kwargs)
+    
+    def form_valid(self, form):
+        archivo = form.cleaned_data['archivo']
+        perfil = self.request.user.datos_personales
+        try:
+            resultado = importar_cv_externo(perfil, leer_cv_externo(archivo, archivo.name))
+        except ValueError as error:
+            form.add_error('archivo', str(error))
+            return self.form_invalid(form)
+        
+        importadas = sum(resultado.filas.values())
+        resumen = f'{importadas} entradas importadas'
+        if resultado.duplicadas:
+            resumen += f', {resultado.duplicadas} ya estaban en tu CV'
+        if importadas:
+            resumen += '. Las que no traían todos los datos quedaron ocultas en tu CV público'
+        messages.success(self.request, f'{resumen}.')
+        
+        if resultado.errores:
+            # Sin redirigir: el usuario ve qué entradas no se pudieron importar
+            return self.render_to_response(self.get_context_data(form=form, resultado=resultado))
+        return redirect('curriculum:dashboard')
+
+
+@method_decorator(condicional_cv(version_perfil_usuario, privado=True), name='dispatch')
 class VerCVView(LoginRequiredMixin, DetailView):
     """
     Ver CV completo del usuario
     """
-    model = PerfilProfesional
+    model = DatosPersonales
     template_name = 'curriculum/cv/view_cv.html'
     context_object_name = 'perfil'
     
     def get_object(self):
-        return self.request.user.perfil
+        return self.request.user.datos_personales
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        perfil = self.object
-        
-        context['formacion'] = perfil.formacion_academica.all()
-        context['experiencias'] = perfil.experiencias.all()
-        context['habilidades'] = perfil.habilidades.all()
-        context['proyectos'] = perfil.proyectos.all()
-        context['certificaciones'] = perfil.certificaciones.all()
-        context['referencias'] = perfil.referencias.all()
-        
+        context.update(cargar_snapshot_cv(self.object).como_contexto())
         return context
 
 
@@ -489,41 +716,126 @@ class EliminarCertificacionView(LoginRequiredMixin, DeleteView):
 # GENERACIÓN DE PDF
 # ======================================
 
+def _respuesta_pdf(archivo, perfil, como_adjunto):
+    if como_adjunto:
+        return FileResponse(
+            archivo,
+            content_type='application/pdf',
+            as_attachment=True,
+            filename=f"CV_{perfil.nombre_completo}.pdf"
+        )
+    return FileResponse(archivo, content_type='application/pdf')
+
+
+def _servir_o_encolar_pdf(request, como_adjunto):
+    """
+    Sirve el PDF desde la caché o encola su render y muestra la página de espera
+    """
+    perfil = request.user.datos_personales
+    
+    # Sin worker (p. ej. desarrollo): render dentro del request
+    if not getattr(settings, 'CV_PDF_RENDER_ASINCRONO', True):
+        archivo, _ = obtener_pdf_cv(perfil)
+        return _respuesta_pdf(archivo, perfil, como_adjunto)
+    
+    huella = calcular_huella_cv(perfil)
+    archivo = cache_pdf.obtener(huella)
+    if archivo is not None:
+        return _respuesta_pdf(archivo, perfil, como_adjunto)
+    
+    trabajo = encolar_render_pdf(perfil, huella=huella)
+    return render(request, 'curriculum/cv/pdf_en_proceso.html', {
+        'trabajo': trabajo,
+        'como_adjunto': como_adjunto,
+    }, status=202)
+
+
 @login_required
+@condicional_cv(version_perfil_usuario, variante='-pdf', privado=True)
 def descargar_cv_pdf(request):
     """
-    Descargar CV en formato PDF
+    Descargar CV en formato PDF (servido desde la caché si no hubo cambios)
     """
     try:
-        perfil = request.user.perfil
-        pdf_buffer = generar_cv_pdf(perfil)
-        
-        response = HttpResponse(pdf_buffer, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="CV_{perfil.nombre_completo}.pdf"'
-        
-        return response
+        return _servir_o_encolar_pdf(request, como_adjunto=True)
     
-    except PerfilProfesional.DoesNotExist:
+    except DatosPersonales.DoesNotExist:
         messages.error(request, 'Debes crear tu perfil primero.')
         return redirect('curriculum:crear_perfil')
 
 
 @login_required
+@condicional_cv(version_perfil_usuario, variante='-pdf', privado=True)
 def visualizar_cv_pdf(request):
     """
-    Visualizar CV en el navegador
+    Visualizar CV en el navegador (servido desde la caché si no hubo cambios)
     """
     try:
-        perfil = request.user.perfil
-        pdf_buffer = generar_cv_pdf(perfil)
-        
-        return HttpResponse(pdf_buffer, content_type='application/pdf')
+        return _servir_o_encolar_pdf(request, como_adjunto=False)
     
-    except PerfilProfesional.DoesNotExist:
+    except DatosPersonales.DoesNotExist:
         messages.error(request, 'Debes crear tu perfil primero.')
         return redirect('curriculum:crear_perfil')
 
 
+@login_required
+def estado_trabajo_pdf(request, pk):
+    """
+    Estado de un trabajo de render PDF (JSON para polling)
+    """
+    trabajo = get_object_or_404(TrabajoRenderPDF, pk=pk, perfil__usuario=request.user)
+    
+    datos = {
+        'id': str(trabajo.pk),
+        'estado': trabajo.estado,
+        'error': trabajo.error,
+        'url_pdf': None,
+    }
+    if trabajo.estado == TrabajoRenderPDF.COMPLETADO:
+        datos['url_pdf'] = reverse('curriculum:pdf_trabajo', args=[trabajo.pk])
+    
+    return JsonResponse(datos)
+
+
+@login_required
+def pdf_trabajo(request, pk):
+    """
+    Devuelve el PDF de un trabajo completado
+    """
+    trabajo = get_object_or_404(
+        TrabajoRenderPDF.objects.select_related('perfil'),
+        pk=pk,
+        perfil__usuario=request.user
+    )
+    
+    archivo = None
+    if trabajo.estado == TrabajoRenderPDF.COMPLETADO:
+        archivo = cache_pdf.obtener(trabajo.huella)
+        if archivo is None:
+            # El PDF fue expulsado de la caché: se vuelve a generar
+            reencolar_trabajo(trabajo)
+    
+    if archivo is None:
+        return JsonResponse({'id': str(trabajo.pk), 'estado': trabajo.estado}, status=202)
+    
+    return _respuesta_pdf(archivo, trabajo.perfil, como_adjunto='descargar' in request.GET)
+
+
+# ======================================
+# DESCARGA DE DATOS DEL USUARIO
+# ======================================
+
+@login_required
+def exportar_mis_datos(request):
+    """
+    ZIP con todos los datos y archivos del usuario, transmitido por partes
+    """
+    respuesta = StreamingHttpResponse(exportar_datos_usuario(request.user), content_type='application/zip')
+    nombre = slugify(request.user.get_username()) or request.user.pk
+    respuesta['Content-Disposition'] = f'attachment; filename="datos_{nombre}_{timezone.now():%Y%m%d}.zip"'
+    return respuesta
+
+
 # ======================================
 # HANDLERS DE ERRORES
 # ======================================
@@ -7,6 +7,8 @@ from django.utils.safestring import mark_safe
 from datetime import date, datetime
 import re
 
+from ..cv_estadisticas import obtener_estadisticas
+
 register = template.Library()
 
 
@@ -211,40 +213,9 @@ def url_dominio(url):
 @register.filter(name='porcentaje_completitud')
 def porcentaje_completitud(perfil):
     """
-    Calcula el porcentaje de completitud del CV
+    Porcentaje de completitud del CV (guardado en EstadisticasCV, sin contar filas)
     """
-    total = 10
-    completado = 0
-    
-    # Datos personales (2 puntos)
-    if perfil.foto:
-        completado += 1
-    if perfil.resumen_profesional:
-        completado += 1
-    
-    # Formación (2 puntos)
-    if perfil.formacion_academica.exists():
-        completado += 2
-    
-    # Experiencia (2 puntos)
-    if perfil.experiencias.exists():
-        completado += 2
-    
-    # Habilidades (2 puntos)
-    if perfil.habilidades.count() >= 5:
-        completado += 2
-    elif perfil.habilidades.exists():
-        completado += 1
-    
-    # Proyectos (1 punto)
-    if perfil.proyectos.exists():
-        completado += 1
-    
-    # Certificaciones (1 punto)
-    if perfil.certificaciones.exists():
-        completado += 1
-    
-    return int((completado / total) * 100)
+    return obtener_estadisticas(perfil).completitud
 
 
 @register.filter(name='mes_nombre')
@@ -307,4 +278,5 @@ def render_skill_bar(habilidad):
     return {
         'habilidad': habilidad,
         'color': nivel_color_hex(habilidad.nivel),
-        'texto': nivel_texto
+        'texto': nivel_texto(habilidad.nivel),
+    }